@@ -0,0 +1,105 @@
+import argparse
+import time
+from pathlib import Path
+
+from web_crawler.loading.extraction import EXTRACTORS, get_extractor
+
+CORPUS = Path(__file__).parent.parent / "tests" / "pages"
+
+
+def synthetic_forum(posts: int) -> str:
+    """Creates a forum thread page with the given number of posts.
+
+    Args:
+        posts (int): number of posts in the thread.
+
+    Returns:
+        str: HTML document.
+    """
+    body = "".join(
+        f'<div class="post"><span class="author">user{i}</span><div class="message">'
+        f"<p>Post {i} about running models on device, with <b>some</b> markup "
+        f'and a <a href="/t/{i}">link</a>.</p></div></div>'
+        for i in range(posts)
+    )
+
+    return f"<html><body><div id='thread'>{body}</div></body></html>"
+
+
+def load_corpus(path: Path, synthetic_posts: int) -> dict[str, str]:
+    """Reads saved HTML pages of the corpus.
+
+    Args:
+        path (Path): directory with saved `.html` pages.
+        synthetic_posts (int): number of posts of an extra synthetic forum page, 0 to skip it.
+
+    Returns:
+        dict[str, str]: HTML documents by name.
+    """
+    pages = {page.name: page.read_text() for page in sorted(path.glob("*.html"))}
+    if synthetic_posts:
+        pages[f"synthetic-{synthetic_posts}-posts"] = synthetic_forum(synthetic_posts)
+
+    return pages
+
+
+def benchmark(
+    pages: dict[str, str], repeat: int, max_chars: int | None
+) -> dict[str, dict[str, tuple[float, int]]]:
+    """Times every extractor on every page.
+
+    Args:
+        pages (dict[str, str]): HTML documents by name.
+        repeat (int): number of extractions of every page, the fastest one is reported.
+        max_chars (int | None): number of characters after which extraction stops.
+
+    Returns:
+        dict[str, dict[str, tuple[float, int]]]: seconds per extraction and number of extracted characters by extractor and page.
+    """
+    results = {}
+    for name in EXTRACTORS:
+        extractor = get_extractor(name, max_chars)
+        results[name] = {}
+        for page, html in pages.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                content = extractor.extract(html)
+                timings.append(time.perf_counter() - start)
+
+            results[name][page] = (min(timings), len(content))
+
+    return results
+
+
+def main():
+    """Benchmarks HTML text extractors on a corpus of saved pages."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--corpus", type=Path, default=CORPUS, help="directory with saved .html pages"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-chars", type=int, default=None)
+    parser.add_argument(
+        "--synthetic-posts",
+        type=int,
+        default=0,
+        help="number of posts of an extra synthetic forum page, e.g. 20000",
+    )
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus, args.synthetic_posts)
+    results = benchmark(pages, args.repeat, args.max_chars)
+
+    width = max(len(page) for page in pages)
+    print(f"{'page':<{width}}  " + "  ".join(f"{name:>21}" for name in results))
+    for page in pages:
+        cells = (
+            f"{results[name][page][0] * 1000:>10.2f} ms {results[name][page][1]:>6}c"
+            for name in results
+        )
+        print(f"{page:<{width}}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
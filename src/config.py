@@ -5,6 +5,85 @@ MODEL = "openai:gpt-4o"
 ITERATIONS = 3
 AGENT_MIN_ITERATIONS = 3
 AGENT_MAX_ITERATIONS = 5
+AGENT_MAX_HISTORY_TOKENS = (
+    None  # e.g. 8000 summarizes earlier search iterations above that many tokens
+)
+AGENT_MIN_YIELD = (
+    None  # e.g. 0.15 stops searching locally once iterations yield few new websites
+)
+AGENT_YIELD_PATIENCE = 1
+PLANNER = False  # True plans diverse queries for the first AGENT_MIN_ITERATIONS iterations of all runs
+PLANNER_MAX_SIMILARITY = 0.5
+MAX_CONCURRENCY = 8
+MODEL_RPM = 500
+MODEL_TPM = 30_000
+CHECKPOINT_PATH = None  # e.g. ".cache/checkpoints.sqlite" to resume interrupted crawls
+CRAWL_ID = None  # ID logged by an interrupted crawl, to resume it
+
+# Model routing
+
+# Models by node, e.g. cheaper ones for searching, instead of MODEL
+NODE_MODELS = {
+    # "SEARCH": "openai:gpt-4o-mini",
+    # "SELECT_PAGE": "openai:gpt-4o-mini",
+    # "DECIDE_LOOP": "openai:gpt-4o-mini",
+}
+# Models retrying calls of a node that failed, timed out or returned an unparsable response
+FALLBACK_MODELS = {
+    # "CRITIQUE": "openai:gpt-4o-mini",
+    # "SELECTION": "openai:gpt-4o-mini",
+}
+MODEL_TIMEOUT = 60
+MODEL_PRICES = {
+    "openai:gpt-4o": (2.5, 10),
+    "openai:gpt-4o-mini": (0.15, 0.6),
+}
+
+# Searching
+
+SEARCH_CACHE_TTL = 6 * 60 * 60
+SEARCH_CACHE_PATH = ".cache/searches.sqlite"
+SEARCH_RATE = 0.5
+
+# Website loading
+
+LOAD_TIMEOUT = 10
+LOAD_MAX_WORKERS = 16
+LOAD_MAX_PER_HOST = 4
+LOAD_DEADLINE = 30
+LOAD_RATE_PER_HOST = 2
+
+RETRIES = 2
+BACKOFF_BASE = 1
+BACKOFF_MAX = 30
+
+EXTRACTOR = "soup"  # "readability" keeps only the main content of websites
+MAX_PAGE_CHARS = 200_000
+CONTENT_STORE_MAX_CHARS = 32 * 1024 * 1024
+
+TRIAGE = False  # True rejects short, error and off-topic pages before the Critic
+TRIAGE_MIN_CHARS = 300
+TRIAGE_MIN_RELEVANCE = 0.02
+TRIAGE_MODEL = "openai:gpt-4o-mini"
+
+CRITIC_MAX_INPUT_TOKENS = (
+    None  # e.g. 4000 keeps the most relevant parts of longer websites
+)
+CRITIC_BATCH_TOKENS = None  # e.g. 12_000 critiques up to 10 websites in a single call
+
+SELECTOR_SHARD_SIZE = (
+    None  # e.g. 30 selects from larger sets of critiques in parallel shards
+)
+SELECTOR_MAX_CANDIDATES = None  # e.g. 200 drops the rest of keyword-ranked critiques
+GLOBAL_SELECTION = False  # True selects once from the critiques of all runs
+
+CRITIQUE_CACHE_PATH = ".cache/critiques.sqlite"
+CRITIQUE_CACHE_TTL = 30 * 24 * 60 * 60
+CRITIQUE_CACHE_MAX_ENTRIES = 50_000
+
+PAGE_CACHE_PATH = ".cache/pages.sqlite"
+PAGE_CACHE_TTL = 24 * 60 * 60
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
 
 # Agents prompts
 
@@ -12,6 +91,10 @@ SELECTOR_INTRODUCTION_PROMPT = """You are a selector designed to pick from a lis
 
 CRITIC_INTRODUCTION_PROMPT = """You are a critic designed to judge the suitability of a provided webpage for advertising our product. We want to find webpages talking about problems where our product can help. The goal is to comment there with an advertisement of the product. We don't want general webpages talking about ways to advertise, but specific webpages on the specific topic our product solves. Answer concisely, but don't omit any key points or downsides. WE DON'T WANT ADVERTISING PLATFORMS."""
 
+TRIAGE_INTRODUCTION_PROMPT = """You are a quick filter deciding whether a provided webpage is worth a closer look as a place to advertise our product. Reject pages unrelated to the specific topic our product solves, error pages, login walls, shops and advertising platforms. When in doubt, accept the page. Give a short reason."""
+
+PLANNER_INTRODUCTION_PROMPT = """You are a planner writing web search queries for a team looking for webpages talking about problems where our product can help. Every query should approach the topic from a different angle: a different problem, use case, platform, community or kind of page. We don't want general webpages talking about ways to advertise, but specific webpages on the specific topic our product solves. DO NOT SEARCH FOR ADVERTISING PLATFORMS."""
+
 SEARCH_SEARCH_PROMPT = """Search for webpages talking about problems where our product can help. We don't want general webpages talking about ways to advertise, but specific webpages on the specific topic our product solves. DO NOT SEARCH FOR ADVERTISING PLATFORMS."""
 
 SEARCH_SELECT_PAGE_PROMPT = """Pick websites to load that are likely to be good places to advertise our product."""
@@ -33,13 +33,57 @@ def main():
         model=config.MODEL,
         search_min_iterations=config.AGENT_MIN_ITERATIONS,
         search_max_iterations=config.AGENT_MAX_ITERATIONS,
+        search_max_history_tokens=config.AGENT_MAX_HISTORY_TOKENS,
+        search_min_yield=config.AGENT_MIN_YIELD,
+        search_yield_patience=config.AGENT_YIELD_PATIENCE,
+        planner_introduction_prompt=(
+            config.PLANNER_INTRODUCTION_PROMPT if config.PLANNER else None
+        ),
+        planner_max_similarity=config.PLANNER_MAX_SIMILARITY,
+        load_timeout=config.LOAD_TIMEOUT,
+        load_max_workers=config.LOAD_MAX_WORKERS,
+        load_max_per_host=config.LOAD_MAX_PER_HOST,
+        load_deadline=config.LOAD_DEADLINE,
+        page_cache_path=config.PAGE_CACHE_PATH,
+        page_cache_ttl=config.PAGE_CACHE_TTL,
+        page_cache_max_bytes=config.PAGE_CACHE_MAX_BYTES,
+        extractor=config.EXTRACTOR,
+        max_page_chars=config.MAX_PAGE_CHARS,
+        critic_max_input_tokens=config.CRITIC_MAX_INPUT_TOKENS,
+        critique_cache_path=config.CRITIQUE_CACHE_PATH,
+        critique_cache_ttl=config.CRITIQUE_CACHE_TTL,
+        critique_cache_max_entries=config.CRITIQUE_CACHE_MAX_ENTRIES,
+        search_cache_ttl=config.SEARCH_CACHE_TTL,
+        search_cache_path=config.SEARCH_CACHE_PATH,
+        search_rate=config.SEARCH_RATE,
+        load_rate_per_host=config.LOAD_RATE_PER_HOST,
+        retries=config.RETRIES,
+        backoff_base=config.BACKOFF_BASE,
+        backoff_max=config.BACKOFF_MAX,
+        max_concurrency=config.MAX_CONCURRENCY,
+        model_rpm=config.MODEL_RPM,
+        model_tpm=config.MODEL_TPM,
+        critic_batch_tokens=config.CRITIC_BATCH_TOKENS,
+        triage=config.TRIAGE,
+        triage_min_chars=config.TRIAGE_MIN_CHARS,
+        triage_min_relevance=config.TRIAGE_MIN_RELEVANCE,
+        triage_model=config.TRIAGE_MODEL,
+        triage_introduction_prompt=config.TRIAGE_INTRODUCTION_PROMPT,
+        node_models=config.NODE_MODELS,
+        fallback_models=config.FALLBACK_MODELS,
+        model_timeout=config.MODEL_TIMEOUT,
+        model_prices=config.MODEL_PRICES,
+        checkpoint_path=config.CHECKPOINT_PATH,
+        selector_shard_size=config.SELECTOR_SHARD_SIZE,
+        selector_max_candidates=config.SELECTOR_MAX_CANDIDATES,
+        global_selection=config.GLOBAL_SELECTION,
+        content_store_max_chars=config.CONTENT_STORE_MAX_CHARS,
     )
 
-    found_websites = crawler.run()
-
-    for website in found_websites:
+    for website in crawler.stream(crawl_id=config.CRAWL_ID):
         print(
-            f"LINK: {website.website.link}\nJUSTIFICATION: {website.justification}\n\n"
+            f"LINK: {website.website.link}\nSCORE: {website.score}\n"
+            f"JUSTIFICATION: {website.justification}\n\n"
         )
 
 
@@ -1,9 +1,23 @@
+from functools import cache
 from typing import Any
 
 from langchain.tools import tool
 from langchain_community.tools import DuckDuckGoSearchResults
 
 
+@cache
+def _client(num_results: int) -> DuckDuckGoSearchResults:
+    """Returns the search client, created once per number of results.
+
+    Args:
+        num_results (int): number of results to return.
+
+    Returns:
+        DuckDuckGoSearchResults: search client.
+    """
+    return DuckDuckGoSearchResults(output_format="list", num_results=num_results)
+
+
 @tool(parse_docstring=True)
 def ddg_search(query: str, num_results: int = 10) -> Any:
     """Runs the search with DuckDuckGo search engine and returns results.
@@ -15,5 +29,4 @@ def ddg_search(query: str, num_results: int = 10) -> Any:
     Returns:
         Any: found websites.
     """
-    search = DuckDuckGoSearchResults(output_format="list", num_results=num_results)
-    return search.invoke(query)
+    return _client(num_results).invoke(query)
@@ -1,6 +1,15 @@
 from web_crawler.agents.base_agent import BaseAgent
 from web_crawler.agents.critic.agent import CriticAgent
+from web_crawler.agents.planner.agent import PlannerAgent
 from web_crawler.agents.search.agent import SearchAgent
 from web_crawler.agents.selector.agent import SelectorAgent
+from web_crawler.agents.triage.agent import TriageAgent
 
-__all__ = ["BaseAgent", "CriticAgent", "SearchAgent", "SelectorAgent"]
+__all__ = [
+    "BaseAgent",
+    "CriticAgent",
+    "PlannerAgent",
+    "SearchAgent",
+    "SelectorAgent",
+    "TriageAgent",
+]
@@ -1,34 +1,78 @@
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Generic, Type, TypeVar
+from collections.abc import Awaitable, Callable, Hashable
+from contextlib import nullcontext
+from enum import Enum
+from typing import Any, Generic, TypeVar
 
 from langchain.agents import AgentState
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import AnyMessage
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, AnyMessage
+from langchain_core.runnables import Runnable, RunnableLambda
 from langgraph.graph.state import CompiledStateGraph
 from pydantic import BaseModel
 
+from web_crawler.models import ModelRegistry
+from web_crawler.scheduling import LLMScheduler, Priority
+from web_crawler.stats import Stats
+
 logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=AgentState)
 K = TypeVar("K", bound=BaseModel)
 
+OUTPUT_TOKENS_ESTIMATE = 500
+
 
 class BaseAgent(ABC, Generic[T]):
-    """Base class for Agents."""
+    """Base class for Agents.
 
-    def __init__(self, model: str = "openai:gpt-4o") -> None:
-        """Initializes the chat model.
+    Messages sent by agents start with prompts that are identical across all calls
+    and runs, e.g. the description of the product, and end with volatile content,
+    so that providers can serve the common prefix from their prompt cache.
+    """
+
+    name: str = "agent"
+    """Name of the agent in stats."""
+
+    def __init__(
+        self,
+        model: str = "openai:gpt-4o",
+        scheduler: LLMScheduler | None = None,
+        stats: Stats | None = None,
+        node_models: dict[str, str] | None = None,
+        fallback_models: dict[str, str] | None = None,
+        timeout: float | None = None,
+        models: ModelRegistry | None = None,
+    ) -> None:
+        """Initializes the chat models.
 
         Args:
             model (str, optional): LLM model to use as foundation for agents. Defaults to "openai:gpt-4o".
+            scheduler (LLMScheduler | None, optional): scheduler of LLM calls shared by all agents. Defaults to None, which means calling the LLM right away.
+            stats (Stats | None, optional): counters to record token usage and latency in. Defaults to None.
+            node_models (dict[str, str] | None, optional): models to use instead of `model` by name of the node calling them. Defaults to None.
+            fallback_models (dict[str, str] | None, optional): models to retry the call with on errors, timeouts or unparsable responses by name of the node. Defaults to None, which means no fallbacks.
+            timeout (float | None, optional): timeout of a single LLM call in seconds. Defaults to None, which uses the provider's default.
+            models (ModelRegistry | None, optional): registry of chat models shared by all agents. Defaults to None, which creates a new one.
         """
-        logger.info("Initializing LLM model.")
-        self._model = init_chat_model(model)
+        self._model_name = model
+        self._node_models = node_models or {}
+        self._fallback_models = fallback_models or {}
+        self._settings = {"timeout": timeout} if timeout else {}
+        self._models = models or ModelRegistry()
+        self._model = self._models.chat_model(model, **self._settings)
+        self._scheduler = scheduler
+        self._stats = stats or Stats()
+        self._token_counter = self._models.token_counter(model, **self._settings)
 
     @abstractmethod
     def run(self, *args, **kwargs) -> Any:
         """Runs the agentic workflow."""
-        pass
+
+    @abstractmethod
+    async def arun(self, *args, **kwargs) -> Any:
+        """Runs the agentic workflow asynchronously."""
 
     @abstractmethod
     def _build_workflow(
@@ -39,25 +83,348 @@ class BaseAgent(ABC, Generic[T]):
         Returns:
             CompiledStateGraph[T, None, T, T]: execution-ready workflow.
         """
-        pass
 
-    def _invoke_structured_model(
-        self, schema: Type[K], messages: list[AnyMessage]
-    ) -> K:
-        """Invokes the LLM forcing it to return a specified type.
+    def _model_step(
+        self,
+        node: str,
+        model: Callable[[], Runnable[LanguageModelInput, tuple[str, Any]]],
+        prompt: Callable[[Any], list[AnyMessage]],
+        handle: Callable[[Any, Any], Any],
+        priority: Priority = Priority.NORMAL,
+        shortcut: Callable[[Any], Any | None] | None = None,
+    ) -> RunnableLambda:
+        """Builds a step calling the LLM, e.g. a node, that runs natively in both sync and async modes.
+
+        Only building the messages and handling the response differ between steps, and both are pure.
+
+        Args:
+            node (str): name of the node calling the LLM.
+            model (Callable[[], Runnable[LanguageModelInput, tuple[str, Any]]]): function returning the model to invoke, e.g. with bound tools.
+            prompt (Callable[[Any], list[AnyMessage]]): function building the messages from the input of the step.
+            handle (Callable[[Any, Any], Any]): function building the output of the step from its input and the response.
+            priority (Priority, optional): priority of the call in the scheduler. Defaults to Priority.NORMAL.
+            shortcut (Callable[[Any], Any | None] | None, optional): function building the output without an LLM call, None makes the call. Defaults to None.
+
+        Returns:
+            RunnableLambda: step.
+        """
+
+        def func(value: Any) -> Any:
+            output = shortcut(value) if shortcut else None
+            if output is not None:
+                return output
+
+            return handle(
+                value, self._invoke_model(model(), prompt(value), node, priority)
+            )
+
+        async def afunc(value: Any) -> Any:
+            output = shortcut(value) if shortcut else None
+            if output is not None:
+                return output
+
+            return handle(
+                value, await self._ainvoke_model(model(), prompt(value), node, priority)
+            )
+
+        return RunnableLambda(func, afunc=afunc, name=self._node_key(node).lower())
+
+    def _structured_step(
+        self,
+        schema: type[K],
+        node: str,
+        prompt: Callable[[Any], list[AnyMessage]],
+        handle: Callable[[Any, K], Any] = lambda _, response: response,
+        priority: Priority = Priority.NORMAL,
+        shortcut: Callable[[Any], Any | None] | None = None,
+    ) -> RunnableLambda:
+        """Builds a step forcing the LLM to return a specified type, that runs natively in both sync and async modes.
 
         Args:
             schema (Type[K]): type to return.
+            node (str): name of the node calling the LLM.
+            prompt (Callable[[Any], list[AnyMessage]]): function building the messages from the input of the step.
+            handle (Callable[[Any, K], Any], optional): function building the output of the step from its input and the parsed response. Defaults to returning the response.
+            priority (Priority, optional): priority of the call in the scheduler. Defaults to Priority.NORMAL.
+            shortcut (Callable[[Any], Any | None] | None, optional): function building the output without an LLM call, None makes the call. Defaults to None.
+
+        Returns:
+            RunnableLambda: step.
+        """
+        return self._model_step(
+            node,
+            lambda: self._structured_model(schema, node),
+            prompt,
+            lambda value, response: handle(value, response["parsed"]),
+            priority,
+            shortcut,
+        )
+
+    def _invoke_model(
+        self,
+        model: Runnable[LanguageModelInput, tuple[str, Any]],
+        messages: list[AnyMessage],
+        node: str,
+        priority: Priority = Priority.NORMAL,
+    ) -> Any:
+        """Invokes the LLM once the scheduler lets the call through.
+
+        Args:
+            model (Runnable[LanguageModelInput, tuple[str, Any]]): model to invoke, e.g. with bound tools, returning the name of the model that served the call along with the response.
+            messages (list[AnyMessage]): list of messages.
+            node (str): name of the node calling the LLM.
+            priority (Priority, optional): priority of the call in the scheduler. Defaults to Priority.NORMAL.
+
+        Returns:
+            Any: response.
+        """
+        slot = (
+            self._scheduler.slot(
+                self._node_model_name(node), self._estimate_tokens(messages), priority
+            )
+            if self._scheduler
+            else nullcontext()
+        )
+        with slot as ticket:
+            start = time.monotonic()
+            served_model, response = model.invoke(messages)
+            used_tokens = self._record_usage(
+                response, node, time.monotonic() - start, served_model
+            )
+            if ticket:
+                ticket.used_tokens = used_tokens
+
+        return response
+
+    async def _ainvoke_model(
+        self,
+        model: Runnable[LanguageModelInput, tuple[str, Any]],
+        messages: list[AnyMessage],
+        node: str,
+        priority: Priority = Priority.NORMAL,
+    ) -> Any:
+        """Invokes the LLM asynchronously once the scheduler lets the call through.
+
+        Args:
+            model (Runnable[LanguageModelInput, tuple[str, Any]]): model to invoke, e.g. with bound tools, returning the name of the model that served the call along with the response.
+            messages (list[AnyMessage]): list of messages.
+            node (str): name of the node calling the LLM.
+            priority (Priority, optional): priority of the call in the scheduler. Defaults to Priority.NORMAL.
+
+        Returns:
+            Any: response.
+        """
+        slot = (
+            self._scheduler.aslot(
+                self._node_model_name(node), self._estimate_tokens(messages), priority
+            )
+            if self._scheduler
+            else nullcontext()
+        )
+        async with slot as ticket:
+            start = time.monotonic()
+            served_model, response = await model.ainvoke(messages)
+            used_tokens = self._record_usage(
+                response, node, time.monotonic() - start, served_model
+            )
+            if ticket:
+                ticket.used_tokens = used_tokens
+
+        return response
+
+    def _estimate_tokens(self, messages: list[AnyMessage]) -> int:
+        """Estimates the number of tokens of a call before sending it.
+
+        Args:
             messages (list[AnyMessage]): list of messages.
 
         Returns:
-            K: response.
+            int: tokens of the messages along with the expected length of the response.
+        """
+        return self._token_counter.count_messages(messages) + OUTPUT_TOKENS_ESTIMATE
+
+    def _node_model_name(self, node: str) -> str:
+        """Returns the name of the model used by the node.
+
+        Args:
+            node (str): name of the node.
+
+        Returns:
+            str: name of the model.
+        """
+        return self._node_models.get(self._node_key(node), self._model_name)
+
+    def _node_model(
+        self,
+        node: str,
+        key: Hashable,
+        configure: Callable[[BaseChatModel], Runnable[LanguageModelInput, Any]],
+    ) -> Runnable[LanguageModelInput, tuple[str, Any]]:
+        """Returns the model used by the node, falling back to the node's fallback model on errors.
+
+        Configured models are built once and shared through the registry. Errors
+        raised by `configure`'s chain, e.g. while parsing the response, also trigger
+        the fallback.
+
+        Args:
+            node (str): name of the node.
+            key (Hashable): key of the configuration, e.g. the output schema or names of bound tools.
+            configure (Callable[[BaseChatModel], Runnable[LanguageModelInput, Any]]): function binding tools or output schema to a chat model.
+
+        Returns:
+            Runnable[LanguageModelInput, tuple[str, Any]]: configured model returning the name of the model that served the call along with the response.
         """
-        structured_llm = self._model.with_structured_output(schema)
+        primary = self._served_model(self._node_model_name(node), key, configure)
+
+        fallback_model = self._fallback_models.get(self._node_key(node))
+        if fallback_model:
+            fallback = self._served_model(fallback_model, key, configure)
+            return self._models.runnable(
+                self._node_model_name(node),
+                ("fallback", fallback_model, key),
+                lambda _: primary.with_fallbacks([fallback]),
+                **self._settings,
+            )
 
-        response = structured_llm.invoke(messages)
+        return primary
+
+    def _served_model(
+        self,
+        model: str,
+        key: Hashable,
+        configure: Callable[[BaseChatModel], Runnable[LanguageModelInput, Any]],
+    ) -> Runnable[LanguageModelInput, tuple[str, Any]]:
+        """Returns the configured model, tagging its responses with its name.
+
+        Args:
+            model (str): name of the model.
+            key (Hashable): key of the configuration.
+            configure (Callable[[BaseChatModel], Runnable[LanguageModelInput, Any]]): function binding tools or output schema to the chat model.
+
+        Returns:
+            Runnable[LanguageModelInput, tuple[str, Any]]: configured model returning its name along with the response.
+        """
+        return self._models.runnable(
+            model,
+            ("served", key),
+            lambda chat_model: (
+                configure(chat_model)
+                | RunnableLambda(lambda response: (model, response))
+            ),
+            **self._settings,
+        )
+
+    def _structured_model(
+        self, schema: type[K], node: str
+    ) -> Runnable[LanguageModelInput, tuple[str, dict]]:
+        """Returns the model returning the specified type along with the raw response.
+
+        Args:
+            schema (Type[K]): type to return.
+            node (str): name of the node calling the LLM.
+
+        Returns:
+            Runnable[LanguageModelInput, tuple[str, dict]]: model returning the name of the model that served the call along with `raw` and `parsed`.
+        """
+        return self._node_model(
+            node,
+            ("structured", schema),
+            lambda model: (
+                model.with_structured_output(schema, include_raw=True)
+                | self._validator(schema)
+            ),
+        )
+
+    @staticmethod
+    def _validator(schema: type[K]) -> RunnableLambda:
+        """Returns the step checking the structured response, so that invalid responses fail the call and trigger the fallback.
+
+        Args:
+            schema (Type[K]): type to return.
+
+        Returns:
+            RunnableLambda: step passing on valid responses.
+        """
+
+        def validate(response: dict) -> dict:
+            if response.get("parsing_error"):
+                raise response["parsing_error"]
+
+            parsed = response["parsed"]
+            if not isinstance(parsed, schema):
+                raise TypeError(f"Unexpected return type: {type(parsed)}")
 
-        if isinstance(response, schema):
             return response
-        else:
-            raise TypeError(f"Unexpected return type: {type(response)}")
+
+        return RunnableLambda(validate)
+
+    def _record_usage(
+        self, response: Any, node: str, latency: float, model: str
+    ) -> int | None:
+        """Records latency of the call and tokens it used, including input tokens served from the provider's prompt cache.
+
+        Tokens are recorded per agent, per node and per model that served the call
+        within the node, latency per node. Tokens of calls failing before the
+        fallback aren't reported by the provider's response, so they aren't recorded.
+
+        Args:
+            response (Any): response of the LLM, a message or a structured response along with the raw one.
+            node (str): name of the node calling the LLM.
+            latency (float): duration of the call in seconds.
+            model (str): name of the model that served the call, the fallback one if the node's model failed.
+
+        Returns:
+            int | None: total number of tokens or None if the response doesn't report usage.
+        """
+        node = self._node_key(node)
+        self._stats.add(f"node.{node}.calls")
+        self._stats.add(f"node.{node}.latency", latency)
+
+        message = response.get("raw") if isinstance(response, dict) else response
+        if not isinstance(message, AIMessage) or not message.usage_metadata:
+            return None
+
+        usage = message.usage_metadata
+        cached_tokens = usage.get("input_token_details", {}).get("cache_read", 0)
+        self._stats.add(f"llm.{self.name}.calls")
+        self._stats.add(f"llm.{self.name}.input_tokens", usage["input_tokens"])
+        self._stats.add(f"llm.{self.name}.output_tokens", usage["output_tokens"])
+        self._stats.add(f"llm.{self.name}.cached_tokens", cached_tokens)
+        self._stats.add(f"node.{node}.input_tokens", usage["input_tokens"])
+        self._stats.add(f"node.{node}.output_tokens", usage["output_tokens"])
+        self._stats.add(f"node.{node}.cached_tokens", cached_tokens)
+        self._stats.add(
+            f"node.{node}.served.{model}.input_tokens", usage["input_tokens"]
+        )
+        self._stats.add(
+            f"node.{node}.served.{model}.output_tokens", usage["output_tokens"]
+        )
+
+        return usage["total_tokens"]
+
+    @staticmethod
+    def _node_key(node: str) -> str:
+        """Returns the plain name of the node, e.g. the value of a node enum.
+
+        Args:
+            node (str): name of the node.
+
+        Returns:
+            str: name of the node.
+        """
+        return node.value if isinstance(node, Enum) else node
+
+    @staticmethod
+    def _node(
+        func: Callable[[T], Any], afunc: Callable[[T], Awaitable[Any]]
+    ) -> RunnableLambda:
+        """Joins sync and async implementations of a node, so that the workflow runs natively in both modes.
+
+        Args:
+            func (Callable[[T], Any]): implementation used by `invoke` and `batch`.
+            afunc (Callable[[T], Awaitable[Any]]): implementation used by `ainvoke` and `abatch`.
+
+        Returns:
+            RunnableLambda: node of the workflow.
+        """
+        return RunnableLambda(func, afunc=afunc, name=func.__name__)
@@ -1,20 +1,45 @@
-from langchain_core.messages import HumanMessage, SystemMessage
+import logging
+
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
 from web_crawler.agents.base_agent import BaseAgent
 from web_crawler.agents.critic import CriticAgentNode, CriticAgentState
+from web_crawler.agents.critic.output_structures import WebsiteCritiqueList
 from web_crawler.agents.output_structures import Critique, Website, WebsiteCritique
+from web_crawler.budget import ContentBudgeter
+from web_crawler.cache import CritiqueCache
+from web_crawler.loading import normalize_url
+from web_crawler.models import ModelRegistry
+from web_crawler.scheduling import LLMScheduler, Priority
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 10
+BATCH_PROMPT = """Critique each of the websites below separately. Return exactly one critique per website, identified by its URL."""
 
 
 class CriticAgent(BaseAgent[CriticAgentState]):
     """AI agent meant to critique suitability of websites for a given task."""
 
+    name = "critic"
+
     def __init__(
         self,
         description_prompt: str,
         introduction_prompt: str,
         model: str = "openai:gpt-4o",
+        max_input_tokens: int | None = None,
+        cache: CritiqueCache | None = None,
+        stats: Stats | None = None,
+        scheduler: LLMScheduler | None = None,
+        batch_tokens: int | None = None,
+        node_models: dict[str, str] | None = None,
+        fallback_models: dict[str, str] | None = None,
+        timeout: float | None = None,
+        models: ModelRegistry | None = None,
     ) -> None:
         """Initializes the Agent's workflow graph and LLM model.
 
@@ -22,14 +47,44 @@ class CriticAgent(BaseAgent[CriticAgentState]):
             description_prompt (str): description of the product.
             introduction_prompt (str): prompt to use as an introduction of the role of the critic.
             model (str, optional): LLM model to use as foundation for agents. Defaults to "openai:gpt-4o".
+            max_input_tokens (int | None, optional): max number of tokens of a single website's content sent to the model. Defaults to None, which means no limit.
+            cache (CritiqueCache | None, optional): persistent cache of critiques. Defaults to None, which disables caching.
+            stats (Stats | None, optional): counters to record token usage, trimmed tokens and cache hits in. Defaults to None.
+            scheduler (LLMScheduler | None, optional): scheduler of LLM calls shared by all agents. Defaults to None, which means calling the LLM right away.
+            batch_tokens (int | None, optional): max number of tokens of websites' contents critiqued together in a single call; websites that don't fit are critiqued one by one. Defaults to None, which disables batching.
+            node_models (dict[str, str] | None, optional): models to use instead of `model` by node, e.g. "CRITIQUE". Defaults to None.
+            fallback_models (dict[str, str] | None, optional): models to retry the call with on errors, timeouts or unparsable responses by node. Defaults to None, which means no fallbacks.
+            timeout (float | None, optional): timeout of a single LLM call in seconds. Defaults to None, which uses the provider's default.
+            models (ModelRegistry | None, optional): registry of chat models shared by all agents. Defaults to None, which creates a new one.
         """
-        super().__init__(model)
+        super().__init__(
+            model, scheduler, stats, node_models, fallback_models, timeout, models
+        )
         self._description_prompt = description_prompt
         self._introduction_prompt = introduction_prompt
+        self._cache = cache
+        self._batch_tokens = batch_tokens
+        self._budgeter = (
+            ContentBudgeter(
+                self._token_counter,
+                max_input_tokens,
+                reference=description_prompt,
+                stats=self._stats,
+            )
+            if max_input_tokens
+            else None
+        )
         self._workflow = self._build_workflow()
+        self._batch_critic = self._structured_step(
+            WebsiteCritiqueList,
+            CriticAgentNode.CRITIQUE,
+            self._batch_messages,
+            lambda _, response: response.critiques,
+            Priority.LOW,
+        )
 
     def run(self, websites: list[Website]) -> list[WebsiteCritique]:
-        """Runs the Agent.
+        """Runs the Agent. Only websites without a cached critique are sent to the LLM.
 
         Args:
             websites (list[Website]): list of websites to critique.
@@ -37,25 +92,268 @@ class CriticAgent(BaseAgent[CriticAgentState]):
         Returns:
             list[WebsiteCritique]: critiques.
         """
+        contents, keys, results, misses = self._lookup(websites)
+
+        batches = self._batches(contents, misses)
+        if batches:
+            batch_responses = self._batch_critic.batch(
+                [self._batch_websites(websites, contents, batch) for batch in batches],
+                return_exceptions=True,
+            )
+            misses = self._match(websites, contents, results, batches, batch_responses)
+
         responses: list[CriticAgentState] = self._workflow.batch(
-            [
-                {
-                    "website": website.content,
-                }
-                for website in websites
-            ],
+            [{"website": contents[i]} for i in misses],
+            {"recursion_limit": 200},
+            return_exceptions=True,
+        )
+
+        return self._collect(websites, keys, results, misses, responses)
+
+    async def arun(self, websites: list[Website]) -> list[WebsiteCritique]:
+        """Runs the Agent asynchronously. Only websites without a cached critique are sent to the LLM.
+
+        Args:
+            websites (list[Website]): list of websites to critique.
+
+        Returns:
+            list[WebsiteCritique]: critiques.
+        """
+        contents, keys, results, misses = self._lookup(websites)
+
+        batches = self._batches(contents, misses)
+        if batches:
+            batch_responses = await self._batch_critic.abatch(
+                [self._batch_websites(websites, contents, batch) for batch in batches],
+                return_exceptions=True,
+            )
+            misses = self._match(websites, contents, results, batches, batch_responses)
+
+        responses: list[CriticAgentState] = await self._workflow.abatch(
+            [{"website": contents[i]} for i in misses],
             {"recursion_limit": 200},
             return_exceptions=True,
         )
 
+        return self._collect(websites, keys, results, misses, responses)
+
+    def _lookup(
+        self, websites: list[Website]
+    ) -> tuple[list[str], list[str], list[Critique | None], list[int]]:
+        """Fits contents of websites into the token budget and looks up their cached critiques.
+
+        Args:
+            websites (list[Website]): list of websites to critique.
+
+        Returns:
+            tuple[list[str], list[str], list[Critique | None], list[int]]: contents to send to the LLM, cache keys of their single critiques, cached critiques and indices of websites without one.
+        """
+        contents = [
+            self._budgeter.fit(website.content) if self._budgeter else website.content
+            for website in websites
+        ]
+        keys = [self._cache_key(content) for content in contents]
+        results: list[Critique | None] = [self._cached(content) for content in contents]
+        misses = [i for i, result in enumerate(results) if result is None]
+
+        if self._cache:
+            self._stats.add("critique_cache.checked", len(websites))
+            self._stats.add("critique_cache.hits", len(websites) - len(misses))
+            self._stats.add("critique_cache.misses", len(misses))
+
+        return contents, keys, results, misses
+
+    def _batches(self, contents: list[str], misses: list[int]) -> list[list[int]]:
+        """Packs websites into batches fitting within the token budget.
+
+        Args:
+            contents (list[str]): contents to send to the LLM.
+            misses (list[int]): indices of websites without a cached critique.
+
+        Returns:
+            list[list[int]]: batches of indices of websites, only those with more than one website.
+        """
+        if not self._batch_tokens:
+            return []
+
+        batches: list[list[int]] = []
+        batch: list[int] = []
+        batch_tokens = 0
+        for i in misses:
+            tokens = self._token_counter.count(contents[i])
+            if batch and (
+                batch_tokens + tokens > self._batch_tokens
+                or len(batch) == MAX_BATCH_SIZE
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(i)
+            batch_tokens += tokens
+        batches.append(batch)
+
+        return [batch for batch in batches if len(batch) > 1]
+
+    @staticmethod
+    def _batch_websites(
+        websites: list[Website], contents: list[str], batch: list[int]
+    ) -> list[Website]:
+        """Pairs websites in the batch with contents to send to the LLM.
+
+        Args:
+            websites (list[Website]): list of websites to critique.
+            contents (list[str]): contents to send to the LLM.
+            batch (list[int]): indices of websites in the batch.
+
+        Returns:
+            list[Website]: websites in the batch.
+        """
+        return [Website(header=websites[i].header, content=contents[i]) for i in batch]
+
+    def _match(
+        self,
+        websites: list[Website],
+        contents: list[str],
+        results: list[Critique | None],
+        batches: list[list[int]],
+        responses: list[list[WebsiteCritique] | Exception],
+    ) -> list[int]:
+        """Matches critiques of batches with websites by URL and caches them.
+
+        Args:
+            websites (list[Website]): list of critiqued websites.
+            contents (list[str]): contents sent to the LLM.
+            results (list[Critique | None]): critiques, filled in place.
+            batches (list[list[int]]): batches of indices of websites.
+            responses (list[list[WebsiteCritique] | Exception]): critiques of the batches.
+
+        Returns:
+            list[int]: indices of websites still without a critique, to critique one by one.
+        """
+        for batch, response in zip(batches, responses):
+            self._stats.add("critique.batches")
+            if isinstance(response, Exception):
+                logger.warning(
+                    f"Failed to critique a batch of {len(batch)} websites, "
+                    f"falling back to single websites: {response!r}"
+                )
+                self._stats.add("critique.batch_fallbacks", len(batch))
+                continue
+
+            critiques = {
+                normalize_url(critique.website.link): critique.critique
+                for critique in response
+            }
+            for i in batch:
+                critique = critiques.get(normalize_url(websites[i].header.link))
+                if critique is None:
+                    self._stats.add("critique.batch_fallbacks")
+                    continue
+
+                self._stats.add("critique.batched_websites")
+                results[i] = critique
+                if self._cache:
+                    self._cache.put(
+                        self._cache_key(contents[i], BATCH_PROMPT), critique
+                    )
+
+        return [i for i, result in enumerate(results) if result is None]
+
+    def _collect(
+        self,
+        websites: list[Website],
+        keys: list[str],
+        results: list[Critique | None],
+        misses: list[int],
+        responses: list[CriticAgentState | Exception],
+    ) -> list[WebsiteCritique]:
+        """Caches new critiques and joins them with the cached ones.
+
+        Args:
+            websites (list[Website]): list of critiqued websites.
+            keys (list[str]): cache keys of single critiques of the websites.
+            results (list[Critique | None]): cached critiques.
+            misses (list[int]): indices of websites sent to the LLM.
+            responses (list[CriticAgentState | Exception]): final states of the workflow for websites sent to the LLM.
+
+        Returns:
+            list[WebsiteCritique]: critiques.
+        """
+        for i, response in zip(misses, responses):
+            if isinstance(response, Exception):
+                logger.warning(
+                    f"Failed to critique {websites[i].header.link}: {response!r}"
+                )
+                continue
+
+            results[i] = response["critique"]
+            if self._cache:
+                self._cache.put(keys[i], response["critique"])
+
         critiques = [
-            WebsiteCritique(website=website.header, critique=response["critique"])
-            for website, response in zip(websites, responses)
-            if not isinstance(response, Exception)
+            WebsiteCritique(website=website.header, critique=result)
+            for website, result in zip(websites, results)
+            if result is not None
         ]
 
         return critiques
 
+    def _batch_messages(self, websites: list[Website]) -> list[AnyMessage]:
+        """Builds messages asking to critique a batch of websites.
+
+        Args:
+            websites (list[Website]): websites in the batch.
+
+        Returns:
+            list[AnyMessage]: messages.
+        """
+        pages = "\n\n".join(
+            f"URL: {website.header.link}\n{website.content}" for website in websites
+        )
+
+        return [
+            SystemMessage(self._description_prompt),
+            SystemMessage(self._introduction_prompt),
+            HumanMessage(f"{BATCH_PROMPT}\n\n{pages}"),
+        ]
+
+    def _cached(self, content: str) -> Critique | None:
+        """Looks up the cached critique of the content, critiqued alone or, with batching, in a batch.
+
+        Args:
+            content (str): website content sent to the LLM.
+
+        Returns:
+            Critique | None: critique or None if it's not cached.
+        """
+        if not self._cache:
+            return None
+
+        prompts = ["", BATCH_PROMPT] if self._batch_tokens else [""]
+        for prompt in prompts:
+            critique = self._cache.get(self._cache_key(content, prompt))
+            if critique is not None:
+                return critique
+
+        return None
+
+    def _cache_key(self, content: str, prompt: str = "") -> str:
+        """Computes the cache key of the critique of the content.
+
+        Args:
+            content (str): website content sent to the LLM.
+            prompt (str, optional): prompt asking for the critique, BATCH_PROMPT for critiques of batches. Defaults to "", which means the website was critiqued alone.
+
+        Returns:
+            str: cache key.
+        """
+        return CritiqueCache.key(
+            self._description_prompt,
+            self._introduction_prompt,
+            prompt,
+            self._node_model_name(CriticAgentNode.CRITIQUE),
+            content,
+        )
+
     def _build_workflow(
         self,
     ) -> CompiledStateGraph[CriticAgentState, None, CriticAgentState, CriticAgentState]:
@@ -68,7 +366,16 @@ class CriticAgent(BaseAgent[CriticAgentState]):
 
         workflow_graph.add_node(CriticAgentNode.DESCRIPTION, self._description)
         workflow_graph.add_node(CriticAgentNode.INTRODUCTION, self._introduce)
-        workflow_graph.add_node(CriticAgentNode.CRITIQUE, self._criticize)
+        workflow_graph.add_node(
+            CriticAgentNode.CRITIQUE,
+            self._structured_step(
+                Critique,
+                CriticAgentNode.CRITIQUE,
+                lambda state: state["messages"] + [HumanMessage(state["website"])],
+                lambda _, response: {"critique": response},
+                Priority.LOW,
+            ),
+        )
 
         workflow_graph.add_edge(START, CriticAgentNode.DESCRIPTION)
         workflow_graph.add_edge(
@@ -77,7 +384,8 @@ class CriticAgent(BaseAgent[CriticAgentState]):
         workflow_graph.add_edge(CriticAgentNode.INTRODUCTION, CriticAgentNode.CRITIQUE)
         workflow_graph.add_edge(CriticAgentNode.CRITIQUE, END)
 
-        workflow = workflow_graph.compile()
+        # Keeps page contents out of the Search agent's checkpoints, its node reruns as a whole on resume.
+        workflow = workflow_graph.compile(checkpointer=False)
 
         return workflow
 
@@ -96,18 +404,3 @@ class CriticAgent(BaseAgent[CriticAgentState]):
             CriticAgentState: update to the state of the Agent.
         """
         return {"messages": [SystemMessage(self._introduction_prompt)]}
-
-    def _criticize(self, state: CriticAgentState) -> CriticAgentState:
-        """Critiques the candidate website.
-
-        Args:
-            state (CriticAgentState): state of the Agent.
-
-        Returns:
-            CriticAgentState: update to the state of the Agent.
-        """
-        response = self._invoke_structured_model(
-            Critique, state["messages"] + [HumanMessage(state["website"])]
-        )
-
-        return {"critique": response}
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+from web_crawler.agents.output_structures import WebsiteCritique
+
+
+class WebsiteCritiqueList(BaseModel):
+    """Critiques of a batch of websites."""
+
+    critiques: list[WebsiteCritique] = Field(
+        description="one critique for each website, identified by its URL"
+    )
@@ -19,10 +19,13 @@ class WebsiteChoice(BaseModel):
 
     website: WebsiteHeader = Field(description="website")
     justification: str = Field(description="why it's a good place for our purposes")
+    score: int = Field(
+        description="suitability score from 1 (barely suitable) to 10 (perfect fit)"
+    )
 
 
 class WebsiteChoiceList(BaseModel):
-    """List of Website choices."""
+    """List of Website choices, ranked from the best one."""
 
     websites: list[WebsiteChoice] = Field(description="list of picked websites")
 
@@ -0,0 +1,4 @@
+from web_crawler.agents.planner.node import PlannerAgentNode
+from web_crawler.agents.planner.state import PlannerAgentState
+
+__all__ = ["PlannerAgentNode", "PlannerAgentState"]
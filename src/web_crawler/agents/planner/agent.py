@@ -0,0 +1,230 @@
+import logging
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.state import CompiledStateGraph
+
+from web_crawler.agents.base_agent import BaseAgent
+from web_crawler.agents.planner import PlannerAgentNode, PlannerAgentState
+from web_crawler.agents.planner.output_structures import QueryPlan
+from web_crawler.keywords import keywords, similarity
+from web_crawler.models import ModelRegistry
+from web_crawler.scheduling import LLMScheduler, Priority
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+PLAN_PROMPT = """Write {count} web search queries."""
+
+PLANNED_QUERIES_PROMPT = """Queries already planned, don't repeat them or their close variants:
+{queries}"""
+
+
+class PlannerAgent(BaseAgent[PlannerAgentState]):
+    """AI agent meant to plan diverse search queries once for all runs of a crawl.
+
+    Queries sharing too many keywords with already planned ones are rejected and
+    the model is asked for more, listing the planned queries, until enough
+    distinct queries are planned.
+    """
+
+    name = "planner"
+
+    def __init__(
+        self,
+        description_prompt: str,
+        introduction_prompt: str,
+        model: str = "openai:gpt-4o",
+        max_similarity: float = 0.5,
+        max_rounds: int = 3,
+        scheduler: LLMScheduler | None = None,
+        stats: Stats | None = None,
+        node_models: dict[str, str] | None = None,
+        fallback_models: dict[str, str] | None = None,
+        timeout: float | None = None,
+        models: ModelRegistry | None = None,
+    ) -> None:
+        """Initializes the Agent's workflow graph and LLM model.
+
+        Args:
+            description_prompt (str): description of the product.
+            introduction_prompt (str): prompt to use as an introduction of the role of the planner.
+            model (str, optional): LLM model to use as foundation for agents. Defaults to "openai:gpt-4o".
+            max_similarity (float, optional): Jaccard similarity of keywords above which a query is a near-duplicate of a planned one. Defaults to 0.5.
+            max_rounds (int, optional): max number of calls asking for queries. Defaults to 3.
+            scheduler (LLMScheduler | None, optional): scheduler of LLM calls shared by all agents. Defaults to None, which means calling the LLM right away.
+            stats (Stats | None, optional): counters to record token usage in. Defaults to None.
+            node_models (dict[str, str] | None, optional): models to use instead of `model` by node, e.g. "PLAN". Defaults to None.
+            fallback_models (dict[str, str] | None, optional): models to retry the call with on errors, timeouts or unparsable responses by node. Defaults to None, which means no fallbacks.
+            timeout (float | None, optional): timeout of a single LLM call in seconds. Defaults to None, which uses the provider's default.
+            models (ModelRegistry | None, optional): registry of chat models shared by all agents. Defaults to None, which creates a new one.
+        """
+        super().__init__(
+            model, scheduler, stats, node_models, fallback_models, timeout, models
+        )
+        self._description_prompt = description_prompt
+        self._introduction_prompt = introduction_prompt
+        self._max_similarity = max_similarity
+        self._max_rounds = max_rounds
+        self._workflow = self._build_workflow()
+
+    def run(self, count: int) -> list[str]:
+        """Runs the Agent.
+
+        Args:
+            count (int): number of queries to plan.
+
+        Returns:
+            list[str]: distinct queries, fewer if the model ran out of ideas.
+        """
+        response: PlannerAgentState = self._workflow.invoke(
+            {"count": count, "queries": [], "rounds": 0}, {"recursion_limit": 200}
+        )
+
+        return response["queries"]
+
+    async def arun(self, count: int) -> list[str]:
+        """Runs the Agent asynchronously.
+
+        Args:
+            count (int): number of queries to plan.
+
+        Returns:
+            list[str]: distinct queries, fewer if the model ran out of ideas.
+        """
+        response: PlannerAgentState = await self._workflow.ainvoke(
+            {"count": count, "queries": [], "rounds": 0}, {"recursion_limit": 200}
+        )
+
+        return response["queries"]
+
+    def _build_workflow(
+        self,
+    ) -> CompiledStateGraph[
+        PlannerAgentState, None, PlannerAgentState, PlannerAgentState
+    ]:
+        """Builds and compiles the workflow.
+
+        Returns:
+            CompiledStateGraph[PlannerAgentState, None, PlannerAgentState, PlannerAgentState]: execution-ready workflow.
+        """
+        workflow_graph = StateGraph(PlannerAgentState)
+
+        workflow_graph.add_node(PlannerAgentNode.DESCRIPTION, self._description)
+        workflow_graph.add_node(PlannerAgentNode.INTRODUCTION, self._introduce)
+        workflow_graph.add_node(
+            PlannerAgentNode.PLAN,
+            self._structured_step(
+                QueryPlan,
+                PlannerAgentNode.PLAN,
+                lambda state: state["messages"] + self._request(state),
+                self._merge,
+                Priority.HIGH,
+            ),
+        )
+
+        workflow_graph.add_edge(START, PlannerAgentNode.DESCRIPTION)
+        workflow_graph.add_edge(
+            PlannerAgentNode.DESCRIPTION, PlannerAgentNode.INTRODUCTION
+        )
+        workflow_graph.add_edge(PlannerAgentNode.INTRODUCTION, PlannerAgentNode.PLAN)
+        workflow_graph.add_conditional_edges(
+            PlannerAgentNode.PLAN,
+            self._decide_loop,
+            {
+                PlannerAgentNode.PLAN: PlannerAgentNode.PLAN,
+                PlannerAgentNode.END: END,
+            },
+        )
+
+        workflow = workflow_graph.compile(checkpointer=False)
+
+        return workflow
+
+    def _description(self, _: PlannerAgentState) -> PlannerAgentState:
+        """Introduces the description as context.
+
+        Returns:
+            PlannerAgentState: update to the state of the Agent
+        """
+        return {"messages": [SystemMessage(self._description_prompt)]}
+
+    def _introduce(self, _: PlannerAgentState) -> PlannerAgentState:
+        """Introduces the LLM to its task.
+
+        Returns:
+            PlannerAgentState: update to the state of the Agent.
+        """
+        return {"messages": [SystemMessage(self._introduction_prompt)]}
+
+    @staticmethod
+    def _request(state: PlannerAgentState) -> list[HumanMessage]:
+        """Creates messages asking for the missing queries.
+
+        Args:
+            state (PlannerAgentState): state of the Agent.
+
+        Returns:
+            list[HumanMessage]: messages.
+        """
+        messages = [
+            HumanMessage(
+                PLAN_PROMPT.format(count=state["count"] - len(state["queries"]))
+            )
+        ]
+        if state["queries"]:
+            messages.append(
+                HumanMessage(
+                    PLANNED_QUERIES_PROMPT.format(queries="\n".join(state["queries"]))
+                )
+            )
+
+        return messages
+
+    def _merge(self, state: PlannerAgentState, plan: QueryPlan) -> PlannerAgentState:
+        """Adds queries that aren't near-duplicates of planned ones.
+
+        Args:
+            state (PlannerAgentState): state of the Agent.
+            plan (QueryPlan): queries proposed by the model.
+
+        Returns:
+            PlannerAgentState: update to the state of the Agent.
+        """
+        queries = list(state["queries"])
+        planned_keywords = [keywords(query) for query in queries]
+        for query in plan.queries:
+            query_keywords = keywords(query)
+            if not query_keywords or any(
+                similarity(query_keywords, other) > self._max_similarity
+                for other in planned_keywords
+            ):
+                self._stats.add("planner.rejected_queries")
+                continue
+
+            queries.append(query)
+            planned_keywords.append(query_keywords)
+            if len(queries) == state["count"]:
+                break
+
+        return {"queries": queries, "rounds": state["rounds"] + 1}
+
+    def _decide_loop(self, state: PlannerAgentState) -> PlannerAgentNode:
+        """Decides whether to ask for more queries.
+
+        Args:
+            state (PlannerAgentState): state of the Agent.
+
+        Returns:
+            PlannerAgentNode: next node to go to.
+        """
+        if len(state["queries"]) >= state["count"]:
+            return PlannerAgentNode.END
+
+        if state["rounds"] == self._max_rounds:
+            logger.warning(
+                f"Planned only {len(state['queries'])} of {state['count']} distinct queries."
+            )
+            return PlannerAgentNode.END
+
+        return PlannerAgentNode.PLAN
@@ -0,0 +1,11 @@
+from enum import Enum
+
+from langgraph.graph import END, START
+
+
+class PlannerAgentNode(str, Enum):
+    DESCRIPTION = "DESCRIPTION"
+    INTRODUCTION = "INTRODUCTION"
+    PLAN = "PLAN"
+    START = START
+    END = END
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+
+class QueryPlan(BaseModel):
+    """Search queries approaching the topic from different angles."""
+
+    queries: list[str] = Field(description="list of diverse web search queries")
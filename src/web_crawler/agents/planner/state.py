@@ -0,0 +1,9 @@
+from langchain.agents import AgentState
+
+
+class PlannerAgentState(AgentState):
+    """Extended state of the Agent."""
+
+    count: int
+    queries: list[str]
+    rounds: int
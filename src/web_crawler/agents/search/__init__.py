@@ -1,4 +1,4 @@
 from web_crawler.agents.search.node import SearchAgentNode
-from web_crawler.agents.search.state import SearchAgentState
+from web_crawler.agents.search.state import PageRef, SearchAgentState
 
-__all__ = ["SearchAgentNode", "SearchAgentState"]
+__all__ = ["PageRef", "SearchAgentNode", "SearchAgentState"]
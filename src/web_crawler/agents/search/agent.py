@@ -1,27 +1,103 @@
+import asyncio
 import logging
+import queue
+import threading
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
 
 import requests
-from bs4 import BeautifulSoup
 from langchain.tools import BaseTool
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+)
+from langchain_core.output_parsers.openai_tools import PydanticToolsParser
+from langchain_core.runnables import (
+    Runnable,
+    RunnableConfig,
+    RunnableLambda,
+    RunnableParallel,
+    RunnablePassthrough,
+)
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import ToolNode
+from langgraph.types import StateSnapshot
 from more_itertools import unique_everseen
 
-from web_crawler.agents.base_agent import BaseAgent
+from web_crawler.agents.base_agent import BaseAgent, K
 from web_crawler.agents.critic.agent import CriticAgent
-from web_crawler.agents.output_structures import Website, WebsiteChoice
-from web_crawler.agents.search import SearchAgentNode, SearchAgentState
+from web_crawler.agents.output_structures import (
+    Website,
+    WebsiteChoice,
+    WebsiteCritique,
+    WebsiteHeader,
+)
+from web_crawler.agents.planner.agent import PlannerAgent
+from web_crawler.agents.search import PageRef, SearchAgentNode, SearchAgentState
 from web_crawler.agents.search.output_structures import LoopDecision, WebsitesToLoad
 from web_crawler.agents.selector.agent import SelectorAgent
+from web_crawler.cache import PageCache, SqliteCheckpointer
+from web_crawler.contents import ContentStore
+from web_crawler.dedupe import PageDeduplicator
+from web_crawler.loading import (
+    ContentExtractor,
+    PageFetcher,
+    canonicalize_url,
+    get_extractor,
+    normalize_url,
+)
+from web_crawler.models import ModelRegistry
+from web_crawler.registry import CritiqueRegistry
+from web_crawler.scheduling import LLMScheduler, Priority
+from web_crawler.stats import Stats
+from web_crawler.stopping import YieldStopPolicy
+from web_crawler.triage import PageTriage
 
 logger = logging.getLogger(__name__)
 
+COMPACTED_HISTORY_PROMPT = """Summary of earlier search iterations.
+Queries already tried: {queries}
+Domains already covered: {domains}
+Websites critiqued so far: {critiqued}"""
+
+STOP_KEY = "stop"
+"""Key of the config holding the event set once the consumer stops listening to the streamed run."""
+
+TAKEN_QUERIES_PROMPT = """Queries already planned for all runs, search for something else:
+{queries}"""
+
+
+Run = tuple[CompiledStateGraph, int, SearchAgentState | None, RunnableConfig]
+"""Workflow running the run, ID of the run, its initial state, None resumes it from the checkpoint, and its config."""
+
+
+@dataclass
+class StreamedItems:
+    """Record of items already yielded by a stream of the Agent."""
+
+    choices: set[str] = field(default_factory=set)
+    """Canonical links of yielded websites."""
+    critiques: dict[str, WebsiteCritique] = field(default_factory=dict)
+    """Critiques seen in updates of all runs by canonical link."""
+
 
 class SearchAgent(BaseAgent[SearchAgentState]):
     """AI agent meant to search the Web for marketing purposes."""
 
+    name = "search"
+
     def __init__(
         self,
         search_tool: BaseTool,
@@ -34,6 +110,24 @@ class SearchAgent(BaseAgent[SearchAgentState]):
         model: str = "openai:gpt-4o",
         min_iterations: int = 2,
         max_iterations: int = 5,
+        fetcher: PageFetcher | None = None,
+        page_cache: PageCache | None = None,
+        extractor: ContentExtractor | None = None,
+        deduplicator: PageDeduplicator | None = None,
+        registry: CritiqueRegistry | None = None,
+        scheduler: LLMScheduler | None = None,
+        stats: Stats | None = None,
+        max_history_tokens: int | None = None,
+        triage: PageTriage | None = None,
+        node_models: dict[str, str] | None = None,
+        fallback_models: dict[str, str] | None = None,
+        timeout: float | None = None,
+        models: ModelRegistry | None = None,
+        checkpointer: SqliteCheckpointer | None = None,
+        global_selection: bool = False,
+        content_store: ContentStore | None = None,
+        stop_policy: YieldStopPolicy | None = None,
+        planner: PlannerAgent | None = None,
     ) -> None:
         """Initializes the Agent's workflow graph and LLM model.
 
@@ -48,12 +142,44 @@ class SearchAgent(BaseAgent[SearchAgentState]):
             decide_loop_prompt (str): prompt used to decide on loop.
             min_iterations (int, optional): minimum number of iterations of the search loop. Defaults to 2.
             max_iterations (int, optional): maximum number of iterations of the search loop. Defaults to 5.
+            fetcher (PageFetcher | None, optional): shared HTTP client used to load websites. Defaults to None, which creates a new one.
+            page_cache (PageCache | None, optional): cache of website contents. Defaults to None, which disables caching.
+            extractor (ContentExtractor | None, optional): extractor of text from loaded websites. Defaults to None, which uses the lxml-based one.
+            deduplicator (PageDeduplicator | None, optional): registry of seen website contents shared by all runs. Defaults to None, which creates a new one.
+            registry (CritiqueRegistry | None, optional): registry of picked websites and their critiques shared by all runs. Defaults to None, which creates a new one.
+            scheduler (LLMScheduler | None, optional): scheduler of LLM calls shared by all agents. Defaults to None, which means calling the LLM right away.
+            stats (Stats | None, optional): counters to record token usage and latency in. Defaults to None.
+            max_history_tokens (int | None, optional): number of tokens of the message history above which earlier iterations are compacted into a summary of tried queries and covered domains. Defaults to None, which means no limit.
+            triage (PageTriage | None, optional): cheap checks rejecting websites not worth a critique. Defaults to None, which critiques all loaded websites.
+            node_models (dict[str, str] | None, optional): models to use instead of `model` by node, e.g. "SEARCH", "SELECT_PAGE" or "DECIDE_LOOP". Defaults to None.
+            fallback_models (dict[str, str] | None, optional): models to retry the call with on errors, timeouts or unparsable responses by node. Defaults to None, which means no fallbacks.
+            timeout (float | None, optional): timeout of a single LLM call in seconds. Defaults to None, which uses the provider's default.
+            models (ModelRegistry | None, optional): registry of chat models shared by all agents. Defaults to None, which creates a new one.
+            checkpointer (SqliteCheckpointer | None, optional): store of checkpoints saved after every node, letting interrupted runs resume. Loaded websites are checkpointed without their contents, which resumed runs load again through the page cache. Defaults to None, which disables checkpointing.
+            global_selection (bool, optional): whether runs only gather critiques and the Selector picks from a single pool of critiques of all runs, instead of every run selecting on its own. Defaults to False.
+            content_store (ContentStore | None, optional): store of loaded website contents shared by all runs, the state only refers to them. Defaults to None, which creates a new one.
+            stop_policy (YieldStopPolicy | None, optional): local policy deciding whether to continue the search loop after `min_iterations` from the yield of its iterations. Defaults to None, which asks the LLM.
+            planner (PlannerAgent | None, optional): agent planning diverse queries once for all runs, every run searches for its own ones in its first `min_iterations` iterations and asks the LLM for new ones in later iterations. Needs `search_tool` to take a single required string argument. Defaults to None, which lets runs come up with queries as they go.
         """
         assert min_iterations <= max_iterations, (
             "min_iterations must be smaller than max_iterations"
         )
-        super().__init__(model)
+        self._query_argument = self._query_argument_of(search_tool)
+        if planner and not self._query_argument:
+            raise ValueError(
+                f"Planned queries need the search tool {search_tool.name} to take a single required string argument."
+            )
+
+        super().__init__(
+            model, scheduler, stats, node_models, fallback_models, timeout, models
+        )
         self._search_tool = search_tool
+        self._tools = [search_tool, WebsitesToLoad, LoopDecision]
+        self._tool_names = (
+            search_tool.name,
+            WebsitesToLoad.__name__,
+            LoopDecision.__name__,
+        )
         self._min_iterations = min_iterations
         self._max_iterations = max_iterations
         self._critic = critic
@@ -62,39 +188,591 @@ class SearchAgent(BaseAgent[SearchAgentState]):
         self._search_prompt = search_prompt
         self._select_page_prompt = select_page_prompt
         self._decide_loop_prompt = decide_loop_prompt
+        self._fetcher = fetcher or PageFetcher()
+        self._page_cache = page_cache
+        self._extractor = extractor or get_extractor()
+        self._deduplicator = deduplicator or PageDeduplicator()
+        self._registry = registry or CritiqueRegistry()
+        self._max_history_tokens = max_history_tokens
+        self._triage = triage
+        self._checkpointer = checkpointer
+        self._global_selection = global_selection
+        self._content_store = content_store or ContentStore(stats=self._stats)
+        self._stop_policy = stop_policy
+        self._planner = planner
+        self._critiquer = self._build_critiquer()
         self._workflow = self._build_workflow()
+        self._runner = RunnableLambda(self._invoke_run, afunc=self._ainvoke_run)
 
-    def run(self, tries: int = 1) -> list[WebsiteChoice]:
+    def run(self, tries: int = 1, crawl_id: str | None = None) -> list[WebsiteChoice]:
         """Runs the Agent.
 
         Args:
             tries (int, optional): how many times to run the agent. Defaults to 1.
+            crawl_id (str | None, optional): ID of the crawl whose checkpointed runs to resume. Defaults to None, which starts a new crawl.
 
         Returns:
             list[WebsiteChoice]: suitable websites and justifications for their suitability.
         """
         logger.info("Running the Agent.")
 
-        inputs = [
+        inputs, configs = self._runs(tries, crawl_id)
+        self._plan(inputs)
+        try:
+            responses = self._successful(
+                self._runner.batch(
+                    self._run_inputs(self._workflow, inputs, configs),
+                    return_exceptions=True,
+                )
+            )
+        finally:
+            self._registry.release()
+        if self._global_selection:
+            return self._selector.run(self._pool_runs(responses)).websites
+
+        return self._aggregate(responses)
+
+    async def arun(
+        self, tries: int = 1, crawl_id: str | None = None
+    ) -> list[WebsiteChoice]:
+        """Runs the Agent asynchronously.
+
+        Args:
+            tries (int, optional): how many times to run the agent. Defaults to 1.
+            crawl_id (str | None, optional): ID of the crawl whose checkpointed runs to resume. Defaults to None, which starts a new crawl.
+
+        Returns:
+            list[WebsiteChoice]: suitable websites and justifications for their suitability.
+        """
+        logger.info("Running the Agent.")
+
+        inputs, configs = self._runs(tries, crawl_id)
+        await self._aplan(inputs)
+        try:
+            async with self._aworkflow() as workflow:
+                responses = self._successful(
+                    await self._runner.abatch(
+                        self._run_inputs(workflow, inputs, configs),
+                        return_exceptions=True,
+                    )
+                )
+        finally:
+            self._registry.release()
+        if self._global_selection:
+            return (await self._selector.arun(self._pool_runs(responses))).websites
+
+        return self._aggregate(responses)
+
+    def stream(
+        self, tries: int = 1, critiques: bool = False, crawl_id: str | None = None
+    ) -> Iterator[WebsiteChoice | WebsiteCritique]:
+        """Runs the Agent, yielding websites selected by every run as soon as the run finishes.
+
+        With global selection, websites are yielded once all runs finish. Closing the
+        stream early stops the runs, cancelling websites still to load.
+
+        Args:
+            tries (int, optional): how many times to run the agent. Defaults to 1.
+            critiques (bool, optional): whether to also yield critiques of websites as soon as they are computed. Defaults to False.
+            crawl_id (str | None, optional): ID of the crawl whose checkpointed runs to resume. Defaults to None, which starts a new crawl.
+
+        Yields:
+            WebsiteChoice | WebsiteCritique: unique selected websites and, optionally, unique critiques.
+        """
+        logger.info("Streaming the Agent.")
+
+        events: queue.Queue[tuple[int, Any]] = queue.Queue()
+        stop = threading.Event()
+        streamed = StreamedItems()
+
+        inputs, configs = self._runs(tries, crawl_id)
+        self._plan(inputs)
+
+        executor = ThreadPoolExecutor(max_workers=tries)
+        for id, (state, config) in enumerate(zip(inputs, configs)):
+            executor.submit(self._stream_run, id, state, config, events.put, stop)
+
+        try:
+            finished = 0
+            while finished < tries:
+                id, event = events.get()
+                finished += self._finished(id, event)
+                yield from self._stream_items(id, event, streamed, critiques)
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._registry.release()
+
+        if self._global_selection:
+            selection = self._selector.run(self._pool(streamed.critiques.values()))
+            yield from selection.websites
+
+    async def astream(
+        self, tries: int = 1, critiques: bool = False, crawl_id: str | None = None
+    ) -> AsyncIterator[WebsiteChoice | WebsiteCritique]:
+        """Runs the Agent asynchronously, yielding websites selected by every run as soon as the run finishes.
+
+        With global selection, websites are yielded once all runs finish. Closing the
+        stream early stops the runs, cancelling websites still to load.
+
+        Args:
+            tries (int, optional): how many times to run the agent. Defaults to 1.
+            critiques (bool, optional): whether to also yield critiques of websites as soon as they are computed. Defaults to False.
+            crawl_id (str | None, optional): ID of the crawl whose checkpointed runs to resume. Defaults to None, which starts a new crawl.
+
+        Yields:
+            WebsiteChoice | WebsiteCritique: unique selected websites and, optionally, unique critiques.
+        """
+        logger.info("Streaming the Agent.")
+
+        events: asyncio.Queue[tuple[int, Any]] = asyncio.Queue()
+        streamed = StreamedItems()
+        inputs, configs = self._runs(tries, crawl_id)
+        await self._aplan(inputs)
+
+        async with self._aworkflow() as workflow:
+            tasks = [
+                asyncio.create_task(
+                    self._astream_run(workflow, id, state, config, events.put_nowait)
+                )
+                for id, (state, config) in enumerate(zip(inputs, configs))
+            ]
+
+            try:
+                finished = 0
+                while finished < tries:
+                    id, event = await events.get()
+                    finished += self._finished(id, event)
+                    for item in self._stream_items(id, event, streamed, critiques):
+                        yield item
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self._registry.release()
+
+        if self._global_selection:
+            selection = await self._selector.arun(
+                self._pool(streamed.critiques.values())
+            )
+            for choice in selection.websites:
+                yield choice
+
+    @staticmethod
+    def _run_inputs(
+        workflow: CompiledStateGraph,
+        inputs: list[SearchAgentState | None],
+        configs: list[RunnableConfig],
+    ) -> list[Run]:
+        """Pairs initial states and configs of the runs with their IDs and the workflow running them.
+
+        Args:
+            workflow (CompiledStateGraph): workflow checkpointing with the saver of the mode.
+            inputs (list[SearchAgentState | None]): initial states, None for resumed runs.
+            configs (list[RunnableConfig]): configs of the runs.
+
+        Returns:
+            list[Run]: runs.
+        """
+        return [
+            (workflow, id, state, config)
+            for id, (state, config) in enumerate(zip(inputs, configs))
+        ]
+
+    @asynccontextmanager
+    async def _aworkflow(self) -> AsyncIterator[CompiledStateGraph]:
+        """Opens the workflow for async runs, checkpointing with the async saver to the same store.
+
+        Yields:
+            CompiledStateGraph: workflow.
+        """
+        if not self._checkpointer:
+            yield self._workflow
+            return
+
+        async with self._checkpointer.asaver() as saver:
+            yield self._workflow.copy(update={"checkpointer": saver})
+
+    def _invoke_run(self, run: Run) -> SearchAgentState:
+        """Runs the workflow once, releasing websites the run didn't critique when it stops.
+
+        Args:
+            run (Run): workflow, ID of the run, its initial state, None resumes it from the checkpoint, and its config.
+
+        Returns:
+            SearchAgentState: final state of the run.
+        """
+        workflow, id, state, config = run
+        try:
+            return workflow.invoke(state, config)
+        finally:
+            self._registry.release(id)
+
+    async def _ainvoke_run(self, run: Run) -> SearchAgentState:
+        """Runs the workflow once asynchronously, releasing websites the run didn't critique when it stops.
+
+        Args:
+            run (Run): workflow, ID of the run, its initial state, None resumes it from the checkpoint, and its config.
+
+        Returns:
+            SearchAgentState: final state of the run.
+        """
+        workflow, id, state, config = run
+        try:
+            return await workflow.ainvoke(state, config)
+        finally:
+            self._registry.release(id)
+
+    def _stream_run(
+        self,
+        id: int,
+        state: SearchAgentState | None,
+        config: RunnableConfig,
+        put: Callable[[tuple[int, Any]], None],
+        stop: threading.Event,
+    ) -> None:
+        """Streams updates of a single run, finishing with None or the exception that failed the run.
+
+        Args:
+            id (int): ID of the run.
+            state (SearchAgentState | None): initial state of the run, None resumes it from the checkpoint.
+            config (RunnableConfig): config of the run.
+            put (Callable[[tuple[int, Any]], None]): function passing events to the consumer.
+            stop (threading.Event): event set once the consumer stops listening, also stops loading websites of the run.
+        """
+        config = {
+            **config,
+            "configurable": {**config.get("configurable", {}), STOP_KEY: stop},
+        }
+        try:
+            if state is None:
+                self._replay(id, self._workflow.get_state(config), put)
+            for update in self._workflow.stream(state, config, stream_mode="updates"):
+                if stop.is_set():
+                    break
+                put((id, update))
+            put((id, None))
+        except Exception as e:  # noqa: BLE001, the consumer fails or logs the run
+            put((id, e))
+        finally:
+            self._registry.release(id)
+
+    async def _astream_run(
+        self,
+        workflow: CompiledStateGraph,
+        id: int,
+        state: SearchAgentState | None,
+        config: RunnableConfig,
+        put: Callable[[tuple[int, Any]], None],
+    ) -> None:
+        """Streams updates of a single run asynchronously, finishing with None or the exception that failed the run.
+
+        Args:
+            workflow (CompiledStateGraph): workflow checkpointing with the async saver.
+            id (int): ID of the run.
+            state (SearchAgentState | None): initial state of the run, None resumes it from the checkpoint.
+            config (RunnableConfig): config of the run.
+            put (Callable[[tuple[int, Any]], None]): function passing events to the consumer.
+        """
+        try:
+            if state is None:
+                self._replay(id, await workflow.aget_state(config), put)
+            async for update in workflow.astream(state, config, stream_mode="updates"):
+                put((id, update))
+            put((id, None))
+        except Exception as e:  # noqa: BLE001, the consumer fails or logs the run
+            put((id, e))
+        finally:
+            self._registry.release(id)
+
+    @staticmethod
+    def _replay(
+        id: int, snapshot: StateSnapshot, put: Callable[[tuple[int, Any]], None]
+    ) -> None:
+        """Passes on critiques of a resumed run and the selection of a run that finished before being resumed, as they yield no more updates.
+
+        Args:
+            id (int): ID of the run.
+            snapshot (StateSnapshot): checkpointed state of the run.
+            put (Callable[[tuple[int, Any]], None]): function passing events to the consumer.
+        """
+        if snapshot.values.get("website_critiques"):
+            put((id, {SearchAgentNode.CRITIQUE: snapshot.values}))
+        if not snapshot.next and snapshot.values.get("selection"):
+            put((id, {SearchAgentNode.SUMMARY: snapshot.values}))
+
+    @staticmethod
+    def _finished(id: int, event: Any) -> bool:
+        """Checks whether the event ends the run, logging failures.
+
+        Args:
+            id (int): ID of the run.
+            event (Any): update of the run, None once the run finished or the exception that failed it.
+
+        Returns:
+            bool: whether the run ended.
+        """
+        if isinstance(event, Exception):
+            logger.warning(f"run ID: {id}. Run failed: {event!r}")
+
+        return event is None or isinstance(event, Exception)
+
+    @staticmethod
+    def _stream_items(
+        id: int, event: Any, streamed: StreamedItems, critiques: bool
+    ) -> list[WebsiteChoice | WebsiteCritique]:
+        """Extracts new selected websites and critiques from an update of a run.
+
+        Args:
+            id (int): ID of the run.
+            event (Any): update of the run by node.
+            streamed (StreamedItems): record of items already yielded by the stream, updated in place.
+            critiques (bool): whether to extract critiques.
+
+        Returns:
+            list[WebsiteChoice | WebsiteCritique]: items not yielded yet.
+        """
+        if not isinstance(event, dict):
+            return []
+
+        items = []
+        for node, update in event.items():
+            if not update:
+                continue
+
+            if node == SearchAgentNode.CRITIQUE:
+                for critique in update.get("website_critiques", []):
+                    link = canonicalize_url(critique.website.link)
+                    if link not in streamed.critiques:
+                        streamed.critiques[link] = critique
+                        if critiques:
+                            items.append(critique)
+
+            if node == SearchAgentNode.SUMMARY and update.get("selection"):
+                for choice in update["selection"].websites:
+                    link = canonicalize_url(choice.website.link)
+                    if link not in streamed.choices:
+                        streamed.choices.add(link)
+                        items.append(choice)
+
+        if items:
+            logger.info(f"run ID: {id}. Streaming {len(items)} new results.")
+
+        return items
+
+    def _runs(
+        self, tries: int, crawl_id: str | None
+    ) -> tuple[list[SearchAgentState | None], list[RunnableConfig]]:
+        """Creates inputs and configs of the runs, resuming runs of the crawl found in the checkpointer.
+
+        Args:
+            tries (int): number of runs.
+            crawl_id (str | None): ID of the crawl, None starts a new crawl.
+
+        Returns:
+            tuple[list[SearchAgentState | None], list[RunnableConfig]]: initial states, None for resumed runs, and configs of the runs.
+        """
+        inputs: list[SearchAgentState | None] = self._inputs(tries)
+        configs: list[RunnableConfig] = [{"recursion_limit": 200} for _ in inputs]
+        if not self._checkpointer:
+            return inputs, configs
+
+        if not crawl_id:
+            crawl_id = uuid.uuid4().hex
+            logger.info(f"Checkpointing crawl ID: {crawl_id}.")
+
+        for id, config in enumerate(configs):
+            config["configurable"] = {"thread_id": f"{crawl_id}-{id}"}
+            snapshot = self._workflow.get_state(config)
+            if snapshot.values:
+                position = ", ".join(snapshot.next) if snapshot.next else "END"
+                logger.info(f"run ID: {id}. Resuming from checkpoint at {position}.")
+                self._restore(id, snapshot.values)
+                inputs[id] = None
+
+        return inputs, configs
+
+    def _restore(self, run_id: int, state: SearchAgentState) -> None:
+        """Claims websites of a resumed run again, so that other runs reuse its critiques and wait for the websites it's still to critique.
+
+        Args:
+            run_id (int): ID of the run.
+            state (SearchAgentState): checkpointed state of the run.
+        """
+        for critique in state.get("website_critiques") or []:
+            self._registry.claim(critique.website.link, run_id)
+            self._registry.resolve(critique.website.link, critique)
+
+        for page in state.get("loaded_websites") or []:
+            self._registry.claim(page.header.link, run_id)
+
+    def _inputs(self, tries: int) -> list[SearchAgentState]:
+        """Creates initial states of the runs.
+
+        Args:
+            tries (int): number of runs.
+
+        Returns:
+            list[SearchAgentState]: initial states.
+        """
+        return [
             {
                 "id": id,
                 "search_loop_iteration": 0,
                 "websites_to_load": WebsitesToLoad(websites=[]),
                 "loaded_websites": [],
+                "reused_websites": [],
                 "website_critiques": [],
+                "tried_queries": [],
+                "iteration_yields": [],
+                "planned_queries": [],
+                "taken_queries": [],
                 "selection": None,
             }
             for id in range(tries)
         ]
 
-        responses: list[SearchAgentState] = self._workflow.batch(
-            inputs, {"recursion_limit": 200}, return_exception=True
-        )
-        responses = [
+    def _plan(self, inputs: list[SearchAgentState | None]) -> None:
+        """Plans queries of new runs and deals them out.
+
+        Planning only saves LLM calls, so if it fails runs come up with their own queries.
+
+        Args:
+            inputs (list[SearchAgentState | None]): initial states, None for resumed runs, updated in place.
+        """
+        count = self._plan_size(inputs)
+        plan = []
+        if count:
+            try:
+                plan = self._planner.run(count)
+            except Exception as e:
+                logger.warning(
+                    f"Planning failed, runs come up with their own queries: {e}",
+                    exc_info=True,
+                )
+                self._stats.add("planner.failures")
+        self._assign(inputs, plan)
+
+    async def _aplan(self, inputs: list[SearchAgentState | None]) -> None:
+        """Plans queries of new runs asynchronously and deals them out.
+
+        Planning only saves LLM calls, so if it fails runs come up with their own queries.
+
+        Args:
+            inputs (list[SearchAgentState | None]): initial states, None for resumed runs, updated in place.
+        """
+        count = self._plan_size(inputs)
+        plan = []
+        if count:
+            try:
+                plan = await self._planner.arun(count)
+            except Exception as e:
+                logger.warning(
+                    f"Planning failed, runs come up with their own queries: {e}",
+                    exc_info=True,
+                )
+                self._stats.add("planner.failures")
+        self._assign(inputs, plan)
+
+    def _plan_size(self, inputs: list[SearchAgentState | None]) -> int:
+        """Counts queries to plan for the first `min_iterations` iterations of new runs.
+
+        Later iterations ask the LLM for new queries, avoiding the planned ones.
+
+        Args:
+            inputs (list[SearchAgentState | None]): initial states, None for resumed runs.
+
+        Returns:
+            int: number of queries, 0 without a planner.
+        """
+        runs = sum(state is not None for state in inputs)
+        if not self._planner or not runs:
+            return 0
+
+        logger.info("Planning search queries.")
+
+        return runs * self._min_iterations
+
+    @staticmethod
+    def _assign(inputs: list[SearchAgentState | None], plan: list[str]) -> None:
+        """Deals disjoint sets of planned queries to new runs, letting them know the queries of other runs.
+
+        Args:
+            inputs (list[SearchAgentState | None]): initial states, None for resumed runs, updated in place.
+            plan (list[str]): planned queries.
+        """
+        states = [state for state in inputs if state is not None]
+        for index, state in enumerate(states):
+            state["planned_queries"] = plan[index :: len(states)]
+            state["taken_queries"] = [
+                query for query in plan if query not in state["planned_queries"]
+            ]
+
+    @staticmethod
+    def _successful(
+        responses: list[SearchAgentState | Exception],
+    ) -> list[SearchAgentState]:
+        """Filters out failed runs, logging their failures.
+
+        Args:
+            responses (list[SearchAgentState | Exception]): final states of the runs.
+
+        Returns:
+            list[SearchAgentState]: final states of successful runs.
+        """
+        for id, response in enumerate(responses):
+            if isinstance(response, Exception):
+                logger.warning(f"run ID: {id}. Run failed: {response!r}")
+
+        return [
             response for response in responses if not isinstance(response, Exception)
         ]
 
-        logger.info(f"Aggregating results from {tries} runs.")
+    def _pool(self, critiques: Iterable[WebsiteCritique]) -> list[WebsiteCritique]:
+        """Merges critiques of all runs into a single pool for the global selection.
+
+        Args:
+            critiques (Iterable[WebsiteCritique]): critiques of all runs.
+
+        Returns:
+            list[WebsiteCritique]: unique critiques.
+        """
+        pool = list(
+            unique_everseen(
+                critiques, key=lambda critique: canonicalize_url(critique.website.link)
+            )
+        )
+
+        logger.info(f"Selecting from a pool of {len(pool)} critiques of all runs.")
+        self._stats.add("selection.pool_size", len(pool))
+
+        return pool
+
+    def _pool_runs(self, responses: list[SearchAgentState]) -> list[WebsiteCritique]:
+        """Merges critiques of all successful runs into a single pool for the global selection.
+
+        Args:
+            responses (list[SearchAgentState]): final states of successful runs.
+
+        Returns:
+            list[WebsiteCritique]: unique critiques.
+        """
+        return self._pool(
+            critique
+            for response in responses
+            for critique in response["website_critiques"]
+        )
+
+    def _aggregate(self, responses: list[SearchAgentState]) -> list[WebsiteChoice]:
+        """Joins websites selected by all successful runs.
+
+        Args:
+            responses (list[SearchAgentState]): final states of successful runs.
+
+        Returns:
+            list[WebsiteChoice]: unique selected websites.
+        """
+        logger.info(f"Aggregating results from {len(responses)} runs.")
 
         aggregated_result = list(
             unique_everseen(
@@ -103,12 +781,24 @@ class SearchAgent(BaseAgent[SearchAgentState]):
                     for response in responses
                     for website in response["selection"].websites
                 ),
-                key=lambda choice: choice.website.link,
+                key=lambda choice: canonicalize_url(choice.website.link),
             )
         )
 
         return aggregated_result
 
+    def _build_critiquer(self) -> Runnable[list[PageRef], list[WebsiteCritique]]:
+        """Chains looking up contents of loaded websites, the triage and the Critic.
+
+        Returns:
+            Runnable[list[PageRef], list[WebsiteCritique]]: chain critiquing loaded websites.
+        """
+        critiquer = RunnableLambda(self._websites, afunc=self._awebsites)
+        if self._triage:
+            critiquer |= RunnableLambda(self._triage.filter, afunc=self._triage.afilter)
+
+        return critiquer | RunnableLambda(self._critic.run, afunc=self._critic.arun)
+
     def _build_workflow(
         self,
     ) -> CompiledStateGraph[SearchAgentState, None, SearchAgentState, SearchAgentState]:
@@ -120,14 +810,41 @@ class SearchAgent(BaseAgent[SearchAgentState]):
         workflow_graph = StateGraph(SearchAgentState)
 
         workflow_graph.add_node(SearchAgentNode.DESCRIPTION, self._description)
-        workflow_graph.add_node(SearchAgentNode.SEARCH, self._search)
+        workflow_graph.add_node(
+            SearchAgentNode.SEARCH,
+            self._model_step(
+                SearchAgentNode.SEARCH,
+                lambda: self._tool_model(
+                    self._search_tool.name, SearchAgentNode.SEARCH
+                ),
+                self._search_messages,
+                self._searched,
+                shortcut=self._planned_search,
+            ),
+        )
         workflow_graph.add_node(
             SearchAgentNode.TOOLS_SEARCHER, ToolNode(tools=[self._search_tool])
         )
-        workflow_graph.add_node(SearchAgentNode.SELECT_PAGE, self._select_page)
-        workflow_graph.add_node(SearchAgentNode.LOAD, self._load)
-        workflow_graph.add_node(SearchAgentNode.CRITIQUE, self._critique)
-        workflow_graph.add_node(SearchAgentNode.SUMMARY, self._summarize)
+        workflow_graph.add_node(
+            SearchAgentNode.SELECT_PAGE,
+            self._structured_step(
+                WebsitesToLoad,
+                SearchAgentNode.SELECT_PAGE,
+                self._select_page_messages,
+                self._selected_pages,
+            ),
+        )
+        workflow_graph.add_node(
+            SearchAgentNode.LOAD, self._node(self._load, self._aload)
+        )
+        workflow_graph.add_node(
+            SearchAgentNode.CRITIQUE, self._node(self._critique, self._acritique)
+        )
+        workflow_graph.add_node(SearchAgentNode.COMPACT, self._compact)
+        if not self._global_selection:
+            workflow_graph.add_node(
+                SearchAgentNode.SUMMARY, self._node(self._summarize, self._asummarize)
+            )
 
         workflow_graph.add_edge(START, SearchAgentNode.DESCRIPTION)
         workflow_graph.add_edge(SearchAgentNode.DESCRIPTION, SearchAgentNode.SEARCH)
@@ -137,17 +854,32 @@ class SearchAgent(BaseAgent[SearchAgentState]):
         )
         workflow_graph.add_edge(SearchAgentNode.SELECT_PAGE, SearchAgentNode.LOAD)
         workflow_graph.add_edge(SearchAgentNode.LOAD, SearchAgentNode.CRITIQUE)
+        workflow_graph.add_edge(SearchAgentNode.CRITIQUE, SearchAgentNode.COMPACT)
         workflow_graph.add_conditional_edges(
-            SearchAgentNode.CRITIQUE,
-            self._decide_loop,
+            SearchAgentNode.COMPACT,
+            self._structured_step(
+                LoopDecision,
+                SearchAgentNode.DECIDE_LOOP,
+                lambda state: (
+                    state["messages"] + [HumanMessage(self._decide_loop_prompt)]
+                ),
+                lambda _, response: response.loop_decision,
+                Priority.HIGH,
+                shortcut=self._decide_locally,
+            ),
             {
                 SearchAgentNode.SEARCH: SearchAgentNode.SEARCH,
-                SearchAgentNode.SUMMARY: SearchAgentNode.SUMMARY,
+                SearchAgentNode.SUMMARY: END
+                if self._global_selection
+                else SearchAgentNode.SUMMARY,
             },
         )
-        workflow_graph.add_edge(SearchAgentNode.SUMMARY, END)
+        if not self._global_selection:
+            workflow_graph.add_edge(SearchAgentNode.SUMMARY, END)
 
-        workflow = workflow_graph.compile()
+        workflow = workflow_graph.compile(
+            checkpointer=self._checkpointer.saver if self._checkpointer else None
+        )
 
         return workflow
 
@@ -159,82 +891,239 @@ class SearchAgent(BaseAgent[SearchAgentState]):
         """
         return {"messages": [SystemMessage(self._description_prompt)]}
 
-    def _search(self, state: SearchAgentState) -> SearchAgentState:
-        """Calls the search tool. Start of the search loop.
+    def _planned_search(self, state: SearchAgentState) -> SearchAgentState | None:
+        """Calls the search tool with the planned query of the iteration, without an LLM call.
 
         Args:
             state (SearchAgentState): state of the Agent.
 
         Returns:
-            SearchAgentState: update to the state of the Agent.
+            SearchAgentState | None: update to the state of the Agent, None if no query is planned for the iteration.
         """
-        logger.info(f"run ID: {state['id']}. Searching for websites.")
-        prompt = self._search_prompt
+        iteration = state["search_loop_iteration"]
+        if iteration >= len(state["planned_queries"]):
+            return None
+
+        logger.info(
+            f"run ID: {state['id']}. Searching for websites with a planned query."
+        )
+        self._stats.add("planner.planned_searches")
 
-        response = self._model.bind_tools([self._search_tool]).invoke(
-            state["messages"] + [HumanMessage(prompt)],
+        return self._searched(
+            state,
+            AIMessage(
+                "",
+                tool_calls=[
+                    {
+                        "name": self._search_tool.name,
+                        "args": {
+                            self._query_argument: state["planned_queries"][iteration]
+                        },
+                        "id": f"planned-{uuid.uuid4().hex}",
+                    }
+                ],
+            ),
         )
 
+    def _search_messages(self, state: SearchAgentState) -> list[AnyMessage]:
+        """Creates messages asking for a new query, listing the planned ones to avoid.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+
+        Returns:
+            list[AnyMessage]: messages.
+        """
+        logger.info(f"run ID: {state['id']}. Searching for websites.")
+
+        messages = [HumanMessage(self._search_prompt)]
+        queries = state["planned_queries"] + state["taken_queries"]
+        if queries:
+            messages.append(
+                HumanMessage(TAKEN_QUERIES_PROMPT.format(queries="\n".join(queries)))
+            )
+
+        return state["messages"] + messages
+
+    def _searched(
+        self, state: SearchAgentState, response: AIMessage
+    ) -> SearchAgentState:
+        """Records the call of the search tool. Start of the search loop.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+            response (AIMessage): message calling the search tool.
+
+        Returns:
+            SearchAgentState: update to the state of the Agent.
+        """
         return {
-            "messages": [HumanMessage(prompt), response],
+            "messages": [HumanMessage(self._search_prompt), response],
             "search_loop_iteration": state["search_loop_iteration"] + 1,
         }
 
-    def _select_page(self, state: SearchAgentState) -> SearchAgentState:
-        """Selects websites to load from search results.
+    def _select_page_messages(self, state: SearchAgentState) -> list[AnyMessage]:
+        """Creates messages asking to select websites to load from search results.
 
         Args:
             state (SearchAgentState): state of the Agent.
 
         Returns:
-            SearchAgentState: update to the state of the Agent.
+            list[AnyMessage]: messages.
         """
         logger.info(f"run ID: {state['id']}. Selecting pages to visit.")
 
-        prompt = self._select_page_prompt
+        return state["messages"] + [HumanMessage(self._select_page_prompt)]
 
-        response = self._invoke_structured_model(
-            WebsitesToLoad,
-            state["messages"] + [HumanMessage(prompt)],
-        )
+    def _selected_pages(
+        self, _: SearchAgentState, response: WebsitesToLoad
+    ) -> SearchAgentState:
+        """Records websites to load selected from search results.
+
+        Args:
+            response (WebsitesToLoad): websites to load.
 
+        Returns:
+            SearchAgentState: update to the state of the Agent.
+        """
         return {
             "messages": [
-                HumanMessage(prompt),
+                HumanMessage(self._select_page_prompt),
                 AIMessage(response.model_dump_json()),
             ],
             "websites_to_load": response,
         }
 
-    def _load(self, state: SearchAgentState) -> SearchAgentState:
+    def _load(
+        self, state: SearchAgentState, config: RunnableConfig
+    ) -> SearchAgentState:
         """Loads websites' contents.
 
         Args:
             state (SearchAgentState): state of the Agent.
+            config (RunnableConfig): config of the run, holding the event stopping streamed runs.
 
         Returns:
             SearchAgentState: update to the state of the Agent.
         """
         logger.info(f"run ID: {state['id']}. Loading websites.")
 
-        results = [
-            (website, self._load_website(website.link))
-            for website in state["websites_to_load"].websites
-        ]
+        websites, reused_websites = self._claim(state)
+        contents = self._fetcher.map(
+            self._load_website,
+            [website.link for website in websites],
+            config.get("configurable", {}).get(STOP_KEY),
+        )
 
-        loaded_websites = [
-            Website(header=website, content=content)
-            for website, content in results
-            if content
-        ]
+        return self._register(state, websites, contents, reused_websites)
+
+    async def _aload(self, state: SearchAgentState) -> SearchAgentState:
+        """Loads websites' contents without blocking the event loop.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+
+        Returns:
+            SearchAgentState: update to the state of the Agent.
+        """
+        logger.info(f"run ID: {state['id']}. Loading websites.")
+
+        websites, reused_websites = self._claim(state)
+        contents = await self._fetcher.amap(
+            self._load_website, [website.link for website in websites]
+        )
+
+        return self._register(state, websites, contents, reused_websites)
+
+    def _claim(
+        self, state: SearchAgentState
+    ) -> tuple[list[WebsiteHeader], list[WebsiteHeader]]:
+        """Claims websites picked by the run.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+
+        Returns:
+            tuple[list[WebsiteHeader], list[WebsiteHeader]]: websites to load and websites critiqued by other runs.
+        """
+        run_id = state["id"]
+        websites = []
+        reused_websites = []
+        for website in state["websites_to_load"].websites:
+            owner, claimed = self._registry.claim(website.link, run_id)
+            if claimed:
+                websites.append(website)
+            elif owner != run_id:
+                reused_websites.append(website)
+
+        return websites, reused_websites
+
+    def _register(
+        self,
+        state: SearchAgentState,
+        websites: list[WebsiteHeader],
+        contents: list[str | None],
+        reused_websites: list[WebsiteHeader],
+    ) -> SearchAgentState:
+        """Drops websites that failed to load and duplicates of already loaded websites.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+            websites (list[WebsiteHeader]): loaded websites.
+            contents (list[str | None]): contents of the websites, None for failed loads.
+            reused_websites (list[WebsiteHeader]): websites critiqued by other runs.
+
+        Returns:
+            SearchAgentState: update to the state of the Agent.
+        """
+        run_id = state["id"]
+        loaded_websites = []
+        for website, content in zip(websites, contents):
+            if not content:
+                self._registry.resolve(website.link, None)
+                continue
+
+            original_url = self._deduplicator.claim_content(website.link, content)
+            if original_url is None:
+                content_hash = self._content_store.put(content)
+                loaded_websites.append(
+                    PageRef(header=website, content_hash=content_hash)
+                )
+            elif self._registry.link(website.link, original_url) != run_id:
+                reused_websites.append(website)
 
         return {
-            "loaded_websites": state["loaded_websites"] + loaded_websites,
+            "loaded_websites": loaded_websites,
+            "reused_websites": reused_websites,
             "websites_to_load": [],
         }
 
     def _critique(self, state: SearchAgentState) -> SearchAgentState:
-        """Calls the Critic for each loaded website.
+        """Calls the Critic for each loaded website passing the triage and collects critiques of websites critiqued by other runs.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+
+        Returns:
+            SearchAgentState: update to the state of the Agent.
+        """
+        logger.info(f"run ID: {state['id']}. Critiquing website candidates.")
+
+        critiques = []
+        try:
+            critiques = self._critiquer.invoke(state["loaded_websites"])
+        finally:
+            self._resolve(state["loaded_websites"], critiques)
+        self._discard(state["loaded_websites"])
+
+        reused_critiques = [
+            self._registry.wait(website.link) for website in state["reused_websites"]
+        ]
+
+        return self._collect(state, critiques, reused_critiques)
+
+    async def _acritique(self, state: SearchAgentState) -> SearchAgentState:
+        """Calls the Critic asynchronously for each loaded website passing the triage and collects critiques of websites critiqued by other runs.
 
         Args:
             state (SearchAgentState): state of the Agent.
@@ -243,14 +1132,275 @@ class SearchAgent(BaseAgent[SearchAgentState]):
             SearchAgentState: update to the state of the Agent.
         """
         logger.info(f"run ID: {state['id']}. Critiquing website candidates.")
-        critiques = self._critic.run(state["loaded_websites"])
+
+        critiques = []
+        try:
+            critiques = await self._critiquer.ainvoke(state["loaded_websites"])
+        finally:
+            self._resolve(state["loaded_websites"], critiques)
+        self._discard(state["loaded_websites"])
+
+        reused_critiques = await asyncio.gather(
+            *(
+                self._registry.await_critique(website.link)
+                for website in state["reused_websites"]
+            )
+        )
+
+        return self._collect(state, critiques, reused_critiques)
+
+    def _websites(self, pages: list[PageRef]) -> list[Website]:
+        """Looks up contents of loaded websites, loading again the ones evicted from the store or lost with a resumed crawl.
+
+        Args:
+            pages (list[PageRef]): loaded websites.
+
+        Returns:
+            list[Website]: websites with contents, without the ones that failed to load again.
+        """
+        contents, missing = self._stored(pages)
+        reloaded = self._fetcher.map(
+            self._load_website, [pages[i].header.link for i in missing]
+        )
+
+        return self._join(pages, contents, missing, reloaded)
+
+    async def _awebsites(self, pages: list[PageRef]) -> list[Website]:
+        """Looks up contents of loaded websites, loading again the ones evicted from the store or lost with a resumed crawl without blocking the event loop.
+
+        Args:
+            pages (list[PageRef]): loaded websites.
+
+        Returns:
+            list[Website]: websites with contents, without the ones that failed to load again.
+        """
+        contents, missing = self._stored(pages)
+        reloaded = await self._fetcher.amap(
+            self._load_website, [pages[i].header.link for i in missing]
+        )
+
+        return self._join(pages, contents, missing, reloaded)
+
+    def _stored(self, pages: list[PageRef]) -> tuple[list[str | None], list[int]]:
+        """Looks up contents of loaded websites in the store.
+
+        Args:
+            pages (list[PageRef]): loaded websites.
+
+        Returns:
+            tuple[list[str | None], list[int]]: contents, None for evicted ones, and indices of the evicted ones.
+        """
+        contents = [self._content_store.get(page.content_hash) for page in pages]
+
+        return contents, [i for i, content in enumerate(contents) if content is None]
+
+    def _join(
+        self,
+        pages: list[PageRef],
+        contents: list[str | None],
+        missing: list[int],
+        reloaded: list[str | None],
+    ) -> list[Website]:
+        """Joins loaded websites with their stored or reloaded contents.
+
+        Args:
+            pages (list[PageRef]): loaded websites.
+            contents (list[str | None]): their stored contents, None for evicted ones.
+            missing (list[int]): indices of evicted websites.
+            reloaded (list[str | None]): contents of evicted websites loaded again, None for the ones that failed to load.
+
+        Returns:
+            list[Website]: websites with contents.
+        """
+        if missing:
+            self._stats.add("contents.reloads", len(missing))
+        for i, content in zip(missing, reloaded):
+            contents[i] = content
+
+        return [
+            Website(header=page.header, content=content)
+            for page, content in zip(pages, contents)
+            if content
+        ]
+
+    def _resolve(self, pages: list[PageRef], critiques: list[WebsiteCritique]) -> None:
+        """Publishes critiques of loaded websites to other runs, None for websites that couldn't be critiqued.
+
+        Args:
+            pages (list[PageRef]): loaded websites.
+            critiques (list[WebsiteCritique]): their critiques.
+        """
+        critiques_by_link = {critique.website.link: critique for critique in critiques}
+        for page in pages:
+            self._registry.resolve(
+                page.header.link, critiques_by_link.get(page.header.link)
+            )
+
+    def _discard(self, pages: list[PageRef]) -> None:
+        """Drops contents of critiqued websites from the store.
+
+        Contents of websites that failed to be critiqued are kept, so a resumed run
+        finds them by their hash instead of loading them again.
+
+        Args:
+            pages (list[PageRef]): critiqued websites.
+        """
+        for page in pages:
+            self._content_store.discard(page.content_hash)
+
+    def _collect(
+        self,
+        state: SearchAgentState,
+        critiques: list[WebsiteCritique],
+        reused_critiques: list[WebsiteCritique | None],
+    ) -> SearchAgentState:
+        """Joins critiques computed by the run with the ones reused from other runs, measuring the yield of the iteration.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+            critiques (list[WebsiteCritique]): critiques computed by the run.
+            reused_critiques (list[WebsiteCritique | None]): critiques computed by other runs, None if they couldn't be computed.
+
+        Returns:
+            SearchAgentState: update to the state of the Agent.
+        """
+        iteration_yields = []
+        if self._stop_policy:
+            iteration_yields.append(
+                self._stop_policy.measure(
+                    state["id"],
+                    len(state["loaded_websites"]) + len(state["reused_websites"]),
+                    len(state["reused_websites"]),
+                    critiques,
+                    state["website_critiques"],
+                )
+            )
+
+        critiques = critiques + list(
+            unique_everseen(
+                (critique for critique in reused_critiques if critique),
+                key=lambda critique: critique.website.link,
+            )
+        )
 
         return {
             "messages": [AIMessage(str(critiques))],
-            "loaded_websites": [],
-            "website_critiques": state["website_critiques"] + critiques,
+            "loaded_websites": None,
+            "reused_websites": None,
+            "website_critiques": critiques,
+            "iteration_yields": iteration_yields,
         }
 
+    def _compact(self, state: SearchAgentState) -> SearchAgentState:
+        """Replaces earlier iterations in the message history with a short summary once it exceeds the token limit.
+
+        The latest iteration is kept as is, unless it doesn't fit within the limit itself.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+
+        Returns:
+            SearchAgentState: update to the state of the Agent.
+        """
+        if not self._max_history_tokens:
+            return {}
+
+        messages = state["messages"]
+        tokens = self._token_counter.count_messages(messages)
+        if tokens <= self._max_history_tokens:
+            return {}
+
+        logger.info(f"run ID: {state['id']}. Compacting message history.")
+
+        starts = [
+            i
+            for i, message in enumerate(messages)
+            if isinstance(message, HumanMessage)
+            and message.content == self._search_prompt
+        ]
+        kept = messages[starts[-1] :] if starts else []
+        if self._token_counter.count_messages(kept) > self._max_history_tokens:
+            kept = []
+
+        removed = messages[: len(messages) - len(kept)]
+        removed_queries = self._queries(removed)
+        tried_queries = state["tried_queries"] + removed_queries
+        summary = SystemMessage(
+            COMPACTED_HISTORY_PROMPT.format(
+                queries="; ".join(tried_queries) or "none",
+                domains=", ".join(self._domains(state["website_critiques"])) or "none",
+                critiqued=len(state["website_critiques"]),
+            )
+        )
+        compacted = [SystemMessage(self._description_prompt), summary] + kept
+
+        self._stats.add("history.compactions")
+        self._stats.add(
+            "history.removed_tokens",
+            tokens - self._token_counter.count_messages(compacted),
+        )
+
+        return {
+            "messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + compacted,
+            "tried_queries": removed_queries,
+        }
+
+    def _queries(self, messages: list[AnyMessage]) -> list[str]:
+        """Collects queries passed to the search tool.
+
+        Args:
+            messages (list[AnyMessage]): list of messages.
+
+        Returns:
+            list[str]: queries.
+        """
+        return [
+            str(
+                tool_call["args"].get(self._query_argument)
+                if self._query_argument
+                else tool_call["args"]
+            )
+            for message in messages
+            if isinstance(message, AIMessage)
+            for tool_call in message.tool_calls
+            if tool_call["name"] == self._search_tool.name
+        ]
+
+    @staticmethod
+    def _query_argument_of(tool: BaseTool) -> str | None:
+        """Finds the argument of the search tool holding the query.
+
+        Args:
+            tool (BaseTool): search tool.
+
+        Returns:
+            str | None: name of the single required string argument, None if the tool doesn't have exactly one.
+        """
+        parameters = convert_to_openai_tool(tool)["function"]["parameters"]
+        names = [
+            name
+            for name in parameters.get("required", [])
+            if parameters["properties"].get(name, {}).get("type") == "string"
+        ]
+        return names[0] if len(names) == 1 else None
+
+    @staticmethod
+    def _domains(critiques: list[WebsiteCritique]) -> list[str]:
+        """Collects domains of critiqued websites.
+
+        Args:
+            critiques (list[WebsiteCritique]): critiques.
+
+        Returns:
+            list[str]: sorted unique domains.
+        """
+        return sorted(
+            {
+                urlsplit(canonicalize_url(critique.website.link)).netloc
+                for critique in critiques
+            }
+        )
+
     def _summarize(self, state: SearchAgentState) -> SearchAgentState:
         """Calls the Selector to pick suitable websites and justify this decision.
 
@@ -266,11 +1416,29 @@ class SearchAgent(BaseAgent[SearchAgentState]):
 
         return {"selection": response}
 
-    def _decide_loop(self, state: SearchAgentState) -> SearchAgentNode:
-        """Decides whether to start a new search loop or return results.
+    async def _asummarize(self, state: SearchAgentState) -> SearchAgentState:
+        """Calls the Selector asynchronously to pick suitable websites and justify this decision.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
 
         Returns:
-            SearchAgentNode: next node to go to.
+            SearchAgentState: update to the state of the Agent.
+        """
+        logger.info(f"run ID: {state['id']}. Picking the best websites.")
+
+        response = await self._selector.arun(state["website_critiques"])
+
+        return {"selection": response}
+
+    def _decide_locally(self, state: SearchAgentState) -> SearchAgentNode | None:
+        """Decides whether to start a new search loop or return results without an LLM call, from the iteration limits or the stop policy.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+
+        Returns:
+            SearchAgentNode | None: next node to go to, None if the LLM has to decide.
         """
         if state["search_loop_iteration"] == self._max_iterations:
             return SearchAgentNode.SUMMARY
@@ -278,35 +1446,134 @@ class SearchAgent(BaseAgent[SearchAgentState]):
         if state["search_loop_iteration"] < self._min_iterations:
             return SearchAgentNode.SEARCH
 
-        prompt = self._decide_loop_prompt
+        if self._stop_policy:
+            return self._apply_stop_policy(state)
+
+        return None
+
+    def _apply_stop_policy(self, state: SearchAgentState) -> SearchAgentNode:
+        """Decides whether to start a new search loop from the yield of the previous ones, without an LLM call.
+
+        Args:
+            state (SearchAgentState): state of the Agent.
+
+        Returns:
+            SearchAgentNode: next node to go to.
+        """
+        if self._stop_policy.should_stop(state["id"], state["iteration_yields"]):
+            self._stats.add(
+                "stopping.saved_iterations",
+                self._max_iterations - state["search_loop_iteration"],
+            )
+            return SearchAgentNode.SUMMARY
+
+        return SearchAgentNode.SEARCH
+
+    def _tool_model(
+        self, tool_name: str, node: str
+    ) -> Runnable[LanguageModelInput, tuple[str, AIMessage]]:
+        """Binds all tools of the Agent to the model of the node, forcing it to call the given one.
 
-        response = self._invoke_structured_model(
-            LoopDecision,
-            state["messages"] + [HumanMessage(prompt)],
+        Every call binds the same tools, so that their definitions at the start of the prompt stay identical and the prompt can be served from the provider's cache.
+
+        Args:
+            tool_name (str): name of the tool to call.
+            node (str): name of the node calling the LLM.
+
+        Returns:
+            Runnable[LanguageModelInput, tuple[str, AIMessage]]: model with bound tools, returning the name of the model that served the call along with the response.
+        """
+        return self._node_model(
+            node,
+            ("tools", self._tool_names, tool_name),
+            lambda model: model.bind_tools(self._tools, tool_choice=tool_name),
         )
 
-        return response.loop_decision
+    def _structured_model(
+        self, schema: type[K], node: str
+    ) -> Runnable[LanguageModelInput, tuple[str, dict]]:
+        """Creates the model returning the specified type along with the raw response, using the shared tools.
 
-    @staticmethod
-    def _load_website(url: str) -> str | None:
+        Args:
+            schema (Type[K]): type to return.
+            node (str): name of the node calling the LLM.
+
+        Returns:
+            Runnable[LanguageModelInput, tuple[str, dict]]: model returning the name of the model that served the call along with `raw` and `parsed`.
+        """
+        return self._node_model(
+            node,
+            ("tools", self._tool_names, schema.__name__, "parsed"),
+            lambda model: (
+                model.bind_tools(self._tools, tool_choice=schema.__name__)
+                | RunnableParallel(
+                    raw=RunnablePassthrough(),
+                    parsed=PydanticToolsParser(tools=[schema], first_tool_only=True),
+                )
+                | self._validator(schema)
+            ),
+        )
+
+    def _load_website(self, url: str) -> str | None:
         """Loads website from the specified URL and returns its content.
 
+        Fresh pages are served from the cache, stale ones are revalidated with a
+        conditional request. Stale pages are still served if the revalidation fails
+        with a network or server error, and dropped only once the server answers
+        that they are gone.
+
         Args:
             url (str): url of the website.
 
         Returns:
             str | None: website content or None if failed to load.
         """
+        key = f"{self._extractor.signature}:{normalize_url(url)}"
+        cached = self._page_cache.get(key) if self._page_cache else None
+
+        if cached and cached.fresh:
+            return cached.content
+
         try:
-            response = requests.get(url, timeout=10)
+            response = self._fetcher.get(
+                url, headers=cached.validators() if cached else None
+            )
             response.raise_for_status()
-        except requests.RequestException:
+        except requests.RequestException as e:
+            if cached and not self._gone(e):
+                logger.debug(f"Serving stale content of {url}: {e!r}")
+                self._stats.add("page_cache.stale_served")
+                return cached.content
             return None
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        if cached and response.status_code == 304:
+            self._page_cache.refresh(key)
+            return cached.content
 
-        for script in soup(["script", "style", "noscript"]):
-            script.decompose()
-        content = soup.get_text(separator=" ", strip=True)
+        content = self._extractor.extract(response.text)
+
+        if self._page_cache:
+            self._page_cache.put(
+                key,
+                content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
 
         return content
+
+    @staticmethod
+    def _gone(error: requests.RequestException) -> bool:
+        """Checks whether the failed request means the website is gone rather than temporarily unavailable.
+
+        Args:
+            error (requests.RequestException): error of the request.
+
+        Returns:
+            bool: whether the server answered with a client error other than rate limiting, e.g. 404 or 410.
+        """
+        return (
+            error.response is not None
+            and 400 <= error.response.status_code < 500
+            and error.response.status_code != 429
+        )
@@ -10,6 +10,8 @@ class SearchAgentNode(str, Enum):
     SELECT_PAGE = "SELECT_PAGE"
     LOAD = "LOAD"
     CRITIQUE = "CRITIQUE"
+    COMPACT = "COMPACT"
+    DECIDE_LOOP = "DECIDE_LOOP"
     SUMMARY = "SUMMARY"
     START = START
     END = END
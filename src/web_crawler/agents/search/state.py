@@ -1,19 +1,52 @@
+import operator
+from typing import Annotated
+
 from langchain.agents import AgentState
+from pydantic import BaseModel
 
 from web_crawler.agents.output_structures import (
-    Website,
     WebsiteChoiceList,
     WebsiteCritique,
+    WebsiteHeader,
 )
 from web_crawler.agents.search.output_structures import WebsitesToLoad
 
 
+def extend(current: list, update: list | None) -> list:
+    """Appends new items to the list, None clears it.
+
+    Args:
+        current (list): current value of the state.
+        update (list | None): items returned by a node.
+
+    Returns:
+        list: new value of the state.
+    """
+    return [] if update is None else current + update
+
+
+class PageRef(BaseModel):
+    """Loaded website whose content is kept in the content store.
+
+    Only the reference is checkpointed, contents missing from the store, e.g. in a
+    resumed crawl, are loaded again through the page cache.
+    """
+
+    header: WebsiteHeader
+    content_hash: str
+
+
 class SearchAgentState(AgentState):
     """Extended Agent state."""
 
     id: int
     search_loop_iteration: int
     websites_to_load: WebsitesToLoad
-    loaded_websites: list[Website]
-    website_critiques: list[WebsiteCritique]
+    loaded_websites: Annotated[list[PageRef], extend]
+    reused_websites: Annotated[list[WebsiteHeader], extend]
+    website_critiques: Annotated[list[WebsiteCritique], operator.add]
+    tried_queries: Annotated[list[str], operator.add]
+    iteration_yields: Annotated[list[float], operator.add]
+    planned_queries: list[str]
+    taken_queries: list[str]
     selection: WebsiteChoiceList
@@ -1,20 +1,49 @@
-from langchain_core.messages import HumanMessage, SystemMessage
+import logging
+import math
+
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
+from more_itertools import unique_everseen
 
 from web_crawler.agents import BaseAgent
 from web_crawler.agents.output_structures import WebsiteChoiceList, WebsiteCritique
 from web_crawler.agents.selector import SelectorAgentNode, SelectorAgentState
+from web_crawler.keywords import keywords, overlap
+from web_crawler.loading import normalize_url
+from web_crawler.models import ModelRegistry
+from web_crawler.scheduling import LLMScheduler, Priority
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+FAILED_SHARD_SHARE = 0.25
+"""Fraction of best pre-ranked critiques of a failed shard passed on to the next round."""
 
 
 class SelectorAgent(BaseAgent[SelectorAgentState]):
-    """AI agent meant to pick the best websites for a task based on their critiques."""
+    """AI agent meant to pick the best websites for a task based on their critiques.
+
+    Large sets of critiques are pre-ranked locally by keywords shared with the
+    description, split into shards selected from in parallel, and winners of the
+    shards compete in further rounds until they fit in a single call.
+    """
+
+    name = "selector"
 
     def __init__(
         self,
         description_prompt: str,
         introduction_prompt: str,
         model: str = "openai:gpt-4o",
+        scheduler: LLMScheduler | None = None,
+        stats: Stats | None = None,
+        node_models: dict[str, str] | None = None,
+        fallback_models: dict[str, str] | None = None,
+        timeout: float | None = None,
+        models: ModelRegistry | None = None,
+        shard_size: int | None = None,
+        max_candidates: int | None = None,
     ) -> None:
         """Initializes the Agent's workflow graph and LLM model.
 
@@ -22,11 +51,31 @@ class SelectorAgent(BaseAgent[SelectorAgentState]):
             description_prompt (str): description of the product.
             introduction_prompt (str): prompt to use as an introduction of the role of the selector.
             model (str, optional): LLM model to use as foundation for agents. Defaults to "openai:gpt-4o".
+            scheduler (LLMScheduler | None, optional): scheduler of LLM calls shared by all agents. Defaults to None, which means calling the LLM right away.
+            stats (Stats | None, optional): counters to record token usage in. Defaults to None.
+            node_models (dict[str, str] | None, optional): models to use instead of `model` by node, e.g. "SELECTION". Defaults to None.
+            fallback_models (dict[str, str] | None, optional): models to retry the call with on errors, timeouts or unparsable responses by node. Defaults to None, which means no fallbacks.
+            timeout (float | None, optional): timeout of a single LLM call in seconds. Defaults to None, which uses the provider's default.
+            models (ModelRegistry | None, optional): registry of chat models shared by all agents. Defaults to None, which creates a new one.
+            shard_size (int | None, optional): max number of critiques sent to the model in a single call; larger sets are selected from in shards and a final round. Defaults to None, which sends all critiques at once.
+            max_candidates (int | None, optional): number of best pre-ranked critiques to select from, the rest are dropped. Defaults to None, which means no limit.
         """
-        super().__init__(model)
+        super().__init__(
+            model, scheduler, stats, node_models, fallback_models, timeout, models
+        )
         self._description_prompt = description_prompt
         self._introduction_prompt = introduction_prompt
+        self._reference_keywords = keywords(description_prompt)
+        self._shard_size = shard_size
+        self._max_candidates = max_candidates
         self._workflow = self._build_workflow()
+        self._shard_selector = self._structured_step(
+            WebsiteChoiceList,
+            SelectorAgentNode.SELECTION,
+            lambda shard: shard[0] + [HumanMessage(self._serialize(shard[1]))],
+            priority=Priority.HIGH,
+            shortcut=self._nothing_to_select,
+        )
 
     def run(self, website_critiques: list[WebsiteCritique]) -> WebsiteChoiceList:
         """Runs the Agent.
@@ -46,6 +95,26 @@ class SelectorAgent(BaseAgent[SelectorAgentState]):
 
         return response
 
+    async def arun(self, website_critiques: list[WebsiteCritique]) -> WebsiteChoiceList:
+        """Runs the Agent asynchronously.
+
+        Args:
+            website_critiques (list[WebsiteCritique]): list of websites along with critiques of their suitability.
+
+        Returns:
+            WebsiteList: list of picked websites.
+        """
+        response = (
+            await self._workflow.ainvoke(
+                {
+                    "website_critiques": website_critiques,
+                },
+                {"recursion_limit": 200},
+            )
+        )["selection"]
+
+        return response
+
     def _build_workflow(
         self,
     ) -> CompiledStateGraph[
@@ -60,7 +129,9 @@ class SelectorAgent(BaseAgent[SelectorAgentState]):
 
         workflow_graph.add_node(SelectorAgentNode.DESCRIPTION, self._description)
         workflow_graph.add_node(SelectorAgentNode.INTRODUCTION, self._introduce)
-        workflow_graph.add_node(SelectorAgentNode.SELECTION, self._select)
+        workflow_graph.add_node(
+            SelectorAgentNode.SELECTION, self._node(self._select, self._aselect)
+        )
 
         workflow_graph.add_edge(START, SelectorAgentNode.DESCRIPTION)
         workflow_graph.add_edge(
@@ -71,7 +142,7 @@ class SelectorAgent(BaseAgent[SelectorAgentState]):
         )
         workflow_graph.add_edge(SelectorAgentNode.SELECTION, END)
 
-        workflow = workflow_graph.compile()
+        workflow = workflow_graph.compile(checkpointer=False)
 
         return workflow
 
@@ -92,7 +163,7 @@ class SelectorAgent(BaseAgent[SelectorAgentState]):
         return {"messages": [SystemMessage(self._introduction_prompt)]}
 
     def _select(self, state: SelectorAgentState) -> SelectorAgentState:
-        """Selects the best websites.
+        """Selects the best websites, in rounds of shards if there are too many critiques.
 
         Args:
             state (SelectorAgentState): state of the Agent.
@@ -100,9 +171,181 @@ class SelectorAgent(BaseAgent[SelectorAgentState]):
         Returns:
             SelectorAgentState: update to the state of the Agent.
         """
-        response: WebsiteChoiceList = self._invoke_structured_model(
-            WebsiteChoiceList,
-            state["messages"] + [HumanMessage(str(state["website_critiques"]))],
+        critiques = self._candidates(state["website_critiques"])
+
+        while self._shard_size and len(critiques) > self._shard_size:
+            shards = self._shards(critiques)
+            selections = self._shard_selector.batch(
+                [(state["messages"], shard) for shard in shards],
+                return_exceptions=True,
+            )
+            critiques = self._winners(critiques, shards, selections)
+
+        response = self._shard_selector.invoke((state["messages"], critiques))
+
+        return {"selection": self._rank(response)}
+
+    async def _aselect(self, state: SelectorAgentState) -> SelectorAgentState:
+        """Selects the best websites asynchronously, in rounds of shards if there are too many critiques.
+
+        Args:
+            state (SelectorAgentState): state of the Agent.
+
+        Returns:
+            SelectorAgentState: update to the state of the Agent.
+        """
+        critiques = self._candidates(state["website_critiques"])
+
+        while self._shard_size and len(critiques) > self._shard_size:
+            shards = self._shards(critiques)
+            selections = await self._shard_selector.abatch(
+                [(state["messages"], shard) for shard in shards],
+                return_exceptions=True,
+            )
+            critiques = self._winners(critiques, shards, selections)
+
+        response = await self._shard_selector.ainvoke((state["messages"], critiques))
+
+        return {"selection": self._rank(response)}
+
+    @staticmethod
+    def _nothing_to_select(
+        shard: tuple[list[AnyMessage], list[WebsiteCritique]],
+    ) -> WebsiteChoiceList | None:
+        """Picks no websites without an LLM call if there are no critiques to select from, e.g. once no shard picked any website.
+
+        Args:
+            shard (tuple[list[AnyMessage], list[WebsiteCritique]]): introductory messages and critiques of the shard.
+
+        Returns:
+            WebsiteChoiceList | None: empty list of picked websites, None if there are critiques to select from.
+        """
+        return None if shard[1] else WebsiteChoiceList(websites=[])
+
+    def _candidates(self, critiques: list[WebsiteCritique]) -> list[WebsiteCritique]:
+        """Pre-ranks critiques, keeping the best ones if there are too many.
+
+        Critiques whose upsides share more keywords with the description and whose downsides share fewer go first.
+
+        Args:
+            critiques (list[WebsiteCritique]): critiques to select from.
+
+        Returns:
+            list[WebsiteCritique]: candidates from the best one.
+        """
+        if not self._shard_size and not self._max_candidates:
+            return critiques
+
+        ranked = sorted(critiques, key=self._score, reverse=True)
+        if self._max_candidates and len(ranked) > self._max_candidates:
+            self._stats.add(
+                "selection.dropped_candidates", len(ranked) - self._max_candidates
+            )
+            ranked = ranked[: self._max_candidates]
+
+        return ranked
+
+    def _score(self, critique: WebsiteCritique) -> float:
+        """Scores the critique locally by keywords it shares with the description.
+
+        Args:
+            critique (WebsiteCritique): critique.
+
+        Returns:
+            float: score, higher is better.
+        """
+        return overlap(
+            keywords(critique.critique.upsides), self._reference_keywords
+        ) - overlap(keywords(critique.critique.downsides), self._reference_keywords)
+
+    def _shards(self, critiques: list[WebsiteCritique]) -> list[list[WebsiteCritique]]:
+        """Splits pre-ranked critiques into shards of even size.
+
+        Args:
+            critiques (list[WebsiteCritique]): pre-ranked critiques.
+
+        Returns:
+            list[list[WebsiteCritique]]: shards.
+        """
+        count = math.ceil(len(critiques) / self._shard_size)
+        self._stats.add("selection.rounds")
+        self._stats.add("selection.shards", count)
+
+        return [critiques[i::count] for i in range(count)]
+
+    def _winners(
+        self,
+        critiques: list[WebsiteCritique],
+        shards: list[list[WebsiteCritique]],
+        selections: list[WebsiteChoiceList | Exception],
+    ) -> list[WebsiteCritique]:
+        """Collects critiques of websites picked in shards, in order of the pre-ranking.
+
+        Failed shards pass on their best pre-ranked critiques. If a round doesn't
+        narrow the candidates down, the best pre-ranked winners fill a single shard.
+
+        Args:
+            critiques (list[WebsiteCritique]): pre-ranked candidates of the round.
+            shards (list[list[WebsiteCritique]]): shards of the round.
+            selections (list[WebsiteChoiceList | Exception]): websites picked in every shard.
+
+        Returns:
+            list[WebsiteCritique]: candidates of the next round.
+        """
+        winners = set()
+        for shard, selection in zip(shards, selections):
+            if isinstance(selection, Exception):
+                logger.warning(f"Failed to select from a shard: {selection!r}")
+                kept = shard[: max(1, int(len(shard) * FAILED_SHARD_SHARE))]
+                winners.update(
+                    normalize_url(critique.website.link) for critique in kept
+                )
+            else:
+                winners.update(
+                    normalize_url(choice.website.link) for choice in selection.websites
+                )
+
+        next_round = [
+            critique
+            for critique in critiques
+            if normalize_url(critique.website.link) in winners
+        ]
+        if len(next_round) >= len(critiques):
+            next_round = next_round[: self._shard_size]
+
+        return next_round
+
+    @staticmethod
+    def _rank(selection: WebsiteChoiceList) -> WebsiteChoiceList:
+        """Ranks picked websites by their score, dropping repeated ones.
+
+        Args:
+            selection (WebsiteChoiceList): picked websites.
+
+        Returns:
+            WebsiteChoiceList: unique picked websites from the best one.
+        """
+        choices = unique_everseen(
+            selection.websites, key=lambda choice: normalize_url(choice.website.link)
         )
 
-        return {"selection": response}
+        return WebsiteChoiceList(
+            websites=sorted(choices, key=lambda choice: choice.score, reverse=True)
+        )
+
+    @staticmethod
+    def _serialize(critiques: list[WebsiteCritique]) -> str:
+        """Serializes critiques compactly for the model.
+
+        Args:
+            critiques (list[WebsiteCritique]): critiques.
+
+        Returns:
+            str: one block of URL, upsides and downsides per website.
+        """
+        return "\n\n".join(
+            f"URL: {critique.website.link}\n"
+            f"Upsides: {critique.critique.upsides}\n"
+            f"Downsides: {critique.critique.downsides}"
+            for critique in critiques
+        )
@@ -0,0 +1,4 @@
+from web_crawler.agents.triage.node import TriageAgentNode
+from web_crawler.agents.triage.state import TriageAgentState
+
+__all__ = ["TriageAgentNode", "TriageAgentState"]
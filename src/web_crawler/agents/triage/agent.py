@@ -0,0 +1,173 @@
+import logging
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.state import CompiledStateGraph
+
+from web_crawler.agents.base_agent import BaseAgent
+from web_crawler.agents.output_structures import Website
+from web_crawler.agents.triage import TriageAgentNode, TriageAgentState
+from web_crawler.agents.triage.output_structures import TriageVerdict
+from web_crawler.models import ModelRegistry
+from web_crawler.scheduling import LLMScheduler, Priority
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+
+class TriageAgent(BaseAgent[TriageAgentState]):
+    """AI agent meant to quickly reject websites not worth a full critique, meant for a cheap model."""
+
+    name = "triage"
+
+    def __init__(
+        self,
+        description_prompt: str,
+        introduction_prompt: str,
+        model: str = "openai:gpt-4o-mini",
+        max_input_chars: int = 2000,
+        scheduler: LLMScheduler | None = None,
+        stats: Stats | None = None,
+        node_models: dict[str, str] | None = None,
+        fallback_models: dict[str, str] | None = None,
+        timeout: float | None = None,
+        models: ModelRegistry | None = None,
+    ) -> None:
+        """Initializes the Agent's workflow graph and LLM model.
+
+        Args:
+            description_prompt (str): description of the product.
+            introduction_prompt (str): prompt to use as an introduction of the role of the triage.
+            model (str, optional): LLM model to use as foundation for agents. Defaults to "openai:gpt-4o-mini".
+            max_input_chars (int, optional): number of characters from the start of a website's content sent to the model. Defaults to 2000.
+            scheduler (LLMScheduler | None, optional): scheduler of LLM calls shared by all agents. Defaults to None, which means calling the LLM right away.
+            stats (Stats | None, optional): counters to record token usage in. Defaults to None.
+            node_models (dict[str, str] | None, optional): models to use instead of `model` by node, e.g. "TRIAGE". Defaults to None.
+            fallback_models (dict[str, str] | None, optional): models to retry the call with on errors, timeouts or unparsable responses by node. Defaults to None, which means no fallbacks.
+            timeout (float | None, optional): timeout of a single LLM call in seconds. Defaults to None, which uses the provider's default.
+            models (ModelRegistry | None, optional): registry of chat models shared by all agents. Defaults to None, which creates a new one.
+        """
+        super().__init__(
+            model, scheduler, stats, node_models, fallback_models, timeout, models
+        )
+        self._description_prompt = description_prompt
+        self._introduction_prompt = introduction_prompt
+        self._max_input_chars = max_input_chars
+        self._workflow = self._build_workflow()
+
+    def run(self, websites: list[Website]) -> list[TriageVerdict | None]:
+        """Runs the Agent.
+
+        Args:
+            websites (list[Website]): list of websites to judge.
+
+        Returns:
+            list[TriageVerdict | None]: verdicts in order of websites, None if the website couldn't be judged.
+        """
+        responses: list[TriageAgentState] = self._workflow.batch(
+            self._inputs(websites), {"recursion_limit": 200}, return_exceptions=True
+        )
+
+        return self._verdicts(websites, responses)
+
+    async def arun(self, websites: list[Website]) -> list[TriageVerdict | None]:
+        """Runs the Agent asynchronously.
+
+        Args:
+            websites (list[Website]): list of websites to judge.
+
+        Returns:
+            list[TriageVerdict | None]: verdicts in order of websites, None if the website couldn't be judged.
+        """
+        responses: list[TriageAgentState] = await self._workflow.abatch(
+            self._inputs(websites), {"recursion_limit": 200}, return_exceptions=True
+        )
+
+        return self._verdicts(websites, responses)
+
+    def _inputs(self, websites: list[Website]) -> list[TriageAgentState]:
+        """Creates initial states of the workflow, truncating contents of websites.
+
+        Args:
+            websites (list[Website]): list of websites to judge.
+
+        Returns:
+            list[TriageAgentState]: initial states.
+        """
+        return [
+            {"website": website.content[: self._max_input_chars]}
+            for website in websites
+        ]
+
+    @staticmethod
+    def _verdicts(
+        websites: list[Website], responses: list[TriageAgentState | Exception]
+    ) -> list[TriageVerdict | None]:
+        """Extracts verdicts from final states of the workflow.
+
+        Args:
+            websites (list[Website]): list of judged websites.
+            responses (list[TriageAgentState | Exception]): final states of the workflow.
+
+        Returns:
+            list[TriageVerdict | None]: verdicts, None for failed runs.
+        """
+        verdicts = []
+        for website, response in zip(websites, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"Failed to triage {website.header.link}: {response!r}")
+                verdicts.append(None)
+            else:
+                verdicts.append(response["verdict"])
+
+        return verdicts
+
+    def _build_workflow(
+        self,
+    ) -> CompiledStateGraph[TriageAgentState, None, TriageAgentState, TriageAgentState]:
+        """Builds and compiles the workflow.
+
+        Returns:
+            CompiledStateGraph[TriageAgentState, None, TriageAgentState, TriageAgentState]: execution-ready workflow.
+        """
+        workflow_graph = StateGraph(TriageAgentState)
+
+        workflow_graph.add_node(TriageAgentNode.DESCRIPTION, self._description)
+        workflow_graph.add_node(TriageAgentNode.INTRODUCTION, self._introduce)
+        workflow_graph.add_node(
+            TriageAgentNode.TRIAGE,
+            self._structured_step(
+                TriageVerdict,
+                TriageAgentNode.TRIAGE,
+                lambda state: state["messages"] + [HumanMessage(state["website"])],
+                lambda _, response: {"verdict": response},
+                Priority.LOW,
+            ),
+        )
+
+        workflow_graph.add_edge(START, TriageAgentNode.DESCRIPTION)
+        workflow_graph.add_edge(
+            TriageAgentNode.DESCRIPTION, TriageAgentNode.INTRODUCTION
+        )
+        workflow_graph.add_edge(TriageAgentNode.INTRODUCTION, TriageAgentNode.TRIAGE)
+        workflow_graph.add_edge(TriageAgentNode.TRIAGE, END)
+
+        workflow = workflow_graph.compile(checkpointer=False)
+
+        return workflow
+
+    def _description(self, _: TriageAgentState) -> TriageAgentState:
+        """Introduces the description as context.
+
+        Returns:
+            TriageAgentState: update to the state of the Agent
+        """
+        return {"messages": [SystemMessage(self._description_prompt)]}
+
+    def _introduce(self, _: TriageAgentState) -> TriageAgentState:
+        """Introduces the LLM to its task.
+
+        Returns:
+            TriageAgentState: update to the state of the Agent.
+        """
+        return {"messages": [SystemMessage(self._introduction_prompt)]}
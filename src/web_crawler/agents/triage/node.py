@@ -0,0 +1,11 @@
+from enum import Enum
+
+from langgraph.graph import END, START
+
+
+class TriageAgentNode(str, Enum):
+    DESCRIPTION = "DESCRIPTION"
+    INTRODUCTION = "INTRODUCTION"
+    TRIAGE = "TRIAGE"
+    START = START
+    END = END
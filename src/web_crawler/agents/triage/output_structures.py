@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class TriageVerdict(BaseModel):
+    """Quick verdict whether a website is worth a full critique."""
+
+    suitable: bool = Field(description="whether the website may be suitable")
+    reason: str = Field(description="short reason of the verdict")
@@ -0,0 +1,10 @@
+from langchain.agents import AgentState
+
+from web_crawler.agents.triage.output_structures import TriageVerdict
+
+
+class TriageAgentState(AgentState):
+    """Extended state of the Agent."""
+
+    website: str
+    verdict: TriageVerdict
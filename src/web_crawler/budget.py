@@ -0,0 +1,145 @@
+import logging
+import re
+
+from web_crawler.keywords import keywords, overlap
+from web_crawler.stats import Stats
+from web_crawler.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class ContentBudgeter:
+    """Fits website contents into a token budget, keeping the most relevant chunks."""
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        max_tokens: int,
+        reference: str,
+        chunk_chars: int = 1000,
+        stats: Stats | None = None,
+    ) -> None:
+        """Initializes the budgeter.
+
+        Args:
+            counter (TokenCounter): counter of tokens of the model the contents are sent to.
+            max_tokens (int): max number of tokens of a single content.
+            reference (str): text the relevance of chunks is measured against, e.g. product description.
+            chunk_chars (int, optional): approximate size of a chunk in characters. Defaults to 1000.
+            stats (Stats | None, optional): counters to record trimmed tokens in. Defaults to None.
+        """
+        self._counter = counter
+        self._max_tokens = max_tokens
+        self._reference_keywords = keywords(reference)
+        self._chunk_chars = chunk_chars
+        self._stats = stats or Stats()
+
+    def fit(self, content: str) -> str:
+        """Trims the content to the token budget.
+
+        The content is split into chunks of whole sentences. The first chunk, usually
+        holding the title, is always kept; the rest are picked by keyword overlap with
+        the reference until the budget is spent and are put back in original order,
+        joined by their original separators, e.g. paragraph breaks.
+
+        Args:
+            content (str): content to trim.
+
+        Returns:
+            str: content within the token budget.
+        """
+        tokens = self._counter.count(content)
+        if tokens <= self._max_tokens:
+            return content
+
+        chunks = self._split(content)
+        chunk_tokens = [self._counter.count(chunk) for chunk in chunks]
+        ranking = sorted(
+            range(len(chunks)),
+            key=lambda i: (
+                i != 0,
+                -overlap(keywords(chunks[i]), self._reference_keywords),
+                i,
+            ),
+        )
+
+        picked = set()
+        kept_tokens = 0
+        for i in ranking:
+            if kept_tokens + chunk_tokens[i] <= self._max_tokens:
+                picked.add(i)
+                kept_tokens += chunk_tokens[i]
+
+        trimmed = self._join(chunks, sorted(picked))
+        if not trimmed:
+            trimmed = content[: self._max_tokens * len(content) // tokens]
+            kept_tokens = self._counter.count(trimmed)
+
+        self._stats.add("budget.trimmed_pages")
+        self._stats.add("budget.trimmed_tokens", tokens - kept_tokens)
+        logger.info(f"Trimmed content from {tokens} to {kept_tokens} tokens.")
+
+        return trimmed
+
+    def _split(self, content: str) -> list[str]:
+        """Splits the content into chunks of whole sentences, keeping the whitespace after them.
+
+        Args:
+            content (str): content to split.
+
+        Returns:
+            list[str]: chunks, making up the content when concatenated.
+        """
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(content):
+            sentences.append(content[start : match.end()])
+            start = match.end()
+        if start < len(content):
+            sentences.append(content[start:])
+
+        chunks = []
+        current = ""
+        for sentence in sentences:
+            while len(sentence) > self._chunk_chars:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(sentence[: self._chunk_chars])
+                sentence = sentence[self._chunk_chars :]
+
+            if current and len(current) + len(sentence) > self._chunk_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current += sentence
+
+        if current:
+            chunks.append(current)
+
+        return chunks
+
+    @staticmethod
+    def _join(chunks: list[str], picked: list[int]) -> str:
+        """Joins picked chunks, separating ones that weren't adjacent with a space if they lack whitespace.
+
+        Args:
+            chunks (list[str]): chunks of the content.
+            picked (list[int]): sorted indices of picked chunks.
+
+        Returns:
+            str: joined chunks.
+        """
+        parts = []
+        for previous, i in zip([None, *picked], picked):
+            if (
+                previous is not None
+                and i != previous + 1
+                and not chunks[previous][-1:].isspace()
+            ):
+                parts.append(" ")
+            parts.append(chunks[i])
+
+        return "".join(parts).strip()
@@ -0,0 +1,12 @@
+from web_crawler.cache.checkpoints import SqliteCheckpointer
+from web_crawler.cache.critiques import CritiqueCache
+from web_crawler.cache.pages import CachedPage, PageCache
+from web_crawler.cache.searches import SearchCache
+
+__all__ = [
+    "CachedPage",
+    "CritiqueCache",
+    "PageCache",
+    "SearchCache",
+    "SqliteCheckpointer",
+]
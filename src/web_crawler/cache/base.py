@@ -0,0 +1,43 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+
+
+class SqliteCache:
+    """Base class for caches persisted in an SQLite database."""
+
+    _schema: str = ""
+
+    def __init__(self, path: str) -> None:
+        """Opens the database and creates its tables.
+
+        Args:
+            path (str): path to the database file.
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._connection:
+            self._connection.executescript(self._schema)
+
+    def close(self) -> None:
+        """Closes the database."""
+        with self._lock:
+            self._connection.close()
+
+    def _execute(self, query: str, parameters: tuple[Any, ...] = ()) -> list[Any]:
+        """Executes a query in a transaction.
+
+        Args:
+            query (str): SQL query.
+            parameters (tuple[Any, ...], optional): query parameters. Defaults to ().
+
+        Returns:
+            list[Any]: fetched rows.
+        """
+        with self._lock, self._connection:
+            return self._connection.execute(query, parameters).fetchall()
@@ -0,0 +1,76 @@
+import sqlite3
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import aiosqlite
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from web_crawler.agents.output_structures import (
+    Critique,
+    Website,
+    WebsiteChoice,
+    WebsiteChoiceList,
+    WebsiteCritique,
+    WebsiteHeader,
+)
+from web_crawler.agents.search.output_structures import WebsitesToLoad
+from web_crawler.agents.search.state import PageRef
+
+STATE_TYPES = [
+    Critique,
+    PageRef,
+    Website,
+    WebsiteChoice,
+    WebsiteChoiceList,
+    WebsiteCritique,
+    WebsiteHeader,
+    WebsitesToLoad,
+]
+
+
+class SqliteCheckpointer:
+    """On-disk store of checkpoints of workflows, letting interrupted runs resume from the last completed node.
+
+    Checkpoints are saved by LangGraph's SQLite savers to a single database:
+    `SqliteSaver` serves sync runs and `AsyncSqliteSaver`, opened on the running
+    event loop, serves async ones. Only messages and types of the agents' states
+    are deserialized. Checkpoints hold critiques and references to loaded websites,
+    not their contents.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Opens the database.
+
+        Args:
+            path (str): path to the database file.
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._path = path
+        self._serde = JsonPlusSerializer(
+            allowed_msgpack_modules=[
+                (type_.__module__, type_.__name__) for type_ in STATE_TYPES
+            ]
+        )
+        self.saver = SqliteSaver(
+            sqlite3.connect(path, check_same_thread=False), serde=self._serde
+        )
+        """Saver of sync runs."""
+
+    @asynccontextmanager
+    async def asaver(self) -> AsyncIterator[AsyncSqliteSaver]:
+        """Opens the saver of async runs on the running event loop.
+
+        Yields:
+            AsyncSqliteSaver: saver of async runs.
+        """
+        async with aiosqlite.connect(self._path) as connection:
+            yield AsyncSqliteSaver(connection, serde=self._serde)
+
+    def close(self) -> None:
+        """Closes the database."""
+        self.saver.conn.close()
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import time
+
+from web_crawler.agents.output_structures import Critique
+from web_crawler.cache.base import SqliteCache
+
+
+class CritiqueCache(SqliteCache):
+    """On-disk cache of critiques keyed by the prompts, the model and the website content.
+
+    Changing any prompt or the model changes the keys, so critiques made with old
+    prompts are never served again and are evicted as they expire or fall out of use.
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS critiques (
+            key TEXT PRIMARY KEY,
+            critique TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS critiques_accessed_at ON critiques (accessed_at);
+    """
+
+    def __init__(
+        self, path: str, ttl: float = 30 * 86400, max_entries: int = 50_000
+    ) -> None:
+        """Opens the cache.
+
+        Args:
+            path (str): path to the database file.
+            ttl (float, optional): time in seconds after which a critique expires. Defaults to 30 days.
+            max_entries (int, optional): number of critiques above which the least recently used ones are evicted. Defaults to 50000.
+        """
+        super().__init__(path)
+        self._ttl = ttl
+        self._max_entries = max_entries
+
+    @staticmethod
+    def key(*inputs: str) -> str:
+        """Hashes the inputs of a critique into a cache key.
+
+        Args:
+            *inputs (str): prompts, including the one of the mode of the critique, model name and website content.
+
+        Returns:
+            str: cache key.
+        """
+        return hashlib.sha256(json.dumps(inputs).encode()).hexdigest()
+
+    def get(self, key: str) -> Critique | None:
+        """Looks up the critique.
+
+        Args:
+            key (str): cache key.
+
+        Returns:
+            Critique | None: critique or None if it's not cached or expired.
+        """
+        now = time.time()
+        rows = self._execute(
+            "UPDATE critiques SET accessed_at = ? WHERE key = ? AND created_at >= ? "
+            "RETURNING critique",
+            (now, key, now - self._ttl),
+        )
+        if not rows:
+            return None
+
+        return Critique.model_validate_json(rows[0][0])
+
+    def put(self, key: str, critique: Critique) -> None:
+        """Stores the critique and evicts expired and least recently used ones.
+
+        Args:
+            key (str): cache key.
+            critique (Critique): critique.
+        """
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO critiques VALUES (?, ?, ?, ?)",
+            (key, critique.model_dump_json(), now, now),
+        )
+        self._execute("DELETE FROM critiques WHERE created_at < ?", (now - self._ttl,))
+        self._execute(
+            "DELETE FROM critiques WHERE key IN ("
+            "SELECT key FROM critiques ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self._max_entries,),
+        )
@@ -0,0 +1,134 @@
+import time
+from dataclasses import dataclass
+
+from web_crawler.cache.base import SqliteCache
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """Extracted website content along with its HTTP validators."""
+
+    content: str
+    etag: str | None
+    last_modified: str | None
+    fresh: bool
+
+    def validators(self) -> dict[str, str]:
+        """Returns headers turning a GET into a conditional one.
+
+        Returns:
+            dict[str, str]: request headers.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class PageCache(SqliteCache):
+    """On-disk cache of website contents keyed by normalized URL."""
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            content TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+    """
+
+    def __init__(
+        self, path: str, ttl: float = 86400, max_bytes: int = 256 * 1024 * 1024
+    ) -> None:
+        """Opens the cache.
+
+        Args:
+            path (str): path to the database file.
+            ttl (float, optional): time in seconds after which a page has to be revalidated. Defaults to 86400.
+            max_bytes (int, optional): size of stored contents above which the least recently used pages are evicted. Defaults to 256 MiB.
+        """
+        super().__init__(path)
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+
+    def get(self, url: str) -> CachedPage | None:
+        """Looks up the page.
+
+        Args:
+            url (str): normalized url of the page.
+
+        Returns:
+            CachedPage | None: cached page or None if it's not cached.
+        """
+        now = time.time()
+        rows = self._execute(
+            "UPDATE pages SET accessed_at = ? WHERE url = ? "
+            "RETURNING content, etag, last_modified, fetched_at",
+            (now, url),
+        )
+        if not rows:
+            return None
+
+        content, etag, last_modified, fetched_at = rows[0]
+
+        return CachedPage(
+            content=content,
+            etag=etag,
+            last_modified=last_modified,
+            fresh=now - fetched_at < self._ttl,
+        )
+
+    def put(
+        self,
+        url: str,
+        content: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Stores the page and evicts stale entries.
+
+        Args:
+            url (str): normalized url of the page.
+            content (str): extracted content of the page.
+            etag (str | None, optional): ETag header of the response. Defaults to None.
+            last_modified (str | None, optional): Last-Modified header of the response. Defaults to None.
+        """
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, content, etag, last_modified, now, now, len(content.encode())),
+        )
+        self._evict()
+
+    def refresh(self, url: str) -> None:
+        """Marks the page as revalidated, e.g. after a 304 response.
+
+        Args:
+            url (str): normalized url of the page.
+        """
+        self._execute(
+            "UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url)
+        )
+
+    def _evict(self) -> None:
+        """Removes expired pages that can't be revalidated and the least recently used pages above the size limit."""
+        self._execute(
+            "DELETE FROM pages WHERE fetched_at < ? "
+            "AND etag IS NULL AND last_modified IS NULL",
+            (time.time() - self._ttl,),
+        )
+        self._execute(
+            "DELETE FROM pages WHERE url IN ("
+            "SELECT url FROM ("
+            "SELECT url, SUM(size) OVER (ORDER BY accessed_at DESC) AS total "
+            "FROM pages"
+            ") WHERE total > ?)",
+            (self._max_bytes,),
+        )
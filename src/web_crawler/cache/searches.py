@@ -0,0 +1,59 @@
+import json
+import time
+from typing import Any
+
+from web_crawler.cache.base import SqliteCache
+
+
+class SearchCache(SqliteCache):
+    """On-disk cache of search results keyed by normalized query."""
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS searches (
+            key TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: str, ttl: float = 86400) -> None:
+        """Opens the cache.
+
+        Args:
+            path (str): path to the database file.
+            ttl (float, optional): time in seconds after which results expire. Defaults to 86400.
+        """
+        super().__init__(path)
+        self._ttl = ttl
+
+    def get(self, key: str) -> Any | None:
+        """Looks up results of the search.
+
+        Args:
+            key (str): normalized query.
+
+        Returns:
+            Any | None: results or None if they're not cached or expired.
+        """
+        rows = self._execute(
+            "SELECT result FROM searches WHERE key = ? AND created_at >= ?",
+            (key, time.time() - self._ttl),
+        )
+        if not rows:
+            return None
+
+        return json.loads(rows[0][0])
+
+    def put(self, key: str, result: Any) -> None:
+        """Stores results of the search and evicts expired ones.
+
+        Args:
+            key (str): normalized query.
+            result (Any): JSON-serializable results.
+        """
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO searches VALUES (?, ?, ?)",
+            (key, json.dumps(result), now),
+        )
+        self._execute("DELETE FROM searches WHERE created_at < ?", (now - self._ttl,))
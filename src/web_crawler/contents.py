@@ -0,0 +1,86 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from web_crawler.stats import Stats
+
+
+class ContentStore:
+    """Thread-safe store of loaded website contents shared by all runs, keeping them out of the workflow state.
+
+    Contents are keyed by their hash, so the state of a run only refers to them.
+    Once stored contents exceed the size limit, the least recently used ones are
+    evicted and have to be loaded again by the run needing them.
+    """
+
+    def __init__(
+        self, max_chars: int = 32 * 1024 * 1024, stats: Stats | None = None
+    ) -> None:
+        """Initializes the store.
+
+        Args:
+            max_chars (int, optional): number of stored characters above which the least recently used contents are evicted. Defaults to 32 Mi.
+            stats (Stats | None, optional): counters to record evictions in. Defaults to None.
+        """
+        self._max_chars = max_chars
+        self._stats = stats or Stats()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all stored contents."""
+        with self._lock:
+            self._contents: OrderedDict[str, str] = OrderedDict()
+            self._chars = 0
+
+    def put(self, content: str) -> str:
+        """Stores the content.
+
+        Args:
+            content (str): content of a website.
+
+        Returns:
+            str: hash of the content referring to it.
+        """
+        key = hashlib.sha256(content.encode()).hexdigest()
+
+        with self._lock:
+            if key in self._contents:
+                self._contents.move_to_end(key)
+                return key
+
+            self._contents[key] = content
+            self._chars += len(content)
+            while self._chars > self._max_chars and len(self._contents) > 1:
+                _, evicted = self._contents.popitem(last=False)
+                self._chars -= len(evicted)
+                self._stats.add("contents.evictions")
+
+        return key
+
+    def get(self, key: str) -> str | None:
+        """Looks up the content.
+
+        Args:
+            key (str): hash of the content.
+
+        Returns:
+            str | None: content or None if it was evicted.
+        """
+        with self._lock:
+            content = self._contents.get(key)
+            if content is not None:
+                self._contents.move_to_end(key)
+
+            return content
+
+    def discard(self, key: str) -> None:
+        """Removes the content once no run needs it.
+
+        Args:
+            key (str): hash of the content.
+        """
+        with self._lock:
+            content = self._contents.pop(key, None)
+            if content is not None:
+                self._chars -= len(content)
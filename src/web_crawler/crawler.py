@@ -1,9 +1,29 @@
 import logging
+from collections.abc import AsyncIterator, Iterator
+from contextlib import aclosing, closing
 
 from langchain.tools import BaseTool
 
-from web_crawler.agents import CriticAgent, SearchAgent, SelectorAgent
-from web_crawler.agents.output_structures import WebsiteChoice
+from web_crawler.agents import (
+    CriticAgent,
+    PlannerAgent,
+    SearchAgent,
+    SelectorAgent,
+    TriageAgent,
+)
+from web_crawler.agents.output_structures import WebsiteChoice, WebsiteCritique
+from web_crawler.cache import CritiqueCache, PageCache, SearchCache, SqliteCheckpointer
+from web_crawler.contents import ContentStore
+from web_crawler.dedupe import PageDeduplicator
+from web_crawler.loading import PageFetcher, get_extractor
+from web_crawler.models import ModelRegistry
+from web_crawler.rate_limiting import RateLimiter
+from web_crawler.registry import CritiqueRegistry
+from web_crawler.scheduling import LLMScheduler, ModelLimits
+from web_crawler.search_tools import CachedSearchTool, RateLimitedTool
+from web_crawler.stats import Stats
+from web_crawler.stopping import YieldStopPolicy
+from web_crawler.triage import PageTriage
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +44,49 @@ class Crawler:
         model: str = "openai:gpt-4o",
         search_min_iterations: int = 2,
         search_max_iterations: int = 5,
+        search_max_history_tokens: int | None = None,
+        load_timeout: float = 10,
+        load_max_workers: int = 16,
+        load_max_per_host: int = 4,
+        load_deadline: float = 30,
+        page_cache_path: str | None = None,
+        page_cache_ttl: float = 86400,
+        page_cache_max_bytes: int = 256 * 1024 * 1024,
+        extractor: str = "lxml",
+        max_page_chars: int | None = None,
+        critic_max_input_tokens: int | None = None,
+        critique_cache_path: str | None = None,
+        critique_cache_ttl: float = 30 * 86400,
+        critique_cache_max_entries: int = 50_000,
+        search_cache_ttl: float | None = None,
+        search_cache_path: str | None = None,
+        search_rate: float | None = None,
+        load_rate_per_host: float | None = None,
+        retries: int = 2,
+        backoff_base: float = 1,
+        backoff_max: float = 30,
+        max_concurrency: int | None = None,
+        model_rpm: float | None = None,
+        model_tpm: float | None = None,
+        critic_batch_tokens: int | None = None,
+        triage: bool = False,
+        triage_min_chars: int = 200,
+        triage_min_relevance: float = 0.02,
+        triage_model: str | None = None,
+        triage_introduction_prompt: str | None = None,
+        node_models: dict[str, str] | None = None,
+        fallback_models: dict[str, str] | None = None,
+        model_timeout: float | None = None,
+        model_prices: dict[str, tuple[float, float]] | None = None,
+        checkpoint_path: str | None = None,
+        selector_shard_size: int | None = None,
+        selector_max_candidates: int | None = None,
+        global_selection: bool = False,
+        content_store_max_chars: int = 32 * 1024 * 1024,
+        search_min_yield: float | None = None,
+        search_yield_patience: int = 1,
+        planner_introduction_prompt: str | None = None,
+        planner_max_similarity: float = 0.5,
     ) -> None:
         """Initializes the agents to use.
 
@@ -39,19 +102,173 @@ class Crawler:
             model (str, optional): foundation model. Defaults to "openai:gpt-4o".
             search_min_iterations (int, optional): min number of iterations in a single run of the Search agent. Defaults to 2.
             search_max_iterations (int, optional): max number of iterations in a single run of the Search agent. Defaults to 5.
+            search_max_history_tokens (int | None, optional): number of tokens of the Search agent's message history above which earlier iterations are compacted into a summary of tried queries and covered domains. Defaults to None, which means no limit.
+            load_timeout (float, optional): timeout of loading a single website in seconds. Defaults to 10.
+            load_max_workers (int, optional): max number of websites loaded at the same time. Defaults to 16.
+            load_max_per_host (int, optional): max number of websites loaded at the same time from a single host. Defaults to 4.
+            load_deadline (float, optional): total time in seconds for loading websites picked in a single step. Defaults to 30.
+            page_cache_path (str | None, optional): path of the on-disk cache of website contents. Defaults to None, which disables caching.
+            page_cache_ttl (float, optional): time in seconds after which cached websites are revalidated. Defaults to 86400.
+            page_cache_max_bytes (int, optional): size of the website cache above which the least recently used websites are evicted. Defaults to 256 MiB.
+            extractor (str, optional): engine extracting text from websites, one of "lxml", "readability", "streaming" or "soup". "readability" keeps only the main content of the page. Defaults to "lxml".
+            max_page_chars (int | None, optional): number of characters after which text extraction stops. Defaults to None, which means no limit.
+            critic_max_input_tokens (int | None, optional): max number of tokens of a single website's content sent to the Critic; the most relevant parts are kept. Defaults to None, which means no limit.
+            critique_cache_path (str | None, optional): path of the on-disk cache of critiques, keyed by prompts, model and website content. Defaults to None, which disables caching.
+            critique_cache_ttl (float, optional): time in seconds after which cached critiques expire. Defaults to 30 days.
+            critique_cache_max_entries (int, optional): number of cached critiques above which the least recently used ones are evicted. Defaults to 50000.
+            search_cache_ttl (float | None, optional): time in seconds for which results of a normalized query are reused. Defaults to None, which disables caching of searches.
+            search_cache_path (str | None, optional): path of the on-disk cache of search results, used along with the in-memory one. Defaults to None.
+            search_rate (float | None, optional): max number of searches per second, shared by all runs. Defaults to None, which means no limit.
+            load_rate_per_host (float | None, optional): max number of websites loaded from a single host per second, shared by all runs. Defaults to None, which means no limit.
+            retries (int, optional): number of retries of failed searches and rate-limited or failed website loads. Defaults to 2.
+            backoff_base (float, optional): delay after the first failure in seconds, doubled with every retry and jittered. Defaults to 1.
+            backoff_max (float, optional): max delay between retries in seconds. Defaults to 30.
+            max_concurrency (int | None, optional): max number of LLM calls in flight at once, shared by all runs and agents. Defaults to None, which means no limit.
+            model_rpm (float | None, optional): max number of requests per minute sent to each model; calls finishing runs go first. Defaults to None, which means no limit.
+            model_tpm (float | None, optional): max number of tokens per minute sent to each model, estimated before each call. Defaults to None, which means no limit.
+            critic_batch_tokens (int | None, optional): max number of tokens of websites' contents critiqued together in a single call, sharing the prompts. Defaults to None, which critiques every website in a separate call.
+            triage (bool, optional): whether to reject websites obviously not worth a critique before critiquing them: short pages, error pages, login walls, pages not in English and pages unrelated to the description. Defaults to False.
+            triage_min_chars (int, optional): min number of characters of a website passing the triage. Defaults to 200.
+            triage_min_relevance (float, optional): min fraction of keywords of the description present in a website passing the triage. Defaults to 0.02.
+            triage_model (str | None, optional): cheap model judging websites passing the local checks of the triage. Defaults to None, which means only using the local checks.
+            triage_introduction_prompt (str | None, optional): prompt introducing the role of the triage model, required along with `triage_model`. Defaults to None.
+            node_models (dict[str, str] | None, optional): models to use instead of `model` by node: "SEARCH", "SELECT_PAGE", "DECIDE_LOOP", "CRITIQUE", "SELECTION", "TRIAGE" or "PLAN". Defaults to None, which uses `model` everywhere.
+            fallback_models (dict[str, str] | None, optional): models to retry the call with on errors, timeouts or unparsable responses by node. Defaults to None, which means no fallbacks.
+            model_timeout (float | None, optional): timeout of a single LLM call in seconds, after which the fallback model is called. Defaults to None, which uses the provider's default.
+            model_prices (dict[str, tuple[float, float]] | None, optional): prices of input and output tokens in USD per million by model, used to report cost per node. Defaults to None, which reports only latency and tokens.
+            checkpoint_path (str | None, optional): path of the on-disk store of checkpoints saved after every node of the Search agent, letting an interrupted crawl resume with its critiques. Checkpoints only refer to loaded websites, so resumed runs load websites they are still to critique again, from the page cache if `page_cache_path` is set and over the network otherwise. Defaults to None, which disables checkpointing.
+            selector_shard_size (int | None, optional): max number of critiques sent to the Selector agent's model in a single call; larger sets are pre-ranked, selected from in parallel shards and merged in a final round. Defaults to None, which sends all critiques at once.
+            selector_max_candidates (int | None, optional): number of best pre-ranked critiques the Selector agent picks from. Defaults to None, which means no limit.
+            global_selection (bool, optional): whether runs only gather critiques and a single selection ranks websites from the merged critiques of all runs, instead of joining websites selected by every run. Defaults to False.
+            content_store_max_chars (int, optional): number of characters of loaded website contents kept in memory until they're critiqued, above which the least recently used ones are evicted and loaded again when needed. Defaults to 32 Mi.
+            search_min_yield (float | None, optional): fraction of websites picked in a Search agent's iteration that have to be new, substantive finds for the loop to continue after `search_min_iterations`, decided locally without an LLM call. Defaults to None, which lets the LLM decide.
+            search_yield_patience (int, optional): number of consecutive iterations below `search_min_yield` after which the loop stops. Defaults to 1.
+            planner_introduction_prompt (str | None, optional): prompt introducing the role of the Planner agent, which plans diverse queries once and deals disjoint sets of them to the first `search_min_iterations` iterations of all runs, later iterations ask the model for new queries. Needs `search_tool` to take a single required string argument. Defaults to None, which lets every run come up with queries as it goes.
+            planner_max_similarity (float, optional): Jaccard similarity of keywords above which a planned query is rejected as a near-duplicate of another one. Defaults to 0.5.
         """
+        assert not triage_model or triage_introduction_prompt, (
+            "triage_introduction_prompt is required along with triage_model"
+        )
+        self._stats = Stats()
+        self._node_models = {
+            **({"TRIAGE": triage_model} if triage_model else {}),
+            **(node_models or {}),
+        }
+        self._model_prices = model_prices or {}
+        models = {model, *self._node_models.values()}
+        models.update((fallback_models or {}).values())
+        model_registry = ModelRegistry()
+        self._scheduler = LLMScheduler(
+            {
+                name: ModelLimits(rpm=model_rpm, tpm=model_tpm)
+                for name in models
+                if name
+            },
+            max_concurrency=max_concurrency,
+            stats=self._stats,
+        )
 
+        search_tool = RateLimitedTool(
+            search_tool,
+            RateLimiter(search_rate) if search_rate else None,
+            retries=retries,
+            backoff_base=backoff_base,
+            backoff_max=backoff_max,
+            stats=self._stats,
+        )
+        if search_cache_ttl:
+            search_tool = CachedSearchTool(
+                search_tool,
+                ttl=search_cache_ttl,
+                cache=SearchCache(search_cache_path, ttl=search_cache_ttl)
+                if search_cache_path
+                else None,
+                stats=self._stats,
+            )
+
+        fetcher = PageFetcher(
+            timeout=load_timeout,
+            max_workers=load_max_workers,
+            max_per_host=load_max_per_host,
+            deadline=load_deadline,
+            limiter=RateLimiter(load_rate_per_host) if load_rate_per_host else None,
+            retries=retries,
+            backoff_base=backoff_base,
+            backoff_max=backoff_max,
+            stats=self._stats,
+        )
+        page_cache = (
+            PageCache(
+                page_cache_path, ttl=page_cache_ttl, max_bytes=page_cache_max_bytes
+            )
+            if page_cache_path
+            else None
+        )
+        critique_cache = (
+            CritiqueCache(
+                critique_cache_path,
+                ttl=critique_cache_ttl,
+                max_entries=critique_cache_max_entries,
+            )
+            if critique_cache_path
+            else None
+        )
         critic = CriticAgent(
             introduction_prompt=critic_introduction_prompt,
             description_prompt=description_prompt,
             model=model,
+            max_input_tokens=critic_max_input_tokens,
+            cache=critique_cache,
+            stats=self._stats,
+            scheduler=self._scheduler,
+            batch_tokens=critic_batch_tokens,
+            node_models=self._node_models,
+            fallback_models=fallback_models,
+            timeout=model_timeout,
+            models=model_registry,
         )
         selector = SelectorAgent(
             introduction_prompt=selector_introduction_prompt,
             description_prompt=description_prompt,
             model=model,
+            scheduler=self._scheduler,
+            stats=self._stats,
+            node_models=self._node_models,
+            fallback_models=fallback_models,
+            timeout=model_timeout,
+            models=model_registry,
+            shard_size=selector_shard_size,
+            max_candidates=selector_max_candidates,
         )
 
+        page_triage = (
+            PageTriage(
+                description_prompt,
+                min_chars=triage_min_chars,
+                min_relevance=triage_min_relevance,
+                agent=TriageAgent(
+                    description_prompt=description_prompt,
+                    introduction_prompt=triage_introduction_prompt,
+                    model=triage_model,
+                    scheduler=self._scheduler,
+                    stats=self._stats,
+                    node_models=self._node_models,
+                    fallback_models=fallback_models,
+                    timeout=model_timeout,
+                    models=model_registry,
+                )
+                if triage_model
+                else None,
+                stats=self._stats,
+            )
+            if triage
+            else None
+        )
+
+        self._deduplicator = PageDeduplicator(stats=self._stats)
+        self._content_store = ContentStore(content_store_max_chars, stats=self._stats)
+        self._registry = CritiqueRegistry(stats=self._stats)
+
         self._agent = SearchAgent(
             search_tool=search_tool,
             critic=critic,
@@ -63,20 +280,336 @@ class Crawler:
             model=model,
             min_iterations=search_min_iterations,
             max_iterations=search_max_iterations,
+            fetcher=fetcher,
+            page_cache=page_cache,
+            extractor=get_extractor(extractor, max_page_chars, self._stats),
+            deduplicator=self._deduplicator,
+            registry=self._registry,
+            scheduler=self._scheduler,
+            stats=self._stats,
+            max_history_tokens=search_max_history_tokens,
+            triage=page_triage,
+            planner=PlannerAgent(
+                description_prompt=description_prompt,
+                introduction_prompt=planner_introduction_prompt,
+                model=model,
+                max_similarity=planner_max_similarity,
+                scheduler=self._scheduler,
+                stats=self._stats,
+                node_models=self._node_models,
+                fallback_models=fallback_models,
+                timeout=model_timeout,
+                models=model_registry,
+            )
+            if planner_introduction_prompt
+            else None,
+            stop_policy=YieldStopPolicy(
+                description_prompt,
+                min_yield=search_min_yield,
+                patience=search_yield_patience,
+                stats=self._stats,
+            )
+            if search_min_yield is not None
+            else None,
+            checkpointer=SqliteCheckpointer(checkpoint_path)
+            if checkpoint_path
+            else None,
+            global_selection=global_selection,
+            content_store=self._content_store,
+            node_models=self._node_models,
+            fallback_models=fallback_models,
+            timeout=model_timeout,
+            models=model_registry,
         )
         self._iterations = iterations
 
-    def run(self) -> list[WebsiteChoice]:
+    @property
+    def stats(self) -> Stats:
+        """Counters gathered during the last run."""
+        return self._stats
+
+    def run(self, crawl_id: str | None = None) -> list[WebsiteChoice]:
         """Runs the crawler and returns found websites.
 
+        Args:
+            crawl_id (str | None, optional): ID of an interrupted crawl to resume, logged when it started; requires `checkpoint_path`. Defaults to None, which starts a new crawl.
+
+        Returns:
+            list[WebsiteChoice]: found websites.
+        """
+        self._reset()
+
+        result = self._agent.run(self._iterations, crawl_id)
+
+        logger.info(
+            f"All agents have completed their runs, found {len(result)} websites."
+        )
+        self._log_stats()
+
+        return result
+
+    async def arun(self, crawl_id: str | None = None) -> list[WebsiteChoice]:
+        """Runs the crawler asynchronously and returns found websites.
+
+        Many crawls can run inside a single event loop, LLM calls and searches don't occupy threads.
+
+        Args:
+            crawl_id (str | None, optional): ID of an interrupted crawl to resume, logged when it started; requires `checkpoint_path`. Defaults to None, which starts a new crawl.
+
         Returns:
             list[WebsiteChoice]: found websites.
         """
+        self._reset()
 
-        result = self._agent.run(self._iterations)
+        result = await self._agent.arun(self._iterations, crawl_id)
 
         logger.info(
             f"All agents have completed their runs, found {len(result)} websites."
         )
+        self._log_stats()
 
         return result
+
+    def stream(
+        self, critiques: bool = False, crawl_id: str | None = None
+    ) -> Iterator[WebsiteChoice | WebsiteCritique]:
+        """Runs the crawler, yielding found websites as soon as the run selecting them finishes.
+
+        Args:
+            critiques (bool, optional): whether to also yield critiques of websites as soon as they are computed. Defaults to False.
+            crawl_id (str | None, optional): ID of an interrupted crawl to resume, logged when it started; requires `checkpoint_path`. Defaults to None, which starts a new crawl.
+
+        Closing the stream early stops the runs, cancelling websites still to load.
+
+        Yields:
+            WebsiteChoice | WebsiteCritique: unique found websites and, optionally, unique critiques.
+        """
+        self._reset()
+
+        found = 0
+        with closing(
+            self._agent.stream(self._iterations, critiques, crawl_id)
+        ) as items:
+            for item in items:
+                found += isinstance(item, WebsiteChoice)
+                yield item
+
+        logger.info(f"All agents have completed their runs, found {found} websites.")
+        self._log_stats()
+
+    async def astream(
+        self, critiques: bool = False, crawl_id: str | None = None
+    ) -> AsyncIterator[WebsiteChoice | WebsiteCritique]:
+        """Runs the crawler asynchronously, yielding found websites as soon as the run selecting them finishes.
+
+        Args:
+            critiques (bool, optional): whether to also yield critiques of websites as soon as they are computed. Defaults to False.
+            crawl_id (str | None, optional): ID of an interrupted crawl to resume, logged when it started; requires `checkpoint_path`. Defaults to None, which starts a new crawl.
+
+        Closing the stream early stops the runs, cancelling websites still to load.
+
+        Yields:
+            WebsiteChoice | WebsiteCritique: unique found websites and, optionally, unique critiques.
+        """
+        self._reset()
+
+        found = 0
+        async with aclosing(
+            self._agent.astream(self._iterations, critiques, crawl_id)
+        ) as items:
+            async for item in items:
+                found += isinstance(item, WebsiteChoice)
+                yield item
+
+        logger.info(f"All agents have completed their runs, found {found} websites.")
+        self._log_stats()
+
+    def _reset(self) -> None:
+        """Forgets counters and websites seen during the previous run."""
+        self._stats.reset()
+        self._deduplicator.reset()
+        self._content_store.reset()
+        self._registry.reset()
+
+    def _log_stats(self) -> None:
+        """Logs counters gathered during the run."""
+        kept_ratio = self._stats.ratio(
+            "extraction.kept_chars", "extraction.chars_before_cleanup"
+        )
+        if kept_ratio is not None:
+            logger.info(f"Main content extraction kept {kept_ratio:.0%} of text.")
+
+        trimmed_tokens = self._stats.get("budget.trimmed_tokens")
+        if trimmed_tokens:
+            logger.info(
+                f"Trimmed {trimmed_tokens:.0f} tokens from "
+                f"{self._stats.get('budget.trimmed_pages'):.0f} websites sent to the Critic."
+            )
+
+        checked = self._stats.get("dedupe.checked_urls")
+        if checked:
+            duplicates = sum(
+                self._stats.get(f"dedupe.{kind}_duplicates")
+                for kind in ("url", "exact", "near")
+            )
+            logger.info(
+                f"Found {duplicates:.0f} duplicates among {checked:.0f} picked websites "
+                f"({duplicates / checked:.0%} dedupe hit rate)."
+            )
+
+        batches = self._stats.get("critique.batches")
+        if batches:
+            logger.info(
+                f"Critiqued {self._stats.get('critique.batched_websites'):.0f} websites "
+                f"in {batches:.0f} batched calls, "
+                f"{self._stats.get('critique.batch_fallbacks'):.0f} fell back to single calls."
+            )
+
+        pool_size = self._stats.get("selection.pool_size")
+        if pool_size:
+            logger.info(
+                f"Selected globally from {pool_size:.0f} critiques of all runs."
+            )
+
+        shards = self._stats.get("selection.shards")
+        if shards:
+            logger.info(
+                f"Selected from {shards:.0f} shards of critiques "
+                f"in {self._stats.get('selection.rounds'):.0f} rounds before the final selection."
+            )
+
+        hit_rate = self._stats.ratio("critique_cache.hits", "critique_cache.checked")
+        if hit_rate is not None:
+            logger.info(f"Critique cache hit rate: {hit_rate:.0%}.")
+
+        queries = self._stats.get("search.queries")
+        if queries:
+            saved = self._stats.get("search.cache_hits") + self._stats.get(
+                "search.coalesced"
+            )
+            logger.info(f"Served {saved:.0f} of {queries:.0f} searches without a call.")
+
+        retries = self._stats.get("retries.searches") + self._stats.get("retries.pages")
+        if retries:
+            logger.info(f"Retried {retries:.0f} searches and website loads.")
+
+        evictions = self._stats.get("contents.evictions")
+        if evictions:
+            logger.info(
+                f"Evicted {evictions:.0f} website contents from memory, "
+                f"{self._stats.get('contents.reloads'):.0f} were loaded again."
+            )
+
+        reused = self._stats.get("registry.reused_critiques")
+        if reused:
+            logger.info(f"Reused {reused:.0f} critiques computed by other runs.")
+
+        planned = self._stats.get("planner.planned_searches")
+        if planned:
+            logger.info(
+                f"Ran {planned:.0f} searches with planned queries, "
+                f"{self._stats.get('planner.rejected_queries'):.0f} near-duplicate queries were rejected."
+            )
+
+        measured = self._stats.get("stopping.iterations")
+        if measured:
+            logger.info(
+                f"Search iterations yielded {self._stats.get('stopping.yield') / measured:.0%} "
+                f"new substantive websites on average, "
+                f"{self._stats.get('stopping.early_stops'):.0f} runs stopped early, "
+                f"saving {self._stats.get('stopping.saved_iterations'):.0f} iterations."
+            )
+
+        compactions = self._stats.get("history.compactions")
+        if compactions:
+            logger.info(
+                f"Compacted the Search agent's history {compactions:.0f} times, "
+                f"removing {self._stats.get('history.removed_tokens'):.0f} tokens."
+            )
+
+        rejected = self._stats.get("triage.rejected")
+        if rejected:
+            reasons = {
+                name.removeprefix("triage.rejected."): value
+                for name, value in self._stats.snapshot().items()
+                if name.startswith("triage.rejected.")
+            }
+            logger.info(
+                f"Triage rejected {rejected:.0f} of {self._stats.get('triage.checked'):.0f} "
+                f"loaded websites before critique: {reasons}."
+            )
+
+        for agent in ("planner", "search", "triage", "critic", "selector"):
+            cached_ratio = self._stats.ratio(
+                f"llm.{agent}.cached_tokens", f"llm.{agent}.input_tokens"
+            )
+            if cached_ratio is not None:
+                logger.info(
+                    f"{agent.capitalize()} agent: {cached_ratio:.0%} of "
+                    f"{self._stats.get(f'llm.{agent}.input_tokens'):.0f} input tokens "
+                    "served from the provider's prompt cache."
+                )
+
+        self._log_node_stats()
+
+        average_wait = self._stats.ratio("scheduler.wait_time", "scheduler.requests")
+        if average_wait:
+            logger.info(
+                f"LLM calls waited {average_wait:.1f}s on average, "
+                f"with up to {self._stats.get('scheduler.max_queue_depth'):.0f} calls queued."
+            )
+
+        logger.info(f"Crawl stats: {self._stats.snapshot()}")
+
+    def _log_node_stats(self) -> None:
+        """Logs latency, tokens and estimated cost of LLM calls of every node."""
+        nodes = [
+            name.removeprefix("node.").removesuffix(".calls")
+            for name in self._stats.snapshot()
+            if name.startswith("node.") and name.endswith(".calls")
+        ]
+        for node in sorted(nodes):
+            calls = self._stats.get(f"node.{node}.calls")
+            input_tokens = self._stats.get(f"node.{node}.input_tokens")
+            output_tokens = self._stats.get(f"node.{node}.output_tokens")
+            message = (
+                f"{node}: {calls:.0f} calls, "
+                f"{self._stats.get(f'node.{node}.latency') / calls:.1f}s on average, "
+                f"{input_tokens:.0f} input and {output_tokens:.0f} output tokens"
+            )
+
+            served = self._served_models(node)
+            priced = sorted(model for model in served if model in self._model_prices)
+            if priced:
+                cost = sum(
+                    (
+                        served[model][0] * self._model_prices[model][0]
+                        + served[model][1] * self._model_prices[model][1]
+                    )
+                    / 1e6
+                    for model in priced
+                )
+                message += f", ${cost:.4f} on {', '.join(priced)}"
+
+            logger.info(f"{message}.")
+
+    def _served_models(self, node: str) -> dict[str, tuple[float, float]]:
+        """Collects tokens used by every model that served calls of the node, including fallback models.
+
+        Args:
+            node (str): name of the node.
+
+        Returns:
+            dict[str, tuple[float, float]]: input and output tokens by name of the model.
+        """
+        prefix = f"node.{node}.served."
+        served = {}
+        for name, input_tokens in self._stats.snapshot().items():
+            if name.startswith(prefix) and name.endswith(".input_tokens"):
+                model = name.removeprefix(prefix).removesuffix(".input_tokens")
+                served[model] = (
+                    input_tokens,
+                    self._stats.get(f"{prefix}{model}.output_tokens"),
+                )
+
+        return served
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import re
+import threading
+
+from web_crawler.loading import canonicalize_url
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"\w+")
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+
+def content_hash(content: str) -> str:
+    """Hashes the content, ignoring case and whitespace differences.
+
+    Args:
+        content (str): content to hash.
+
+    Returns:
+        str: hex digest.
+    """
+    normalized = " ".join(WORD.findall(content.lower()))
+
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def simhash(content: str) -> int | None:
+    """Computes a 64-bit SimHash of word shingles of the content.
+
+    Near-duplicate contents have fingerprints differing in few bits.
+
+    Args:
+        content (str): content to fingerprint.
+
+    Returns:
+        int | None: fingerprint or None if the content is too short to fingerprint reliably.
+    """
+    words = WORD.findall(content.lower())
+    if len(words) < SHINGLE_SIZE * 8:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    for i in range(len(words) - SHINGLE_SIZE + 1):
+        shingle = " ".join(words[i : i + SHINGLE_SIZE])
+        digest = int.from_bytes(
+            hashlib.blake2b(shingle.encode(), digest_size=8).digest()
+        )
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class PageDeduplicator:
+    """Thread-safe registry of page contents seen during a crawl, detecting duplicates."""
+
+    def __init__(self, max_distance: int = 3, stats: Stats | None = None) -> None:
+        """Initializes the registry.
+
+        Args:
+            max_distance (int, optional): max number of differing SimHash bits of near-duplicates. Defaults to 3.
+            stats (Stats | None, optional): counters to record duplicates in. Defaults to None.
+        """
+        self._max_distance = max_distance
+        self._bands = max_distance + 1
+        self._band_bits = FINGERPRINT_BITS // self._bands
+        self._stats = stats or Stats()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all seen pages."""
+        with self._lock:
+            self._hashes: dict[str, str] = {}
+            self._fingerprints: dict[tuple[int, int], list[tuple[int, str]]] = {}
+
+    def claim_content(self, url: str, content: str) -> str | None:
+        """Registers the content if it's not an exact or near duplicate of a seen one.
+
+        Args:
+            url (str): url of the page.
+            content (str): content of the page.
+
+        Returns:
+            str | None: canonical url of the page it duplicates or None if the content is new.
+        """
+        canonical_url = canonicalize_url(url)
+        digest = content_hash(content)
+        fingerprint = simhash(content)
+        self._stats.add("dedupe.checked_contents")
+
+        with self._lock:
+            if digest in self._hashes:
+                self._stats.add("dedupe.exact_duplicates")
+                return self._hashes[digest]
+
+            if fingerprint is not None:
+                original = self._find_near_duplicate(fingerprint)
+                if original is not None:
+                    self._stats.add("dedupe.near_duplicates")
+                    return original
+
+                for band in self._split(fingerprint):
+                    self._fingerprints.setdefault(band, []).append(
+                        (fingerprint, canonical_url)
+                    )
+
+            self._hashes[digest] = canonical_url
+            return None
+
+    def _find_near_duplicate(self, fingerprint: int) -> str | None:
+        """Looks up a seen fingerprint within the max distance.
+
+        Args:
+            fingerprint (int): SimHash of the content.
+
+        Returns:
+            str | None: canonical url of the near-duplicate or None if there isn't one.
+        """
+        for band in self._split(fingerprint):
+            for candidate, url in self._fingerprints.get(band, []):
+                if (candidate ^ fingerprint).bit_count() <= self._max_distance:
+                    return url
+
+        return None
+
+    def _split(self, fingerprint: int) -> list[tuple[int, int]]:
+        """Splits the fingerprint into bands; near-duplicates share at least one of them.
+
+        Args:
+            fingerprint (int): SimHash of the content.
+
+        Returns:
+            list[tuple[int, int]]: pairs of band index and band value.
+        """
+        mask = (1 << self._band_bits) - 1
+
+        return [
+            (band, fingerprint >> (band * self._band_bits) & mask)
+            for band in range(self._bands)
+        ]
@@ -0,0 +1,63 @@
+import re
+
+WORD = re.compile(r"[a-z0-9][a-z0-9+#.-]*[a-z0-9+#]|[a-z0-9]", re.IGNORECASE)
+
+STOPWORDS = frozenset(
+    """a about above after again against all also am an and any are as at be
+    because been before being below between both but by can could did do does
+    doing down during each few for from further had has have having he her here
+    hers him his how i if in into is it its itself just me more most my no nor
+    not now of off on once only or other our ours out over own same she should
+    so some such than that the their them then there these they this those
+    through to too under until up very was we were what when where which while
+    who whom why will with would you your yours""".split()  # noqa: SIM905, reads better than a list
+)
+
+
+def keywords(text: str, min_length: int = 3) -> set[str]:
+    """Extracts lowercase keywords from the text, skipping stopwords.
+
+    Args:
+        text (str): text to extract keywords from.
+        min_length (int, optional): minimal length of a keyword. Defaults to 3.
+
+    Returns:
+        set[str]: keywords.
+    """
+    return {
+        word
+        for word in (match.lower() for match in WORD.findall(text))
+        if len(word) >= min_length and word not in STOPWORDS
+    }
+
+
+def overlap(text_keywords: set[str], reference_keywords: set[str]) -> float:
+    """Computes the fraction of the reference keywords present in the text.
+
+    Args:
+        text_keywords (set[str]): keywords of the text.
+        reference_keywords (set[str]): keywords of the reference, e.g. product description.
+
+    Returns:
+        float: overlap between 0 and 1.
+    """
+    if not reference_keywords:
+        return 0
+
+    return len(text_keywords & reference_keywords) / len(reference_keywords)
+
+
+def similarity(first_keywords: set[str], second_keywords: set[str]) -> float:
+    """Computes the Jaccard similarity of two sets of keywords.
+
+    Args:
+        first_keywords (set[str]): keywords of the first text.
+        second_keywords (set[str]): keywords of the second text.
+
+    Returns:
+        float: similarity between 0 and 1.
+    """
+    if not first_keywords or not second_keywords:
+        return 0
+
+    return len(first_keywords & second_keywords) / len(first_keywords | second_keywords)
@@ -0,0 +1,22 @@
+from web_crawler.loading.extraction import (
+    ContentExtractor,
+    LxmlExtractor,
+    ReadabilityExtractor,
+    SoupExtractor,
+    StreamingExtractor,
+    get_extractor,
+)
+from web_crawler.loading.fetcher import PageFetcher
+from web_crawler.loading.urls import canonicalize_url, normalize_url
+
+__all__ = [
+    "ContentExtractor",
+    "LxmlExtractor",
+    "PageFetcher",
+    "ReadabilityExtractor",
+    "SoupExtractor",
+    "StreamingExtractor",
+    "canonicalize_url",
+    "get_extractor",
+    "normalize_url",
+]
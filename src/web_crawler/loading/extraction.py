@@ -0,0 +1,463 @@
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from html.parser import HTMLParser
+from typing import ClassVar
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_TAGS = ("script", "style", "noscript")
+
+
+class ContentExtractor(ABC):
+    """Base class for extractors of readable text from HTML."""
+
+    name: str
+
+    def __init__(
+        self, max_chars: int | None = None, stats: Stats | None = None
+    ) -> None:
+        """Initializes the extractor.
+
+        Args:
+            max_chars (int | None, optional): number of characters after which extraction stops. Defaults to None, which means no limit.
+            stats (Stats | None, optional): counters to record extraction results in. Defaults to None.
+        """
+        self._max_chars = max_chars
+        self._stats = stats or Stats()
+
+    @property
+    def signature(self) -> str:
+        """Name of the extractor along with its character limit, identifying the text it extracts, e.g. in cache keys."""
+        if self._max_chars is None:
+            return self.name
+
+        return f"{self.name}:{self._max_chars}"
+
+    def extract(self, html: str) -> str:
+        """Extracts visible text from the HTML document.
+
+        Args:
+            html (str): HTML document.
+
+        Returns:
+            str: visible text, with pieces separated by single spaces.
+        """
+        content = self._extract(html)
+
+        self._stats.add("extraction.pages")
+        self._stats.add("extraction.chars", len(content))
+
+        return content
+
+    @abstractmethod
+    def _extract(self, html: str) -> str:
+        """Extracts visible text from the HTML document.
+
+        Args:
+            html (str): HTML document.
+
+        Returns:
+            str: visible text, with pieces separated by single spaces.
+        """
+
+    def _join(self, pieces: Iterable[str]) -> str:
+        """Joins stripped text pieces, stopping at the character limit.
+
+        Args:
+            pieces (Iterable[str]): text pieces.
+
+        Returns:
+            str: extracted text.
+        """
+        kept = []
+        length = 0
+        for piece in pieces:
+            piece = piece.strip()
+            if not piece:
+                continue
+
+            kept.append(piece)
+            length += len(piece) + 1
+            if self._max_chars is not None and length > self._max_chars:
+                break
+
+        return " ".join(kept)[: self._max_chars]
+
+
+class SoupExtractor(ContentExtractor):
+    """Extractor building a full BeautifulSoup tree with the pure-Python parser."""
+
+    name = "soup"
+
+    def _extract(self, html: str) -> str:
+        soup = BeautifulSoup(html, "html.parser")
+
+        for script in soup(SKIPPED_TAGS):
+            script.decompose()
+
+        return self._join(soup.stripped_strings)
+
+
+class LxmlExtractor(ContentExtractor):
+    """Extractor based on the C-backed libxml2 HTML parser."""
+
+    name = "lxml"
+
+    def _extract(self, html: str) -> str:
+        root = self._parse(html)
+        if root is None:
+            return ""
+
+        return self._join(root.itertext())
+
+    @staticmethod
+    def _parse(html: str) -> lxml.html.HtmlElement | None:
+        """Parses the document and drops non-content tags.
+
+        Args:
+            html (str): HTML document.
+
+        Returns:
+            lxml.html.HtmlElement | None: root of the document or None if it's empty or malformed.
+        """
+        parser = lxml.html.HTMLParser(
+            encoding="utf-8", remove_comments=True, remove_pis=True
+        )
+        try:
+            root = etree.fromstring(html.encode("utf-8"), parser=parser)
+        except etree.LxmlError:
+            return None
+        if root is None:
+            return None
+
+        etree.strip_elements(root, *SKIPPED_TAGS, with_tail=False)
+
+        return root
+
+
+class ReadabilityExtractor(LxmlExtractor):
+    """Extractor keeping only the main content of the page, e.g. an article or a thread.
+
+    Boilerplate like navigation, footers, cookie banners and sidebars is dropped.
+    Blocks are scored by the paragraphs they contain and penalized by their link
+    density; the best block is kept along with similarly scored siblings.
+    """
+
+    name = "readability"
+
+    BOILERPLATE_TAGS = (
+        "nav",
+        "header",
+        "footer",
+        "aside",
+        "form",
+        "iframe",
+        "svg",
+        "button",
+        "select",
+    )
+    PARAGRAPH_TAGS = ("p", "pre", "td", "li", "blockquote", "dd", "div")
+    BLOCK_TAGS = frozenset(
+        ("p", "pre", "table", "ul", "ol", "dl", "blockquote", "div", "section")
+    )
+    UNLIKELY = re.compile(
+        r"advert|banner|breadcrumb|consent|cookie|footer|header|menu|modal|navbar"
+        r"|popup|promo|related|share|sidebar|social|sponsor|subscribe|widget",
+        re.IGNORECASE,
+    )
+    LIKELY = re.compile(
+        r"answer|article|body|comment|content|entry|main|message|post|question"
+        r"|reply|text|thread|topic",
+        re.IGNORECASE,
+    )
+    TAG_SCORES: ClassVar[dict[str, int]] = {
+        "article": 10,
+        "main": 10,
+        "div": 5,
+        "section": 3,
+        "td": 3,
+    }
+    MIN_PARAGRAPH_CHARS = 25
+    MIN_CONTENT_CHARS = 200
+    SIMILAR_SCORE = 0.75
+    MIN_SIMILAR_BLOCKS = 2
+
+    def _extract(self, html: str) -> str:
+        root = self._parse(html)
+        if root is None:
+            return ""
+
+        total = len(" ".join(text.strip() for text in root.itertext() if text.strip()))
+        content = self._join(
+            text for block in self._main_content(root) for text in block.itertext()
+        )
+        if len(content) < min(total, self.MIN_CONTENT_CHARS):
+            content = self._join(root.itertext())
+
+        self._stats.add("extraction.chars_before_cleanup", total)
+        self._stats.add("extraction.kept_chars", len(content))
+        self._stats.add("extraction.discarded_chars", max(total - len(content), 0))
+        logger.debug(f"Kept {len(content)} of {total} characters as main content.")
+
+        return content
+
+    def _main_content(self, root: lxml.html.HtmlElement) -> list[lxml.html.HtmlElement]:
+        """Finds blocks making up the main content of the document.
+
+        Args:
+            root (lxml.html.HtmlElement): root of the document, modified in place.
+
+        Returns:
+            list[lxml.html.HtmlElement]: main content blocks in document order.
+        """
+        for element in list(root.iter(*self.BOILERPLATE_TAGS)):
+            element.drop_tree()
+        for element in list(root.iter(etree.Element)):
+            if element.tag not in ("html", "body") and self._is_unlikely(element):
+                element.drop_tree()
+
+        scores: dict[lxml.html.HtmlElement, float] = {}
+        for paragraph in root.iter(*self.PARAGRAPH_TAGS):
+            if paragraph.tag == "div" and any(
+                child.tag in self.BLOCK_TAGS for child in paragraph
+            ):
+                continue
+
+            text = paragraph.text_content().strip()
+            if len(text) < self.MIN_PARAGRAPH_CHARS:
+                continue
+
+            score = 1 + text.count(",") + min(len(text) // 100, 3)
+            parent = paragraph.getparent()
+            grandparent = parent.getparent() if parent is not None else None
+
+            for ancestor, share in ((parent, 1), (grandparent, 0.5)):
+                if ancestor is None:
+                    continue
+                if ancestor not in scores:
+                    scores[ancestor] = self._initial_score(ancestor)
+                scores[ancestor] += score * share
+
+        if not scores:
+            return [root]
+
+        scores = {
+            element: score * (1 - self._link_density(element))
+            for element, score in scores.items()
+        }
+        top, top_score = max(scores.items(), key=lambda item: item[1])
+        top = self._common_ancestor(top, top_score, scores)
+
+        parent = top.getparent()
+        if parent is None:
+            return [top]
+
+        threshold = max(10, top_score * 0.2)
+
+        return [
+            sibling
+            for sibling in parent
+            if sibling is top
+            or scores.get(sibling, 0) >= threshold
+            or self._is_content_paragraph(sibling)
+        ]
+
+    def _common_ancestor(
+        self,
+        top: lxml.html.HtmlElement,
+        top_score: float,
+        scores: dict[lxml.html.HtmlElement, float],
+    ) -> lxml.html.HtmlElement:
+        """Replaces the best block with the ancestor it shares with similarly scored blocks, e.g. the thread of a post.
+
+        Args:
+            top (lxml.html.HtmlElement): best scored block.
+            top_score (float): its score.
+            scores (dict[lxml.html.HtmlElement, float]): scores of candidate blocks.
+
+        Returns:
+            lxml.html.HtmlElement: ancestor holding at least `MIN_SIMILAR_BLOCKS` other similarly scored blocks, or the best block if there's none.
+        """
+        lineage = {top, *top.iterancestors()}
+        similar = [
+            element
+            for element, score in scores.items()
+            if element not in lineage and score >= top_score * self.SIMILAR_SCORE
+        ]
+        if len(similar) < self.MIN_SIMILAR_BLOCKS:
+            return top
+
+        for ancestor in top.iterancestors():
+            if ancestor.tag in ("html", "body"):
+                break
+
+            contained = sum(
+                any(parent is ancestor for parent in element.iterancestors())
+                for element in similar
+            )
+            if contained >= self.MIN_SIMILAR_BLOCKS:
+                return ancestor
+
+        return top
+
+    def _initial_score(self, element: lxml.html.HtmlElement) -> float:
+        """Scores the candidate block by its tag, class and id.
+
+        Args:
+            element (lxml.html.HtmlElement): candidate block.
+
+        Returns:
+            float: initial score.
+        """
+        score = self.TAG_SCORES.get(element.tag, 0)
+        identity = f"{element.get('class', '')} {element.get('id', '')}"
+
+        if self.LIKELY.search(identity):
+            score += 25
+        if self.UNLIKELY.search(identity):
+            score -= 25
+
+        return score
+
+    def _is_unlikely(self, element: lxml.html.HtmlElement) -> bool:
+        """Checks whether class or id of the element marks it as boilerplate.
+
+        Args:
+            element (lxml.html.HtmlElement): element to check.
+
+        Returns:
+            bool: whether the element is unlikely to be a part of the main content.
+        """
+        identity = f"{element.get('class', '')} {element.get('id', '')}"
+
+        return bool(self.UNLIKELY.search(identity)) and not self.LIKELY.search(identity)
+
+    def _is_content_paragraph(self, element: lxml.html.HtmlElement) -> bool:
+        """Checks whether the element is a long paragraph with few links.
+
+        Args:
+            element (lxml.html.HtmlElement): element to check.
+
+        Returns:
+            bool: whether the element is a content paragraph.
+        """
+        return (
+            element.tag == "p"
+            and len(element.text_content().strip()) > 80
+            and self._link_density(element) < 0.25
+        )
+
+    @staticmethod
+    def _link_density(element: lxml.html.HtmlElement) -> float:
+        """Computes the fraction of the element's text being link text.
+
+        Args:
+            element (lxml.html.HtmlElement): element to check.
+
+        Returns:
+            float: link density between 0 and 1.
+        """
+        text_length = len(element.text_content().strip())
+        if not text_length:
+            return 1
+
+        link_length = sum(
+            len(link.text_content().strip()) for link in element.iter("a")
+        )
+
+        return min(link_length / text_length, 1)
+
+
+class StreamingExtractor(ContentExtractor):
+    """Extractor tokenizing the document incrementally, without building a tree."""
+
+    name = "streaming"
+
+    CHUNK_SIZE = 64 * 1024
+
+    def _extract(self, html: str) -> str:
+        collector = _TextCollector(self._max_chars)
+
+        for offset in range(0, len(html), self.CHUNK_SIZE):
+            collector.feed(html[offset : offset + self.CHUNK_SIZE])
+            if collector.full:
+                break
+        else:
+            collector.close()
+
+        return self._join(collector.pieces)
+
+
+class _TextCollector(HTMLParser):
+    """HTML tokenizer collecting visible text and dropping non-content tags."""
+
+    def __init__(self, max_chars: int | None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.pieces: list[str] = []
+        self._length = 0
+        self._max_chars = max_chars
+        self._skipped_depth = 0
+
+    @property
+    def full(self) -> bool:
+        return self._max_chars is not None and self._length > self._max_chars
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skipped_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS and self._skipped_depth:
+            self._skipped_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if self._skipped_depth or self.full:
+            return
+
+        text = data.strip()
+        if text:
+            self.pieces.append(text)
+            self._length += len(text) + 1
+
+
+EXTRACTORS: dict[str, type[ContentExtractor]] = {
+    extractor.name: extractor
+    for extractor in (
+        LxmlExtractor,
+        ReadabilityExtractor,
+        StreamingExtractor,
+        SoupExtractor,
+    )
+}
+
+
+def get_extractor(
+    name: str = "lxml", max_chars: int | None = None, stats: Stats | None = None
+) -> ContentExtractor:
+    """Creates the extractor registered under the name.
+
+    Args:
+        name (str, optional): name of the extractor, one of "lxml", "readability", "streaming" or "soup". Defaults to "lxml".
+        max_chars (int | None, optional): number of characters after which extraction stops. Defaults to None, which means no limit.
+        stats (Stats | None, optional): counters to record extraction results in. Defaults to None.
+
+    Raises:
+        ValueError: if there's no extractor with such name.
+
+    Returns:
+        ContentExtractor: extractor.
+    """
+    if name not in EXTRACTORS:
+        raise ValueError(
+            f"Unknown extractor: {name}, expected one of {list(EXTRACTORS)}"
+        )
+
+    return EXTRACTORS[name](max_chars, stats)
@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from web_crawler.rate_limiting import RateLimiter, backoff_delay, parse_retry_after
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+R = TypeVar("R")
+
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+STOP_POLL = 0.1
+
+
+class PageFetcher:
+    """Shared HTTP client loading many pages at the same time."""
+
+    def __init__(
+        self,
+        timeout: float = 10,
+        max_workers: int = 16,
+        max_per_host: int = 4,
+        deadline: float = 30,
+        limiter: RateLimiter | None = None,
+        retries: int = 2,
+        backoff_base: float = 1,
+        backoff_max: float = 30,
+        stats: Stats | None = None,
+    ) -> None:
+        """Initializes the connection pool and the worker threads.
+
+        Args:
+            timeout (float, optional): timeout of a single request in seconds. Defaults to 10.
+            max_workers (int, optional): number of pages loaded at the same time. Defaults to 16.
+            max_per_host (int, optional): number of pages loaded at the same time from a single host. Defaults to 4.
+            deadline (float, optional): total time in seconds for loading a batch of pages. Defaults to 30.
+            limiter (RateLimiter | None, optional): per-host rate limiter. Defaults to None, which means no rate limiting.
+            retries (int, optional): number of retries of connection errors and rate-limited or unavailable responses. Defaults to 2.
+            backoff_base (float, optional): delay after the first failure in seconds, doubled with every retry. Defaults to 1.
+            backoff_max (float, optional): max delay between retries in seconds; longer Retry-After values aren't waited for. Defaults to 30.
+            stats (Stats | None, optional): counters to record retries in. Defaults to None.
+        """
+        self._timeout = timeout
+        self._max_per_host = max_per_host
+        self._deadline = deadline
+        self._limiter = limiter
+        self._retries = retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._stats = stats or Stats()
+
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self._session = requests.Session()
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="page-fetcher"
+        )
+        self._host_semaphores: dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._batch = threading.local()
+
+    def get(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        due: float | None = None,
+    ) -> requests.Response:
+        """Sends a GET request through the shared connection pool.
+
+        Requests are rate-limited per host. Connection errors and rate-limited or
+        unavailable responses are retried with jittered exponential backoff,
+        respecting the Retry-After header. Timeouts are cut to the time remaining
+        until `due` and retries that would wait past it are given up.
+
+        Args:
+            url (str): url to load.
+            headers (dict[str, str] | None, optional): additional request headers. Defaults to None.
+            due (float | None, optional): `time.monotonic()` by which the request has to finish. Defaults to None, which means the deadline of the batch of `map` or `amap` loading the url, if any.
+
+        Raises:
+            requests.RequestException: if the request failed.
+
+        Returns:
+            requests.Response: response.
+        """
+        host = urlsplit(url).netloc.lower()
+        due = due if due is not None else getattr(self._batch, "due", None)
+
+        attempt = 0
+        while True:
+            if self._limiter:
+                self._stats.add("rate_limit.page_wait", self._limiter.acquire(host))
+
+            try:
+                with self._host_slot(host):
+                    response = self._session.get(
+                        url, headers=headers, timeout=self._request_timeout(url, due)
+                    )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self._retries:
+                    raise
+                delay = backoff_delay(attempt, self._backoff_base, self._backoff_max)
+                if self._overruns(due, delay):
+                    raise
+            else:
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt == self._retries
+                ):
+                    return response
+
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self._backoff_max:
+                    return response
+                delay = retry_after or backoff_delay(
+                    attempt, self._backoff_base, self._backoff_max
+                )
+                if self._overruns(due, delay):
+                    return response
+
+            logger.debug(f"Retrying {url} in {delay:.1f}s.")
+            self._stats.add("retries.pages")
+            if self._limiter:
+                self._limiter.pause(host, delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def map(
+        self,
+        load: Callable[[str], R],
+        urls: list[str],
+        stop: threading.Event | None = None,
+    ) -> list[R | None]:
+        """Calls `load` for all urls concurrently, within the deadline cutting requests `load` sends with `get`.
+
+        Args:
+            load (Callable[[str], R]): function loading a single url.
+            urls (list[str]): urls to load.
+            stop (threading.Event | None, optional): event cancelling loads that haven't started yet once set. Defaults to None.
+
+        Returns:
+            list[R | None]: results in order of urls, None for failed, unfinished or cancelled loads.
+        """
+        due = time.monotonic() + self._deadline
+        futures = [
+            self._executor.submit(self._load_within, due, load, url) for url in urls
+        ]
+        not_done = set(futures)
+        while not_done and not (stop and stop.is_set()):
+            remaining = due - time.monotonic()
+            if remaining <= 0:
+                break
+            _, not_done = wait(
+                not_done, timeout=min(remaining, STOP_POLL) if stop else remaining
+            )
+        done = set(futures) - not_done
+
+        for future in not_done:
+            future.cancel()
+        if stop and stop.is_set():
+            logger.info(f"Stopped loading {len(not_done)} of {len(urls)} pages.")
+        elif not_done:
+            logger.warning(
+                f"{len(not_done)} of {len(urls)} pages didn't load within {self._deadline}s."
+            )
+
+        return [
+            future.result() if future in done and future.exception() is None else None
+            for future in futures
+        ]
+
+    async def amap(self, load: Callable[[str], R], urls: list[str]) -> list[R | None]:
+        """Calls `load` for all urls concurrently on the worker threads, within the deadline cutting requests `load` sends with `get`, without blocking the event loop.
+
+        Args:
+            load (Callable[[str], R]): function loading a single url.
+            urls (list[str]): urls to load.
+
+        Returns:
+            list[R | None]: results in order of urls, None for failed or unfinished loads. Loads that haven't started yet are cancelled along with the calling task.
+        """
+        if not urls:
+            return []
+
+        loop = asyncio.get_running_loop()
+        due = time.monotonic() + self._deadline
+        futures = [
+            loop.run_in_executor(self._executor, self._load_within, due, load, url)
+            for url in urls
+        ]
+        try:
+            done, not_done = await asyncio.wait(futures, timeout=self._deadline)
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+
+        for future in not_done:
+            future.cancel()
+        if not_done:
+            logger.warning(
+                f"{len(not_done)} of {len(urls)} pages didn't load within {self._deadline}s."
+            )
+
+        return [
+            future.result() if future in done and future.exception() is None else None
+            for future in futures
+        ]
+
+    def _load_within(self, due: float, load: Callable[[str], R], url: str) -> R:
+        """Calls `load` on a worker thread, cutting its requests to the deadline of the batch.
+
+        Args:
+            due (float): `time.monotonic()` by which the batch has to finish.
+            load (Callable[[str], R]): function loading a single url.
+            url (str): url to load.
+
+        Returns:
+            R: result of `load`.
+        """
+        self._batch.due = due
+        try:
+            return load(url)
+        finally:
+            self._batch.due = None
+
+    def _request_timeout(self, url: str, due: float | None) -> float:
+        """Cuts the timeout of a request to the time remaining until the deadline.
+
+        Args:
+            url (str): requested url.
+            due (float | None): `time.monotonic()` by which the request has to finish, None for no deadline.
+
+        Raises:
+            requests.Timeout: if the deadline has passed.
+
+        Returns:
+            float: timeout in seconds.
+        """
+        if due is None:
+            return self._timeout
+
+        remaining = due - time.monotonic()
+        if remaining <= 0:
+            raise requests.Timeout(f"Deadline passed before requesting {url}.")
+
+        return min(self._timeout, remaining)
+
+    @staticmethod
+    def _overruns(due: float | None, delay: float) -> bool:
+        """Checks whether waiting before a retry would pass the deadline.
+
+        Args:
+            due (float | None): `time.monotonic()` by which the request has to finish, None for no deadline.
+            delay (float): delay before the retry in seconds.
+
+        Returns:
+            bool: whether the retry should be given up.
+        """
+        return due is not None and time.monotonic() + delay >= due
+
+    def close(self) -> None:
+        """Closes the connection pool and stops the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+
+    @contextmanager
+    def _host_slot(self, host: str) -> Iterator[None]:
+        """Limits the number of concurrent requests to the host.
+
+        Args:
+            host (str): requested host.
+        """
+        with self._lock:
+            semaphore = self._host_semaphores.setdefault(
+                host, threading.Semaphore(self._max_per_host)
+            )
+
+        with semaphore:
+            yield
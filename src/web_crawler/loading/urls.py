@@ -0,0 +1,76 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = re.compile(
+    r"^(utm_\w+|fbclid|gclid|dclid|yclid|msclkid|igshid|mc_cid|mc_eid|_ga|_gl"
+    r"|ref_src|ref_url|si|spm|amp|outputtype)$",
+    re.IGNORECASE,
+)
+MIRROR_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+AMP_PATH_SUFFIX = re.compile(r"/amp(\.html)?$", re.IGNORECASE)
+ARTICLE_SEGMENT = re.compile(r"[-_.\d]")
+
+
+def normalize_url(url: str) -> str:
+    """Normalizes the URL, so that trivially different spellings of it are equal.
+
+    Lowercases the scheme and host, drops the default port, the fragment and the
+    trailing slash, and sorts query parameters.
+
+    Args:
+        url (str): url to normalize.
+
+    Returns:
+        str: normalized url.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def canonicalize_url(url: str) -> str:
+    """Maps the URL to a canonical one, shared by all addresses of the same page.
+
+    On top of normalization it unifies http and https, strips tracking parameters,
+    `www.`, mobile and AMP host prefixes and AMP path suffixes. Host prefixes are
+    only stripped when a registrable domain remains, e.g. not from `amp.dev`, and
+    AMP suffixes only follow articles, e.g. not `/blog/amp`.
+
+    Args:
+        url (str): url to canonicalize.
+
+    Returns:
+        str: canonical url.
+    """
+    parts = urlsplit(normalize_url(url))
+
+    host = parts.netloc
+    for prefix in MIRROR_HOST_PREFIXES:
+        if host.startswith(prefix):
+            stripped = host.removeprefix(prefix)
+            if "." in stripped.partition(":")[0]:
+                host = stripped
+            break
+
+    path = parts.path
+    article = AMP_PATH_SUFFIX.sub("", path)
+    if article != path and ARTICLE_SEGMENT.search(article.rsplit("/", 1)[-1]):
+        path = article
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not TRACKING_PARAMS.match(key)
+        ]
+    )
+
+    return urlunsplit(("https", host, path, query, ""))
@@ -0,0 +1,91 @@
+import logging
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.runnables import Runnable
+
+from web_crawler.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Thread-safe registry of chat models shared by all agents of a crawl.
+
+    Every client is created once per model and settings, so agents using the same
+    model share its HTTP connection pool. Runnables configured on top of a client,
+    e.g. with structured output or bound tools, are built once per key and reused
+    by all calls.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the registry."""
+        self._lock = threading.Lock()
+        self._chat_models: dict[tuple, BaseChatModel] = {}
+        self._token_counters: dict[tuple, TokenCounter] = {}
+        self._runnables: dict[tuple, Runnable[LanguageModelInput, Any]] = {}
+
+    def chat_model(self, model: str, **settings: Any) -> BaseChatModel:
+        """Returns the chat model, initializing it on first use.
+
+        Args:
+            model (str): name of the model.
+            **settings (Any): arguments of the model, e.g. timeout.
+
+        Returns:
+            BaseChatModel: chat model.
+        """
+        key = (model, *sorted(settings.items()))
+        with self._lock:
+            if key not in self._chat_models:
+                logger.info(f"Initializing LLM model {model}.")
+                self._chat_models[key] = init_chat_model(model, **settings)
+
+            return self._chat_models[key]
+
+    def token_counter(self, model: str, **settings: Any) -> TokenCounter:
+        """Returns the token counter of the chat model.
+
+        Args:
+            model (str): name of the model.
+            **settings (Any): arguments of the model, e.g. timeout.
+
+        Returns:
+            TokenCounter: token counter.
+        """
+        chat_model = self.chat_model(model, **settings)
+        key = (model, *sorted(settings.items()))
+        with self._lock:
+            if key not in self._token_counters:
+                self._token_counters[key] = TokenCounter(chat_model)
+
+            return self._token_counters[key]
+
+    def runnable(
+        self,
+        model: str,
+        key: Hashable,
+        configure: Callable[[BaseChatModel], Runnable[LanguageModelInput, Any]],
+        **settings: Any,
+    ) -> Runnable[LanguageModelInput, Any]:
+        """Returns the chat model configured for a specific use, building it on first use.
+
+        Args:
+            model (str): name of the model.
+            key (Hashable): key of the configuration, e.g. the output schema or names of bound tools.
+            configure (Callable[[BaseChatModel], Runnable[LanguageModelInput, Any]]): function binding tools or output schema to the chat model.
+            **settings (Any): arguments of the model, e.g. timeout.
+
+        Returns:
+            Runnable[LanguageModelInput, Any]: configured model.
+        """
+        chat_model = self.chat_model(model, **settings)
+        runnable_key = (model, key, *sorted(settings.items()))
+        with self._lock:
+            if runnable_key not in self._runnables:
+                self._runnables[runnable_key] = configure(chat_model)
+
+            return self._runnables[runnable_key]
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket letting through `rate` calls per second with bursts of `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        """Initializes a full bucket.
+
+        Args:
+            rate (float): number of tokens added per second.
+            capacity (float, optional): max number of tokens. Defaults to 1.
+        """
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token, going into debt if the bucket is empty.
+
+        Returns:
+            float: time in seconds to wait before the token can be used.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            self._tokens -= 1
+
+            return max(-self._tokens / self._rate, self._paused_until - now, 0)
+
+    def pause(self, seconds: float) -> None:
+        """Holds back all calls for the given time, e.g. after a rate-limit response.
+
+        Args:
+            seconds (float): time in seconds.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Set of token buckets, one per key, e.g. per host."""
+
+    def __init__(self, rate: float, burst: float = 1) -> None:
+        """Initializes the limiter.
+
+        Args:
+            rate (float): number of calls per second allowed for a single key.
+            burst (float, optional): number of calls allowed at once for a single key. Defaults to 1.
+        """
+        self._rate = rate
+        self._burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> float:
+        """Blocks until a call for the key is allowed.
+
+        Args:
+            key (str): key of the bucket.
+
+        Returns:
+            float: time in seconds spent waiting.
+        """
+        delay = self._bucket(key).reserve()
+        if delay:
+            time.sleep(delay)
+
+        return delay
+
+    async def aacquire(self, key: str) -> float:
+        """Waits without blocking the event loop until a call for the key is allowed.
+
+        Args:
+            key (str): key of the bucket.
+
+        Returns:
+            float: time in seconds spent waiting.
+        """
+        delay = self._bucket(key).reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+        return delay
+
+    def pause(self, key: str, seconds: float) -> None:
+        """Holds back all calls for the key for the given time.
+
+        Args:
+            key (str): key of the bucket.
+            seconds (float): time in seconds.
+        """
+        self._bucket(key).pause(seconds)
+
+    def _bucket(self, key: str) -> TokenBucket:
+        """Returns the bucket of the key, creating it if needed.
+
+        Args:
+            key (str): key of the bucket.
+
+        Returns:
+            TokenBucket: bucket.
+        """
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self._rate, self._burst)
+            return self._buckets[key]
+
+
+def backoff_delay(attempt: int, base: float = 1, max_delay: float = 30) -> float:
+    """Computes an exponential backoff delay with full jitter.
+
+    Args:
+        attempt (int): number of the failed attempt, starting from 0.
+        base (float, optional): delay after the first failure in seconds. Defaults to 1.
+        max_delay (float, optional): max delay in seconds. Defaults to 30.
+
+    Returns:
+        float: delay in seconds.
+    """
+    return random.uniform(0, min(max_delay, base * 2**attempt))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parses the Retry-After header, given either in seconds or as an HTTP date.
+
+    Args:
+        value (str | None): value of the header.
+
+    Returns:
+        float | None: delay in seconds or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
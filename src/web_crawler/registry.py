@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from web_crawler.agents.output_structures import WebsiteCritique
+from web_crawler.loading import canonicalize_url
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+NO_OWNER = -1
+"""Owner of websites resolved without being claimed, e.g. by runs resumed from a checkpoint."""
+
+
+class CritiqueRegistry:
+    """Thread-safe registry of websites picked during a crawl, shared by all runs.
+
+    The first run picking a website owns it: it loads and critiques the website and
+    resolves its entry. Other runs picking the same website wait for that critique
+    instead of computing it again. Websites the registry doesn't know, e.g. ones
+    picked before a crawl was resumed, are treated as not critiqued.
+    """
+
+    def __init__(self, timeout: float = 600, stats: Stats | None = None) -> None:
+        """Initializes the registry.
+
+        Args:
+            timeout (float, optional): max time in seconds to wait for a critique computed by another run. Defaults to 600.
+            stats (Stats | None, optional): counters to record duplicates and reused critiques in. Defaults to None.
+        """
+        self._timeout = timeout
+        self._stats = stats or Stats()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all picked websites."""
+        with self._lock:
+            self._entries: dict[str, tuple[int, Future[WebsiteCritique | None]]] = {}
+
+    def claim(self, url: str, run_id: int) -> tuple[int, bool]:
+        """Claims the website for the run unless its canonical URL was already claimed.
+
+        Args:
+            url (str): url of the website.
+            run_id (int): ID of the run.
+
+        Returns:
+            tuple[int, bool]: ID of the run owning the website and whether it was claimed just now.
+        """
+        canonical_url = canonicalize_url(url)
+        self._stats.add("dedupe.checked_urls")
+
+        with self._lock:
+            if canonical_url in self._entries:
+                self._stats.add("dedupe.url_duplicates")
+                return self._entries[canonical_url][0], False
+
+            self._entries[canonical_url] = (run_id, Future())
+            return run_id, True
+
+    def link(self, url: str, original_url: str) -> int:
+        """Resolves the claimed website with the critique of the website it duplicates.
+
+        Args:
+            url (str): url of the claimed website.
+            original_url (str): url of the duplicated website.
+
+        Returns:
+            int: ID of the run owning the duplicated website, NO_OWNER if the registry doesn't know it.
+        """
+        with self._lock:
+            owner, original = self._entries.get(
+                canonicalize_url(original_url), (NO_OWNER, None)
+            )
+            _, duplicate = self._entries[canonicalize_url(url)]
+
+        if original is None:
+            self._set(duplicate, None)
+            return owner
+
+        original.add_done_callback(lambda future: self._set(duplicate, future.result()))
+
+        return owner
+
+    def resolve(self, url: str, critique: WebsiteCritique | None) -> None:
+        """Publishes the critique of the claimed website, recording it if it wasn't claimed.
+
+        Args:
+            url (str): url of the website.
+            critique (WebsiteCritique | None): critique or None if the website couldn't be critiqued.
+        """
+        with self._lock:
+            _, future = self._entries.setdefault(
+                canonicalize_url(url), (NO_OWNER, Future())
+            )
+
+        self._set(future, critique)
+
+    def release(self, run_id: int | None = None) -> None:
+        """Resolves websites still waiting for a critique with None, once the runs owning them stopped.
+
+        Args:
+            run_id (int | None, optional): ID of the stopped run. Defaults to None, which releases websites of all runs.
+        """
+        with self._lock:
+            futures = [
+                future
+                for owner, future in self._entries.values()
+                if run_id is None or owner == run_id
+            ]
+
+        for future in futures:
+            self._set(future, None)
+
+    def wait(self, url: str) -> WebsiteCritique | None:
+        """Waits for the critique of the website claimed by another run.
+
+        Args:
+            url (str): url of the website.
+
+        Returns:
+            WebsiteCritique | None: critique or None if it couldn't be computed in time or the registry doesn't know the website.
+        """
+        with self._lock:
+            _, future = self._entries.get(canonicalize_url(url), (NO_OWNER, None))
+
+        if future is None:
+            return None
+
+        try:
+            critique = future.result(timeout=self._timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Timed out waiting for the critique of {url}.")
+            return None
+
+        if critique:
+            self._stats.add("registry.reused_critiques")
+
+        return critique
+
+    async def await_critique(self, url: str) -> WebsiteCritique | None:
+        """Waits for the critique of the website claimed by another run without blocking the event loop.
+
+        Args:
+            url (str): url of the website.
+
+        Returns:
+            WebsiteCritique | None: critique or None if it couldn't be computed in time or the registry doesn't know the website.
+        """
+        with self._lock:
+            _, future = self._entries.get(canonicalize_url(url), (NO_OWNER, None))
+
+        if future is None:
+            return None
+
+        try:
+            # Shielded, so that timing out doesn't cancel the future other runs wait for.
+            critique = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), self._timeout
+            )
+        except TimeoutError:
+            logger.warning(f"Timed out waiting for the critique of {url}.")
+            return None
+
+        if critique:
+            self._stats.add("registry.reused_critiques")
+
+        return critique
+
+    @staticmethod
+    def _set(
+        future: Future[WebsiteCritique | None], critique: WebsiteCritique | None
+    ) -> None:
+        """Resolves the future unless it's already resolved.
+
+        Args:
+            future (Future[WebsiteCritique | None]): future to resolve.
+            critique (WebsiteCritique | None): critique.
+        """
+        if not future.done():
+            future.set_result(critique)
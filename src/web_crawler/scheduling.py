@@ -0,0 +1,291 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 60
+
+
+class Priority(IntEnum):
+    """Priority of an LLM call, lower values go first."""
+
+    HIGH = 0
+    """Calls finishing runs: loop decisions and selection."""
+    NORMAL = 1
+    """Calls advancing runs: searching and picking pages."""
+    LOW = 2
+    """Calls starting new work: critiques."""
+
+
+@dataclass
+class ModelLimits:
+    """Budgets of a model per minute."""
+
+    rpm: float | None = None
+    """Max number of requests per minute, None means no limit."""
+    tpm: float | None = None
+    """Max number of tokens per minute, None means no limit."""
+
+
+@dataclass(order=True)
+class Ticket:
+    """Place of an LLM call in the queue of the scheduler."""
+
+    priority: int
+    sequence: int
+    model: str = field(compare=False)
+    tokens: int = field(compare=False)
+    wake: Callable[[], None] = field(compare=False, repr=False)
+    enqueued: float = field(default_factory=time.monotonic, compare=False)
+    granted: bool = field(default=False, compare=False)
+    used_tokens: int | None = field(default=None, compare=False)
+    """Tokens actually used by the call, corrects the estimate once known."""
+    _usage: list[float] | None = field(default=None, compare=False, repr=False)
+
+
+class LLMScheduler:
+    """Thread- and asyncio-safe scheduler of LLM calls shared by all agents of a crawl.
+
+    Calls wait in a priority queue until the global concurrency limit and the
+    request and token budgets of their model, tracked over a sliding minute, let
+    them through. Within the same priority calls go in order of arrival.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, ModelLimits] | None = None,
+        max_concurrency: int | None = None,
+        stats: Stats | None = None,
+    ) -> None:
+        """Initializes the scheduler.
+
+        Args:
+            limits (dict[str, ModelLimits] | None, optional): budgets of models by name. Defaults to None, which means no limits.
+            max_concurrency (int | None, optional): max number of calls in flight, shared by all models. Defaults to None, which means no limit.
+            stats (Stats | None, optional): counters to record waits and queue depth in. Defaults to None.
+        """
+        self._limits = limits or {}
+        self._max_concurrency = max_concurrency
+        self._stats = stats or Stats()
+        self._lock = threading.Lock()
+        self._queue: list[Ticket] = []
+        self._usage: dict[str, deque[list[float]]] = defaultdict(deque)
+        self._in_flight = 0
+        self._sequence = itertools.count()
+        self._timer: threading.Timer | None = None
+        self._timer_due = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for their turn."""
+        with self._lock:
+            return len(self._queue)
+
+    @contextmanager
+    def slot(
+        self, model: str, tokens: int, priority: Priority = Priority.NORMAL
+    ) -> Iterator[Ticket]:
+        """Blocks until the call is let through and holds its slot until the block exits.
+
+        Args:
+            model (str): name of the called model.
+            tokens (int): estimated number of tokens of the call.
+            priority (Priority, optional): priority of the call. Defaults to Priority.NORMAL.
+
+        Yields:
+            Ticket: ticket of the call, `used_tokens` can be set once known.
+        """
+        event = threading.Event()
+        ticket = self._enqueue(model, tokens, priority, event.set)
+
+        try:
+            self._dispatch()
+            event.wait()
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    @asynccontextmanager
+    async def aslot(
+        self, model: str, tokens: int, priority: Priority = Priority.NORMAL
+    ) -> AsyncIterator[Ticket]:
+        """Waits without blocking the event loop until the call is let through and holds its slot until the block exits.
+
+        Args:
+            model (str): name of the called model.
+            tokens (int): estimated number of tokens of the call.
+            priority (Priority, optional): priority of the call. Defaults to Priority.NORMAL.
+
+        Yields:
+            Ticket: ticket of the call, `used_tokens` can be set once known.
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        ticket = self._enqueue(
+            model, tokens, priority, lambda: loop.call_soon_threadsafe(event.set)
+        )
+
+        try:
+            self._dispatch()
+            await event.wait()
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    def _enqueue(
+        self, model: str, tokens: int, priority: Priority, wake: Callable[[], None]
+    ) -> Ticket:
+        """Puts the call in the queue.
+
+        Args:
+            model (str): name of the called model.
+            tokens (int): estimated number of tokens of the call.
+            priority (Priority): priority of the call.
+            wake (Callable[[], None]): function waking the waiting caller up.
+
+        Returns:
+            Ticket: ticket of the call.
+        """
+        with self._lock:
+            ticket = Ticket(priority, next(self._sequence), model, tokens, wake)
+            self._queue.append(ticket)
+            self._stats.peak("scheduler.max_queue_depth", len(self._queue))
+
+        return ticket
+
+    def _dispatch(self) -> None:
+        """Lets through waiting calls in order of priority as long as limits allow.
+
+        If budgets of a model block its calls, dispatching is repeated once they free up.
+        """
+        with self._lock:
+            now = time.monotonic()
+            blocked: set[str] = set()
+            delay = None
+
+            for ticket in sorted(self._queue):
+                if self._max_concurrency and self._in_flight >= self._max_concurrency:
+                    break
+                if ticket.model in blocked:
+                    continue
+
+                wait = self._budget_wait(ticket, now)
+                if wait:
+                    blocked.add(ticket.model)
+                    delay = min(delay, wait) if delay else wait
+                    continue
+
+                self._grant(ticket, now)
+
+            self._queue = [ticket for ticket in self._queue if not ticket.granted]
+
+            if delay and (not self._timer or now + delay < self._timer_due):
+                if self._timer:
+                    self._timer.cancel()
+                self._timer = threading.Timer(delay, self._on_timer)
+                self._timer.daemon = True
+                self._timer_due = now + delay
+                self._timer.start()
+
+    def _on_timer(self) -> None:
+        """Dispatches calls blocked by budgets once they free up."""
+        with self._lock:
+            if self._timer is threading.current_thread():
+                self._timer = None
+
+        self._dispatch()
+
+    def _budget_wait(self, ticket: Ticket, now: float) -> float:
+        """Computes how long the call has to wait for the budgets of its model.
+
+        Args:
+            ticket (Ticket): ticket of the call.
+            now (float): current monotonic time.
+
+        Returns:
+            float: time in seconds, 0 if the call fits within the budgets.
+        """
+        limits = self._limits.get(ticket.model)
+        if not limits:
+            return 0
+
+        usage = self._usage[ticket.model]
+        while usage and usage[0][0] <= now - WINDOW:
+            usage.popleft()
+
+        wait = 0.0
+        if limits.rpm and len(usage) >= limits.rpm:
+            wait = usage[0][0] + WINDOW - now
+
+        if limits.tpm:
+            excess = sum(tokens for _, tokens in usage) + ticket.tokens - limits.tpm
+            for started, tokens in usage:
+                if excess <= 0:
+                    break
+                excess -= tokens
+                wait = max(wait, started + WINDOW - now)
+
+        return wait
+
+    def _grant(self, ticket: Ticket, now: float) -> None:
+        """Lets the call through and wakes its caller up.
+
+        Args:
+            ticket (Ticket): ticket of the call.
+            now (float): current monotonic time.
+        """
+        ticket.granted = True
+        ticket._usage = [now, ticket.tokens]
+        self._usage[ticket.model].append(ticket._usage)
+        self._in_flight += 1
+
+        self._stats.add("scheduler.requests")
+        self._stats.add("scheduler.wait_time", now - ticket.enqueued)
+        ticket.wake()
+
+    def _release(self, ticket: Ticket) -> None:
+        """Frees the slot of the finished call and lets waiting calls through.
+
+        Args:
+            ticket (Ticket): ticket of the call.
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if ticket.used_tokens is not None:
+                ticket._usage[1] = ticket.used_tokens
+
+        self._dispatch()
+
+    def _cancel(self, ticket: Ticket) -> None:
+        """Removes the call from the queue, e.g. after its caller was cancelled.
+
+        Args:
+            ticket (Ticket): ticket of the call.
+        """
+        with self._lock:
+            granted = ticket.granted
+            if not granted:
+                self._queue.remove(ticket)
+
+        if granted:
+            self._release(ticket)
@@ -0,0 +1,4 @@
+from web_crawler.search_tools.cached import CachedSearchTool, normalize_query
+from web_crawler.search_tools.rate_limited import RateLimitedTool
+
+__all__ = ["CachedSearchTool", "RateLimitedTool", "normalize_query"]
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from langchain.tools import BaseTool
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
+from pydantic import ConfigDict, PrivateAttr
+
+from web_crawler.cache import SearchCache
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+PUNCTUATION = re.compile(r"[^\w\s+#-]")
+
+
+def normalize_query(query: str) -> str:
+    """Normalizes the search query, so that near-identical queries are equal.
+
+    Lowercases the query, drops punctuation and sorts its unique words.
+
+    Args:
+        query (str): search query.
+
+    Returns:
+        str: normalized query.
+    """
+    return " ".join(sorted(set(PUNCTUATION.sub(" ", query.lower()).split())))
+
+
+class CachedSearchTool(BaseTool):
+    """Wrapper of a search tool caching results of normalized queries in memory and on disk.
+
+    Concurrent calls with the same query are coalesced into a single search.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tool: BaseTool
+    ttl: float = 3600
+    cache: SearchCache | None = None
+    stats: Stats | None = None
+
+    _memory: dict[str, tuple[float, Any]] = PrivateAttr(default_factory=dict)
+    _in_flight: dict[str, Future[Any]] = PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, tool: BaseTool, **kwargs: Any) -> None:
+        """Wraps the tool, keeping its name, description and arguments.
+
+        Args:
+            tool (BaseTool): search tool taking a `query` argument.
+            **kwargs (Any): `ttl` of results in memory in seconds, on-disk `cache` and `stats` to record hits in.
+        """
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            tool=tool,
+            **kwargs,
+        )
+
+    def _run(
+        self,
+        *args: Any,
+        run_manager: CallbackManagerForToolRun | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Returns cached results or runs the wrapped tool.
+
+        Returns:
+            Any: search results.
+        """
+        key = self._key(*args, **kwargs)
+        future, owner = self._lookup(key)
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._load(key)
+            if result is None:
+                result = self.tool.invoke(
+                    kwargs or args[0],
+                    {"callbacks": run_manager.get_child() if run_manager else None},
+                )
+                self._store(key, result)
+
+            self._resolve(key, future, result)
+
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    async def _arun(
+        self,
+        *args: Any,
+        run_manager: AsyncCallbackManagerForToolRun | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Returns cached results or runs the wrapped tool asynchronously.
+
+        Returns:
+            Any: search results.
+        """
+        key = self._key(*args, **kwargs)
+        future, owner = self._lookup(key)
+
+        if not owner:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = self._load(key)
+            if result is None:
+                result = await self.tool.ainvoke(
+                    kwargs or args[0],
+                    {"callbacks": run_manager.get_child() if run_manager else None},
+                )
+                self._store(key, result)
+
+            self._resolve(key, future, result)
+
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _lookup(self, key: str) -> tuple[Future[Any], bool]:
+        """Looks up results of the query in memory and among searches in flight, starting a new search if there are none.
+
+        Args:
+            key (str): cache key.
+
+        Returns:
+            tuple[Future[Any], bool]: future results and whether the caller has to run the search.
+        """
+        self._add_stat("search.queries")
+
+        with self._lock:
+            future = Future()
+            cached = self._memory.get(key)
+            if cached and time.time() - cached[0] < self.ttl:
+                self._add_stat("search.cache_hits")
+                future.set_result(cached[1])
+                return future, False
+
+            if key in self._in_flight:
+                self._add_stat("search.coalesced")
+                return self._in_flight[key], False
+
+            self._in_flight[key] = future
+            return future, True
+
+    def _load(self, key: str) -> Any:
+        """Loads results from disk.
+
+        Args:
+            key (str): cache key.
+
+        Returns:
+            Any: search results or None if they aren't cached.
+        """
+        result = self.cache.get(key) if self.cache else None
+        if result is not None:
+            self._add_stat("search.cache_hits")
+
+        return result
+
+    def _resolve(self, key: str, future: Future[Any], result: Any) -> None:
+        """Stores results in memory and passes them to coalesced calls.
+
+        Args:
+            key (str): cache key.
+            future (Future[Any]): future results of the search.
+            result (Any): search results.
+        """
+        with self._lock:
+            self._memory[key] = (time.time(), result)
+        future.set_result(result)
+
+    def _key(self, *args: Any, **kwargs: Any) -> str:
+        """Computes the cache key of the call.
+
+        Returns:
+            str: normalized query along with other arguments.
+        """
+        arguments = dict(kwargs) if kwargs else {"query": args[0]}
+        arguments["query"] = normalize_query(str(arguments.get("query", "")))
+
+        return f"{self.name}:{json.dumps(arguments, sort_keys=True, default=str)}"
+
+    def _store(self, key: str, result: Any) -> None:
+        """Stores results on disk if they can be serialized.
+
+        Args:
+            key (str): cache key.
+            result (Any): search results.
+        """
+        if not self.cache:
+            return
+
+        try:
+            self.cache.put(key, result)
+        except TypeError:
+            logger.debug(f"Search results of {key} can't be cached on disk.")
+
+    def _add_stat(self, name: str) -> None:
+        """Increases the counter if stats are attached.
+
+        Args:
+            name (str): name of the counter.
+        """
+        if self.stats:
+            self.stats.add(name)
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from langchain.tools import BaseTool
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
+from pydantic import ConfigDict
+
+from web_crawler.rate_limiting import RateLimiter, backoff_delay, parse_retry_after
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitedTool(BaseTool):
+    """Wrapper of a tool throttling its calls and retrying failures with jittered exponential backoff."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tool: BaseTool
+    limiter: RateLimiter | None = None
+    retries: int = 3
+    backoff_base: float = 1
+    backoff_max: float = 30
+    stats: Stats | None = None
+
+    def __init__(
+        self, tool: BaseTool, limiter: RateLimiter | None = None, **kwargs: Any
+    ) -> None:
+        """Wraps the tool, keeping its name, description and arguments.
+
+        Args:
+            tool (BaseTool): tool to wrap.
+            limiter (RateLimiter | None, optional): rate limiter shared by all calls of the tool. Defaults to None, which means only retrying failures.
+            **kwargs (Any): number of `retries`, `backoff_base` and `backoff_max` delays in seconds and `stats` to record retries in.
+        """
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            tool=tool,
+            limiter=limiter,
+            **kwargs,
+        )
+
+    def _run(
+        self,
+        *args: Any,
+        run_manager: CallbackManagerForToolRun | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Runs the wrapped tool once the rate limiter lets it through.
+
+        Returns:
+            Any: results of the tool.
+        """
+        attempt = 0
+        while True:
+            if self.limiter:
+                waited = self.limiter.acquire(self.name)
+                if self.stats:
+                    self.stats.add("rate_limit.search_wait", waited)
+
+            try:
+                return self.tool.invoke(
+                    kwargs or args[0],
+                    {"callbacks": run_manager.get_child() if run_manager else None},
+                )
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+
+                delay = self._retry_delay(e, attempt)
+                if self.limiter:
+                    self.limiter.pause(self.name, delay)
+                else:
+                    time.sleep(delay)
+                attempt += 1
+
+    async def _arun(
+        self,
+        *args: Any,
+        run_manager: AsyncCallbackManagerForToolRun | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Runs the wrapped tool asynchronously once the rate limiter lets it through.
+
+        Returns:
+            Any: results of the tool.
+        """
+        attempt = 0
+        while True:
+            if self.limiter:
+                waited = await self.limiter.aacquire(self.name)
+                if self.stats:
+                    self.stats.add("rate_limit.search_wait", waited)
+
+            try:
+                return await self.tool.ainvoke(
+                    kwargs or args[0],
+                    {"callbacks": run_manager.get_child() if run_manager else None},
+                )
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+
+                delay = self._retry_delay(e, attempt)
+                if self.limiter:
+                    self.limiter.pause(self.name, delay)
+                else:
+                    await asyncio.sleep(delay)
+                attempt += 1
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Computes the delay before retrying the failed call and records the retry.
+
+        Args:
+            error (Exception): error raised by the tool.
+            attempt (int): number of the failed attempt, starting from 0.
+
+        Returns:
+            float: delay in seconds.
+        """
+        delay = self._retry_after(error) or backoff_delay(
+            attempt, self.backoff_base, self.backoff_max
+        )
+        logger.warning(f"{self.name} failed ({error}), retrying in {delay:.1f}s.")
+        if self.stats:
+            self.stats.add("retries.searches")
+
+        return delay
+
+    def _retry_after(self, error: Exception) -> float | None:
+        """Reads the Retry-After header of the HTTP response attached to the error, if any.
+
+        Args:
+            error (Exception): error raised by the tool.
+
+        Returns:
+            float | None: delay in seconds or None if there's no such header.
+        """
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+
+        return min(retry_after, self.backoff_max) if retry_after is not None else None
@@ -0,0 +1,72 @@
+import threading
+from collections import Counter
+
+
+class Stats:
+    """Thread-safe counters gathered by the components of a crawl."""
+
+    def __init__(self) -> None:
+        """Initializes empty counters."""
+        self._lock = threading.Lock()
+        self._counters: Counter[str] = Counter()
+
+    def add(self, name: str, value: float = 1) -> None:
+        """Increases the counter.
+
+        Args:
+            name (str): name of the counter.
+            value (float, optional): value to add. Defaults to 1.
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def peak(self, name: str, value: float) -> None:
+        """Raises the counter to the value if it's higher, e.g. to track max queue depth.
+
+        Args:
+            name (str): name of the counter.
+            value (float): observed value.
+        """
+        with self._lock:
+            self._counters[name] = max(self._counters[name], value)
+
+    def get(self, name: str) -> float:
+        """Returns the value of the counter.
+
+        Args:
+            name (str): name of the counter.
+
+        Returns:
+            float: value of the counter, 0 if it was never increased.
+        """
+        with self._lock:
+            return self._counters[name]
+
+    def ratio(self, numerator: str, denominator: str) -> float | None:
+        """Divides one counter by another.
+
+        Args:
+            numerator (str): name of the counter to divide.
+            denominator (str): name of the counter to divide by.
+
+        Returns:
+            float | None: ratio or None if the denominator is 0.
+        """
+        with self._lock:
+            if not self._counters[denominator]:
+                return None
+            return self._counters[numerator] / self._counters[denominator]
+
+    def snapshot(self) -> dict[str, float]:
+        """Returns values of all counters.
+
+        Returns:
+            dict[str, float]: counters sorted by name.
+        """
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self) -> None:
+        """Zeroes all counters."""
+        with self._lock:
+            self._counters.clear()
@@ -0,0 +1,128 @@
+import logging
+from urllib.parse import urlsplit
+
+from web_crawler.agents.output_structures import WebsiteCritique
+from web_crawler.keywords import keywords, overlap
+from web_crawler.loading import canonicalize_url
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+
+class YieldStopPolicy:
+    """Local policy stopping the search loop once its iterations stop finding new suitable websites.
+
+    The yield of an iteration is the fraction of websites it picked that weren't
+    duplicates of websites picked by other runs, got a critique with substantive
+    upsides and came from a domain new to the run. Critiques are substantive when
+    their upsides share more keywords with the product description than their
+    downsides.
+    """
+
+    def __init__(
+        self,
+        reference: str,
+        min_yield: float = 0.15,
+        patience: int = 1,
+        stats: Stats | None = None,
+    ) -> None:
+        """Initializes the policy.
+
+        Args:
+            reference (str): text suitable websites should be relevant to, e.g. product description.
+            min_yield (float, optional): yield of an iteration below which the loop stops. Defaults to 0.15.
+            patience (int, optional): number of consecutive iterations below `min_yield` after which the loop stops. Defaults to 1.
+            stats (Stats | None, optional): counters to record yields and early stops in. Defaults to None.
+        """
+        self._reference_keywords = keywords(reference)
+        self._min_yield = min_yield
+        self._patience = patience
+        self._stats = stats or Stats()
+
+    def measure(
+        self,
+        run_id: int,
+        picked: int,
+        duplicates: int,
+        critiques: list[WebsiteCritique],
+        previous_critiques: list[WebsiteCritique],
+    ) -> float:
+        """Computes the yield of an iteration.
+
+        Args:
+            run_id (int): ID of the run.
+            picked (int): number of websites picked in the iteration.
+            duplicates (int): number of them picked by other runs or duplicating their contents.
+            critiques (list[WebsiteCritique]): critiques computed by the run in the iteration.
+            previous_critiques (list[WebsiteCritique]): critiques gathered by the run in earlier iterations.
+
+        Returns:
+            float: yield between 0 and 1.
+        """
+        seen_domains = {self._domain(critique) for critique in previous_critiques}
+        substantive = [
+            critique for critique in critiques if self._substantive(critique)
+        ]
+        new_domains = {
+            self._domain(critique) for critique in substantive
+        } - seen_domains
+        iteration_yield = len(new_domains) / picked if picked else 0
+        duplicate_rate = duplicates / picked if picked else 0
+
+        logger.info(
+            f"run ID: {run_id}. Iteration yield {iteration_yield:.0%}: "
+            f"{len(new_domains)} new domains, "
+            f"{len(substantive)} of {len(critiques)} critiques substantive, "
+            f"{duplicate_rate:.0%} duplicates."
+        )
+        self._stats.add("stopping.iterations")
+        self._stats.add("stopping.yield", iteration_yield)
+
+        return iteration_yield
+
+    def should_stop(self, run_id: int, yields: list[float]) -> bool:
+        """Decides whether the loop should stop.
+
+        Args:
+            run_id (int): ID of the run.
+            yields (list[float]): yields of all iterations of the run so far.
+
+        Returns:
+            bool: whether the last iterations yielded too little to continue.
+        """
+        recent = yields[-self._patience :]
+        if len(recent) < self._patience or max(recent) >= self._min_yield:
+            return False
+
+        logger.info(
+            f"run ID: {run_id}. Stopping the search loop, yield stayed below "
+            f"{self._min_yield:.0%} for {self._patience} iterations."
+        )
+        self._stats.add("stopping.early_stops")
+
+        return True
+
+    def _substantive(self, critique: WebsiteCritique) -> bool:
+        """Checks whether the critique's upsides speak to the product more than its downsides.
+
+        Args:
+            critique (WebsiteCritique): critique.
+
+        Returns:
+            bool: whether the critique is substantive.
+        """
+        return overlap(
+            keywords(critique.critique.upsides), self._reference_keywords
+        ) > overlap(keywords(critique.critique.downsides), self._reference_keywords)
+
+    @staticmethod
+    def _domain(critique: WebsiteCritique) -> str:
+        """Extracts the domain of the critiqued website.
+
+        Args:
+            critique (WebsiteCritique): critique.
+
+        Returns:
+            str: domain.
+        """
+        return urlsplit(canonicalize_url(critique.website.link)).netloc
@@ -0,0 +1,54 @@
+import logging
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AnyMessage, get_buffer_string
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+class TokenCounter:
+    """Counts tokens with the tokenizer of the chat model."""
+
+    def __init__(self, model: BaseChatModel) -> None:
+        """Initializes the counter.
+
+        Args:
+            model (BaseChatModel): chat model whose tokenizer to use.
+        """
+        self._model = model
+        self._exact = True
+
+    def count(self, text: str) -> int:
+        """Counts tokens in the text.
+
+        Falls back to an estimate of 4 characters per token if the model's tokenizer is unavailable.
+
+        Args:
+            text (str): text to count tokens in.
+
+        Returns:
+            int: number of tokens.
+        """
+        if self._exact:
+            try:
+                return self._model.get_num_tokens(text)
+            except Exception:
+                logger.warning(
+                    "Tokenizer unavailable, estimating tokens.", exc_info=True
+                )
+                self._exact = False
+
+        return len(text) // CHARS_PER_TOKEN + 1
+
+    def count_messages(self, messages: list[AnyMessage]) -> int:
+        """Counts tokens in the messages.
+
+        Args:
+            messages (list[AnyMessage]): messages to count tokens in.
+
+        Returns:
+            int: number of tokens.
+        """
+        return self.count(get_buffer_string(messages))
@@ -0,0 +1,175 @@
+import logging
+import re
+
+from web_crawler.agents.output_structures import Website
+from web_crawler.agents.triage.agent import TriageAgent
+from web_crawler.agents.triage.output_structures import TriageVerdict
+from web_crawler.keywords import STOPWORDS, WORD, keywords, overlap
+from web_crawler.stats import Stats
+
+logger = logging.getLogger(__name__)
+
+ERROR_PAGE = re.compile(
+    r"\b(?:(?:error|http) 404|404 (?:error|not found|page)|page not found|"
+    r"page (?:does not|doesn't) exist|access denied|something went wrong|"
+    r"no longer available)\b",
+    re.IGNORECASE,
+)
+LOGIN_WALL = re.compile(
+    r"\b(?:log ?in|sign ?in|sign up|subscribe|create an account) to "
+    r"(?:continue|read|view|access|see)\b|enable javascript|are you a robot|"
+    r"verify you are (?:a )?human|captcha",
+    re.IGNORECASE,
+)
+
+SHORT_PAGE_CHARS = 3000
+MIN_WORDS_FOR_LANGUAGE = 50
+
+
+class PageTriage:
+    """Cheap checks rejecting websites obviously not worth a full critique.
+
+    Local heuristics reject short pages, error pages and login walls rendered with
+    status 200, pages not in English and pages sharing too few keywords with the
+    product description. Websites passing them can be judged by a cheap model.
+    """
+
+    def __init__(
+        self,
+        reference: str,
+        min_chars: int = 200,
+        min_relevance: float = 0.02,
+        min_english_ratio: float = 0.15,
+        agent: TriageAgent | None = None,
+        stats: Stats | None = None,
+    ) -> None:
+        """Initializes the triage.
+
+        Args:
+            reference (str): text the websites should be relevant to, e.g. product description.
+            min_chars (int, optional): min number of characters of a website's content. Defaults to 200.
+            min_relevance (float, optional): min fraction of the reference keywords present in a website. Defaults to 0.02.
+            min_english_ratio (float, optional): min fraction of English stopwords among words of a website. Defaults to 0.15.
+            agent (TriageAgent | None, optional): agent judging websites passing the heuristics. Defaults to None, which means only using the heuristics.
+            stats (Stats | None, optional): counters to record rejections and their reasons in. Defaults to None.
+        """
+        self._reference_keywords = keywords(reference)
+        self._min_chars = min_chars
+        self._min_relevance = min_relevance
+        self._min_english_ratio = min_english_ratio
+        self._agent = agent
+        self._stats = stats or Stats()
+
+    def filter(self, websites: list[Website]) -> list[Website]:
+        """Rejects websites not worth a full critique.
+
+        Args:
+            websites (list[Website]): loaded websites.
+
+        Returns:
+            list[Website]: websites to critique.
+        """
+        passed = self._check(websites)
+        if not self._agent or not passed:
+            return passed
+
+        return self._judge(passed, self._agent.run(passed))
+
+    async def afilter(self, websites: list[Website]) -> list[Website]:
+        """Rejects websites not worth a full critique, calling the model asynchronously.
+
+        Args:
+            websites (list[Website]): loaded websites.
+
+        Returns:
+            list[Website]: websites to critique.
+        """
+        passed = self._check(websites)
+        if not self._agent or not passed:
+            return passed
+
+        return self._judge(passed, await self._agent.arun(passed))
+
+    def _check(self, websites: list[Website]) -> list[Website]:
+        """Applies the local heuristics.
+
+        Args:
+            websites (list[Website]): loaded websites.
+
+        Returns:
+            list[Website]: websites passing the heuristics.
+        """
+        passed = []
+        for website in websites:
+            self._stats.add("triage.checked")
+            reason = self._rejection_reason(website.content)
+            if reason:
+                self._reject(website, reason)
+            else:
+                passed.append(website)
+
+        return passed
+
+    def _judge(
+        self, websites: list[Website], verdicts: list[TriageVerdict | None]
+    ) -> list[Website]:
+        """Applies verdicts of the model, keeping websites it failed to judge.
+
+        Args:
+            websites (list[Website]): websites passing the heuristics.
+            verdicts (list[TriageVerdict | None]): verdicts of the model.
+
+        Returns:
+            list[Website]: websites to critique.
+        """
+        passed = []
+        for website, verdict in zip(websites, verdicts):
+            if verdict is None or verdict.suitable:
+                passed.append(website)
+            else:
+                self._reject(website, "model", verdict.reason)
+
+        return passed
+
+    def _rejection_reason(self, content: str) -> str | None:
+        """Finds the first heuristic rejecting the content.
+
+        Args:
+            content (str): website content.
+
+        Returns:
+            str | None: reason of the rejection or None if the content passes.
+        """
+        if len(content) < self._min_chars:
+            return "too_short"
+
+        if len(content) < SHORT_PAGE_CHARS:
+            if ERROR_PAGE.search(content):
+                return "error_page"
+            if LOGIN_WALL.search(content):
+                return "login_wall"
+
+        words = [word.lower() for word in WORD.findall(content)]
+        if len(words) >= MIN_WORDS_FOR_LANGUAGE:
+            english_ratio = sum(word in STOPWORDS for word in words) / len(words)
+            if english_ratio < self._min_english_ratio:
+                return "wrong_language"
+
+        if overlap(set(words), self._reference_keywords) < self._min_relevance:
+            return "irrelevant"
+
+        return None
+
+    def _reject(self, website: Website, reason: str, details: str = "") -> None:
+        """Records the rejection.
+
+        Args:
+            website (Website): rejected website.
+            reason (str): reason of the rejection.
+            details (str, optional): additional explanation. Defaults to "".
+        """
+        logger.debug(
+            f"Rejected {website.header.link} ({reason}){f': {details}' if details else ''}."
+        )
+        self._stats.add("triage.rejected")
+        self._stats.add(f"triage.rejected.{reason}")
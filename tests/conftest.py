@@ -0,0 +1,242 @@
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+from uuid import uuid4
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+from web_crawler.agents import CriticAgent, SearchAgent, SelectorAgent
+from web_crawler.loading import PageFetcher
+
+DESCRIPTION = "A library running AI models on device in mobile apps."
+
+
+class PageServer(ThreadingHTTPServer):
+    """Loopback server of test pages, recording requests and their concurrency."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), PageHandler)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.hits: Counter[str] = Counter()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves `/<name>` pages, shaped by query parameters.
+
+    `delay` holds the response back by seconds, `status` and `retry_after` set the
+    status and the Retry-After header of the first `fail` responses, `etag` enables
+    conditional requests and `text` sets the text of the page.
+    """
+
+    server: PageServer
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+        with self.server.lock:
+            self.server.active += 1
+            self.server.peak = max(self.server.peak, self.server.active)
+            self.server.hits[parts.path] += 1
+            hits = self.server.hits[parts.path]
+
+        try:
+            time.sleep(float(params.get("delay", 0)))
+            self._respond(parts.path, params, hits)
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def _respond(self, path: str, params: dict[str, str], hits: int) -> None:
+        if "status" in params and hits <= int(params.get("fail", 1)):
+            self.send_response(int(params["status"]))
+            if "retry_after" in params:
+                self.send_header("Retry-After", params["retry_after"])
+            self.end_headers()
+            return
+
+        etag = params.get("etag")
+        if etag and self.headers.get("If-None-Match") == f'"{etag}"':
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        text = params.get("text", f"Page {path.strip('/')} about on-device AI.")
+        body = f"<html><body><nav>Menu</nav><p>{text}</p></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", f'"{etag}"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def page_server() -> Iterator[PageServer]:
+    server = PageServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model calling the tool it's forced to call, with arguments computed by `answers` from the messages.
+
+    Answers are looked up by the name of the model and tool, e.g. "openai:gpt-4o:Critique", then by the name of the tool.
+    Bound tools and messages of every call are recorded in `requests`, `cached_tokens`
+    of their input tokens are reported as served from the prompt cache.
+    """
+
+    model_name: str = "fake"
+    answers: dict[str, Callable[[list[BaseMessage]], dict]] = Field(
+        default_factory=dict
+    )
+    calls: list[str] = Field(default_factory=list)
+    requests: list[tuple[list[dict], list[BaseMessage]]] = Field(default_factory=list)
+    cached_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools: list, tool_choice: str | None = None, **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools],
+            tool_choice=tool_choice,
+            **kwargs,
+        )
+
+    def _generate(
+        self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **_
+    ) -> ChatResult:
+        names = [tool["function"]["name"] for tool in tools or []]
+        name = tool_choice if tool_choice in names else names[0]
+        self.calls.append(f"{self.model_name}:{name}")
+        self.requests.append((tools, messages))
+        answer = self.answers.get(f"{self.model_name}:{name}", self.answers[name])
+        message = AIMessage(
+            "",
+            tool_calls=[{"name": name, "args": answer(messages), "id": uuid4().hex}],
+            usage_metadata={
+                "input_tokens": 100,
+                "output_tokens": 10,
+                "total_tokens": 110,
+                "input_token_details": {"cache_read": self.cached_tokens},
+            },
+        )
+
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def get_num_tokens(self, text: str) -> int:
+        return len(text) // 4
+
+
+def links(messages: list[BaseMessage]) -> list[str]:
+    """Collects unique loopback links mentioned in the messages."""
+    text = " ".join(str(message.content) for message in messages)
+
+    return list(dict.fromkeys(re.findall(r"http://127\.0\.0\.1:\d+/[\w-]+", text)))
+
+
+@pytest.fixture
+def fake_llm(monkeypatch) -> FakeChatModel:
+    """Replaces all chat models with fake ones sharing answers and the record of calls."""
+    answers: dict[str, Callable[[list[BaseMessage]], dict]] = {
+        "WebsitesToLoad": lambda messages: {
+            "websites": [{"link": link} for link in links(messages[-2:])]
+        },
+        "Critique": lambda _: {"upsides": "On-device AI.", "downsides": "None."},
+        "WebsiteChoiceList": lambda messages: {
+            "websites": [
+                {"website": {"link": link}, "justification": "Fits.", "score": 5}
+                for link in links(messages[-1:])
+            ]
+        },
+        "WebsiteCritiqueList": lambda messages: {
+            "critiques": [
+                {
+                    "website": {"link": link},
+                    "critique": {"upsides": "On-device AI.", "downsides": "None."},
+                }
+                for link in re.findall(r"URL: (\S+)", str(messages[-1].content))
+            ]
+        },
+        "TriageVerdict": lambda _: {"suitable": True, "reason": "On topic."},
+        "QueryPlan": lambda messages: {
+            "queries": [f"topic {i} {len(messages)}" for i in range(10)]
+        },
+        "LoopDecision": lambda _: {"loop_decision": "SUMMARY"},
+        "search": lambda messages: {"query": f"query {len(messages)}"},
+    }
+    calls: list[str] = []
+    requests: list[tuple[list[dict], list[BaseMessage]]] = []
+    model = FakeChatModel(answers=answers, calls=calls, requests=requests)
+    monkeypatch.setattr(
+        "web_crawler.models.init_chat_model",
+        lambda name, **_: model.model_copy(update={"model_name": name}),
+    )
+
+    return model
+
+
+@pytest.fixture
+def make_search_agent(page_server, fake_llm) -> Callable[..., SearchAgent]:
+    """Creates Search agents searching the page server with fake models."""
+
+    @tool
+    def search(query: str) -> list[dict[str, str]]:
+        """Searches the web.
+
+        Args:
+            query: search query.
+        """
+        return [
+            {"link": f"{page_server.url}/{abs(hash(query)) % 100}-{i}", "title": "Page"}
+            for i in range(3)
+        ]
+
+    def make(**kwargs: Any) -> SearchAgent:
+        arguments = {
+            "search_tool": search,
+            "critic": CriticAgent(DESCRIPTION, "Critique."),
+            "selector": SelectorAgent(DESCRIPTION, "Select."),
+            "description_prompt": DESCRIPTION,
+            "search_prompt": "Search.",
+            "select_page_prompt": "Select pages.",
+            "decide_loop_prompt": "Decide.",
+            "min_iterations": 1,
+            "max_iterations": 2,
+            "fetcher": PageFetcher(timeout=5, deadline=5),
+            **kwargs,
+        }
+
+        return SearchAgent(**arguments)
+
+    return make
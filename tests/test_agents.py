@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from web_crawler.agents import CriticAgent, PlannerAgent, SelectorAgent, TriageAgent
+from web_crawler.agents.output_structures import (
+    Critique,
+    Website,
+    WebsiteCritique,
+    WebsiteHeader,
+)
+from web_crawler.cache import CritiqueCache
+from web_crawler.stats import Stats
+
+DESCRIPTION = "A library running AI models on device in mobile apps."
+
+
+def websites(count: int) -> list[Website]:
+    return [
+        Website(
+            header=WebsiteHeader(link=f"https://example.com/{i}"),
+            content=f"Page {i} about running AI models on device.",
+        )
+        for i in range(count)
+    ]
+
+
+def critiques(count: int) -> list[WebsiteCritique]:
+    return [
+        WebsiteCritique(
+            website=WebsiteHeader(link=f"http://127.0.0.1:1/{i}"),
+            critique=Critique(upsides="AI models on device.", downsides="None."),
+        )
+        for i in range(count)
+    ]
+
+
+def call(agent, mode: str, *args):
+    return agent.run(*args) if mode == "sync" else asyncio.run(agent.arun(*args))
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_critic_critiques_every_website(fake_llm, mode):
+    critic = CriticAgent(DESCRIPTION, "Critique.")
+
+    result = call(critic, mode, websites(3))
+
+    assert [critique.website.link for critique in result] == [
+        f"https://example.com/{i}" for i in range(3)
+    ]
+    assert fake_llm.calls.count("openai:gpt-4o:Critique") == 3
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_critic_batches_websites_and_falls_back_for_missing_ones(fake_llm, mode):
+    answer = fake_llm.answers["WebsiteCritiqueList"]
+    fake_llm.answers["WebsiteCritiqueList"] = lambda messages: {
+        "critiques": answer(messages)["critiques"][:-1]
+    }
+    critic = CriticAgent(DESCRIPTION, "Critique.", batch_tokens=10_000)
+
+    result = call(critic, mode, websites(4))
+
+    assert len(result) == 4
+    assert fake_llm.calls.count("openai:gpt-4o:WebsiteCritiqueList") == 1
+    assert fake_llm.calls.count("openai:gpt-4o:Critique") == 1
+
+
+def test_critic_serves_cached_critiques(fake_llm):
+    cache = CritiqueCache(":memory:")
+    CriticAgent(DESCRIPTION, "Critique.", cache=cache).run(websites(2))
+
+    result = CriticAgent(DESCRIPTION, "Critique.", cache=cache).run(websites(2))
+
+    assert len(result) == 2
+    assert fake_llm.calls.count("openai:gpt-4o:Critique") == 2
+
+
+def test_critiques_of_batches_are_cached_apart_from_single_ones(fake_llm):
+    cache = CritiqueCache(":memory:")
+    CriticAgent(DESCRIPTION, "Critique.", cache=cache, batch_tokens=10_000).run(
+        websites(2)
+    )
+
+    CriticAgent(DESCRIPTION, "Critique.", cache=cache).run(websites(2))
+    assert fake_llm.calls.count("openai:gpt-4o:Critique") == 2
+
+    CriticAgent(DESCRIPTION, "Critique.", cache=cache, batch_tokens=10_000).run(
+        websites(2)
+    )
+    assert fake_llm.calls.count("openai:gpt-4o:WebsiteCritiqueList") == 1
+    assert fake_llm.calls.count("openai:gpt-4o:Critique") == 2
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_selector_selects_in_a_single_call(fake_llm, mode):
+    selector = SelectorAgent(DESCRIPTION, "Select.")
+
+    selection = call(selector, mode, critiques(5))
+
+    assert len(selection.websites) == 5
+    assert fake_llm.calls.count("openai:gpt-4o:WebsiteChoiceList") == 1
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_selector_selects_from_shards_and_a_final_round(fake_llm, mode):
+    answer = fake_llm.answers["WebsiteChoiceList"]
+    fake_llm.answers["WebsiteChoiceList"] = lambda messages: {
+        "websites": answer(messages)["websites"][:2]
+    }
+    selector = SelectorAgent(DESCRIPTION, "Select.", shard_size=5)
+
+    selection = call(selector, mode, critiques(10))
+
+    assert len(selection.websites) == 2
+    assert fake_llm.calls.count("openai:gpt-4o:WebsiteChoiceList") == 3
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_selector_picks_nothing_without_a_call_once_shards_pick_nothing(fake_llm, mode):
+    fake_llm.answers["WebsiteChoiceList"] = lambda _: {"websites": []}
+    selector = SelectorAgent(DESCRIPTION, "Select.", shard_size=5)
+
+    selection = call(selector, mode, critiques(10))
+
+    assert selection.websites == []
+    assert fake_llm.calls.count("openai:gpt-4o:WebsiteChoiceList") == 2
+
+
+def test_selector_picks_nothing_without_a_call_from_no_critiques(fake_llm):
+    selection = SelectorAgent(DESCRIPTION, "Select.").run([])
+
+    assert selection.websites == []
+    assert fake_llm.calls == []
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_triage_agent_judges_every_website(fake_llm, mode):
+    triage = TriageAgent(DESCRIPTION, "Triage.")
+
+    verdicts = call(triage, mode, websites(3))
+
+    assert [verdict.suitable for verdict in verdicts] == [True] * 3
+    assert fake_llm.calls.count("openai:gpt-4o-mini:TriageVerdict") == 3
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_planner_rejects_near_duplicate_queries(fake_llm, mode):
+    proposals = iter(
+        [
+            ["on device ai", "device ai on", "mobile llm inference"],
+            ["mobile llm inference apps", "react native models", "offline chatbot"],
+        ]
+    )
+    fake_llm.answers["QueryPlan"] = lambda _: {"queries": next(proposals)}
+    planner = PlannerAgent(DESCRIPTION, "Plan.", max_similarity=0.5)
+
+    queries = call(planner, mode, 4)
+
+    assert queries == [
+        "on device ai",
+        "mobile llm inference",
+        "react native models",
+        "offline chatbot",
+    ]
+
+
+def test_unparsable_responses_fall_back_and_are_priced_by_the_serving_model(fake_llm):
+    fake_llm.answers["openai:gpt-4o:Critique"] = lambda _: {"upsides": "Only."}
+    stats = Stats()
+    critic = CriticAgent(
+        DESCRIPTION,
+        "Critique.",
+        stats=stats,
+        fallback_models={"CRITIQUE": "openai:gpt-4o-mini"},
+    )
+
+    result = critic.run(websites(2))
+
+    assert len(result) == 2
+    assert fake_llm.calls.count("openai:gpt-4o-mini:Critique") == 2
+    assert stats.get("node.CRITIQUE.served.openai:gpt-4o-mini.input_tokens") == 200
+    assert stats.get("node.CRITIQUE.served.openai:gpt-4o.input_tokens") == 0
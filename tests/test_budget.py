@@ -0,0 +1,70 @@
+from web_crawler.budget import ContentBudgeter
+from web_crawler.stats import Stats
+from web_crawler.tokens import TokenCounter
+
+REFERENCE = "A library running AI models on device in mobile apps."
+TITLE = "Weekly notes from our team."
+RELEVANT = [
+    "Running AI models on device keeps mobile apps fast.",
+    "Our library runs models in mobile apps offline.",
+]
+IRRELEVANT = [
+    "The office kitchen got a new coffee machine.",
+    "Parking spots are assigned on Mondays now.",
+    "Someone left an umbrella in the lobby again.",
+]
+
+
+class WordCounter(TokenCounter):
+    """Counter treating every word as a token."""
+
+    def __init__(self) -> None:
+        pass
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def budgeter(
+    max_tokens: int, stats: Stats | None = None, chunk_chars: int = 60
+) -> ContentBudgeter:
+    return ContentBudgeter(
+        WordCounter(), max_tokens, REFERENCE, chunk_chars=chunk_chars, stats=stats
+    )
+
+
+def test_content_within_the_budget_is_returned_unchanged():
+    stats = Stats()
+    content = "\n\n".join([TITLE, *RELEVANT])
+
+    assert budgeter(100, stats).fit(content) is content
+    assert stats.get("budget.trimmed_pages") == 0
+
+
+def test_first_chunk_is_kept_along_with_the_most_relevant_ones_in_document_order():
+    stats = Stats()
+    content = " ".join(
+        [TITLE, IRRELEVANT[0], RELEVANT[0], IRRELEVANT[1], RELEVANT[1], IRRELEVANT[2]]
+    )
+
+    trimmed = budgeter(25, stats).fit(content)
+
+    assert trimmed == " ".join([TITLE, RELEVANT[0], RELEVANT[1]])
+    assert stats.get("budget.trimmed_pages") == 1
+    assert stats.get("budget.trimmed_tokens") == 23
+
+
+def test_trimmed_content_keeps_paragraph_breaks():
+    content = "\n\n".join([TITLE, IRRELEVANT[0], RELEVANT[0], RELEVANT[1]])
+
+    trimmed = budgeter(25).fit(content)
+
+    assert trimmed == "\n\n".join([TITLE, RELEVANT[0], RELEVANT[1]])
+
+
+def test_content_is_sliced_when_no_chunk_fits():
+    content = " ".join(["word"] * 100)
+
+    trimmed = budgeter(10, chunk_chars=1000).fit(content)
+
+    assert trimmed == content[: len(content) // 10]
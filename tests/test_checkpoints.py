@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from conftest import DESCRIPTION
+
+from web_crawler.agents import CriticAgent
+from web_crawler.cache import PageCache, SqliteCheckpointer
+
+
+class InterruptedCritic(CriticAgent):
+    """Critic failing its first calls, like a crawl interrupted while critiquing."""
+
+    def __init__(self, failures: int) -> None:
+        super().__init__(DESCRIPTION, "Critique.")
+        self.failures = failures
+
+    def run(self, websites):
+        self._fail()
+        return super().run(websites)
+
+    async def arun(self, websites):
+        self._fail()
+        return await super().arun(websites)
+
+    def _fail(self) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Interrupted while critiquing.")
+
+
+def run_agent(agent, mode: str, crawl_id: str) -> list:
+    if mode == "sync":
+        return agent.run(2, crawl_id=crawl_id)
+    if mode == "async":
+        return asyncio.run(agent.arun(2, crawl_id=crawl_id))
+
+    async def collect():
+        return [item async for item in agent.astream(2, crawl_id=crawl_id)]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("mode", ["sync", "async", "astream"])
+def test_crawl_interrupted_while_critiquing_resumes(
+    make_search_agent, fake_llm, tmp_path, mode
+):
+    path = str(tmp_path / "checkpoints.sqlite")
+    interrupted = make_search_agent(
+        critic=InterruptedCritic(failures=2), checkpointer=SqliteCheckpointer(path)
+    )
+    assert run_agent(interrupted, mode, "crawl") == []
+    searches = fake_llm.calls.count("openai:gpt-4o:search")
+
+    resumed = make_search_agent(checkpointer=SqliteCheckpointer(path))
+    choices = run_agent(resumed, mode, "crawl")
+
+    assert choices
+    assert fake_llm.calls.count("openai:gpt-4o:search") == searches
+    assert "openai:gpt-4o:Critique" in fake_llm.calls
+
+
+@pytest.mark.parametrize("mode", ["sync", "async", "astream"])
+def test_finished_crawl_is_replayed_from_checkpoints(
+    make_search_agent, fake_llm, tmp_path, mode
+):
+    path = str(tmp_path / "checkpoints.sqlite")
+    choices = run_agent(
+        make_search_agent(checkpointer=SqliteCheckpointer(path)), mode, "crawl"
+    )
+    calls = len(fake_llm.calls)
+
+    replayed = run_agent(
+        make_search_agent(checkpointer=SqliteCheckpointer(path)), mode, "crawl"
+    )
+
+    assert {choice.website.link for choice in replayed} == {
+        choice.website.link for choice in choices
+    }
+    assert len(fake_llm.calls) == calls
+
+
+def test_checkpointed_crawls_dont_mix(make_search_agent, fake_llm, tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    make_search_agent(checkpointer=SqliteCheckpointer(path)).run(2, crawl_id="a")
+    calls = len(fake_llm.calls)
+
+    make_search_agent(checkpointer=SqliteCheckpointer(path)).run(2, crawl_id="b")
+
+    assert len(fake_llm.calls) == 2 * calls
+
+
+@pytest.mark.parametrize(("page_cache", "fetches"), [(True, 0), (False, 3)])
+def test_resumed_runs_read_pages_from_the_page_cache(
+    make_search_agent, page_server, tmp_path, page_cache, fetches
+):
+    path = str(tmp_path / "checkpoints.sqlite")
+    cache = PageCache(str(tmp_path / "pages.sqlite")) if page_cache else None
+    interrupted = make_search_agent(
+        critic=InterruptedCritic(failures=1),
+        checkpointer=SqliteCheckpointer(path),
+        page_cache=cache,
+    )
+    interrupted.run(1, crawl_id="crawl")
+    hits = sum(page_server.hits.values())
+
+    resumed = make_search_agent(checkpointer=SqliteCheckpointer(path), page_cache=cache)
+    assert resumed.run(1, crawl_id="crawl")
+
+    assert sum(page_server.hits.values()) - hits == fetches
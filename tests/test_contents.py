@@ -0,0 +1,120 @@
+from test_checkpoints import InterruptedCritic
+
+from web_crawler.cache import PageCache, SqliteCheckpointer
+from web_crawler.contents import ContentStore
+from web_crawler.stats import Stats
+
+
+def test_least_recently_used_contents_are_evicted():
+    stats = Stats()
+    store = ContentStore(max_chars=25, stats=stats)
+    a, b = store.put("a" * 10), store.put("b" * 10)
+    assert store.get(a) == "a" * 10
+
+    c = store.put("c" * 10)
+
+    assert store.get(b) is None
+    assert store.get(a) == "a" * 10
+    assert store.get(c) == "c" * 10
+    assert stats.get("contents.evictions") == 1
+
+
+def test_same_content_is_stored_once():
+    stats = Stats()
+    store = ContentStore(max_chars=25, stats=stats)
+    a = store.put("a" * 10)
+    b = store.put("b" * 10)
+
+    assert store.put("a" * 10) == a
+    store.put("c" * 10)
+
+    assert store.get(a) == "a" * 10
+    assert store.get(b) is None
+    assert stats.get("contents.evictions") == 1
+
+
+def test_content_larger_than_the_limit_is_kept():
+    store = ContentStore(max_chars=5)
+    a = store.put("a" * 10)
+    assert store.get(a) == "a" * 10
+
+    b = store.put("b" * 10)
+
+    assert store.get(a) is None
+    assert store.get(b) == "b" * 10
+
+
+def test_discarded_contents_free_their_space():
+    store = ContentStore(max_chars=25)
+    a, b = store.put("a" * 10), store.put("b" * 10)
+    store.discard(a)
+    store.discard("missing")
+
+    c = store.put("c" * 10)
+
+    assert store.get(a) is None
+    assert store.get(b) == "b" * 10
+    assert store.get(c) == "c" * 10
+
+
+def test_evicted_contents_are_reloaded_from_the_page_cache(
+    make_search_agent, page_server, tmp_path
+):
+    stats = Stats()
+    agent = make_search_agent(
+        content_store=ContentStore(max_chars=1, stats=stats),
+        page_cache=PageCache(str(tmp_path / "pages.sqlite")),
+        stats=stats,
+        max_iterations=1,
+    )
+
+    assert agent.run(1)
+    assert stats.get("contents.evictions") == 2
+    assert stats.get("contents.reloads") == 2
+    assert sum(page_server.hits.values()) == 3
+
+
+def test_resumed_runs_look_up_contents_by_hash(
+    make_search_agent, page_server, tmp_path
+):
+    path = str(tmp_path / "checkpoints.sqlite")
+    store = ContentStore()
+    interrupted = make_search_agent(
+        critic=InterruptedCritic(failures=1),
+        checkpointer=SqliteCheckpointer(path),
+        content_store=store,
+    )
+    interrupted.run(1, crawl_id="crawl")
+    hits = sum(page_server.hits.values())
+
+    stats = Stats()
+    resumed = make_search_agent(
+        checkpointer=SqliteCheckpointer(path), content_store=store, stats=stats
+    )
+    assert resumed.run(1, crawl_id="crawl")
+
+    assert sum(page_server.hits.values()) == hits
+    assert stats.get("contents.reloads") == 0
+
+
+def test_resumed_runs_reload_contents_missing_from_a_new_store(
+    make_search_agent, page_server, tmp_path
+):
+    path = str(tmp_path / "checkpoints.sqlite")
+    cache = PageCache(str(tmp_path / "pages.sqlite"))
+    interrupted = make_search_agent(
+        critic=InterruptedCritic(failures=1),
+        checkpointer=SqliteCheckpointer(path),
+        page_cache=cache,
+    )
+    interrupted.run(1, crawl_id="crawl")
+    hits = sum(page_server.hits.values())
+
+    stats = Stats()
+    resumed = make_search_agent(
+        checkpointer=SqliteCheckpointer(path), page_cache=cache, stats=stats
+    )
+    assert resumed.run(1, crawl_id="crawl")
+
+    assert sum(page_server.hits.values()) == hits
+    assert stats.get("contents.reloads") == 3
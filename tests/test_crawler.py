@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from conftest import DESCRIPTION
+from langchain_core.tools import tool
+
+from web_crawler import Crawler
+from web_crawler.agents.output_structures import WebsiteChoice, WebsiteCritique
+
+
+@pytest.fixture
+def crawler(page_server, fake_llm) -> Crawler:
+    @tool
+    def search(query: str) -> list[dict[str, str]]:
+        """Searches the web.
+
+        Args:
+            query: search query.
+        """
+        return [
+            {"link": f"{page_server.url}/{abs(hash(query)) % 100}-{i}", "title": "Page"}
+            for i in range(3)
+        ]
+
+    return Crawler(
+        search_tool=search,
+        description_prompt=DESCRIPTION,
+        search_search_prompt="Search.",
+        search_select_page_prompt="Select pages.",
+        search_decide_loop_prompt="Decide.",
+        critic_introduction_prompt="Critique.",
+        selector_introduction_prompt="Select.",
+        iterations=2,
+        search_min_iterations=1,
+        search_max_iterations=2,
+        search_rate=None,
+        load_timeout=5,
+        load_deadline=5,
+    )
+
+
+def collect(crawler: Crawler, mode: str, critiques: bool) -> list:
+    if mode == "stream":
+        return list(crawler.stream(critiques))
+
+    async def collect_async():
+        return [item async for item in crawler.astream(critiques)]
+
+    return asyncio.run(collect_async())
+
+
+@pytest.mark.parametrize("mode", ["stream", "astream"])
+def test_crawler_streams_critiques_before_websites(crawler, mode):
+    items = collect(crawler, mode, critiques=True)
+
+    first_choice = next(
+        i for i, item in enumerate(items) if isinstance(item, WebsiteChoice)
+    )
+    assert first_choice > 0
+    assert all(isinstance(item, WebsiteCritique) for item in items[:first_choice])
+    assert crawler.stats.get("extraction.pages") > 0
+
+
+@pytest.mark.parametrize("mode", ["stream", "astream"])
+def test_crawler_streams_only_websites_by_default(crawler, mode):
+    items = collect(crawler, mode, critiques=False)
+
+    assert items
+    assert all(isinstance(item, WebsiteChoice) for item in items)
+
+
+@pytest.mark.parametrize("mode", ["stream", "astream"])
+def test_closing_the_crawler_stream_doesnt_wait_for_runs(crawler, fake_llm, mode):
+    selecting = threading.Event()
+    answer = fake_llm.answers["WebsiteChoiceList"]
+
+    def select(messages):
+        selecting.wait(5)
+        return answer(messages)
+
+    fake_llm.answers["WebsiteChoiceList"] = select
+
+    start = time.monotonic()
+    if mode == "stream":
+        stream = crawler.stream(critiques=True)
+        assert isinstance(next(stream), WebsiteCritique)
+        stream.close()
+    else:
+
+        async def first():
+            stream = crawler.astream(critiques=True)
+            assert isinstance(await anext(stream), WebsiteCritique)
+            await stream.aclose()
+
+        asyncio.run(first())
+    selecting.set()
+
+    assert time.monotonic() - start < 3
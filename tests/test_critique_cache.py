@@ -0,0 +1,49 @@
+import time
+
+from web_crawler.agents.output_structures import Critique
+from web_crawler.cache import CritiqueCache
+
+CRITIQUE = Critique(upsides="Fits.", downsides="None.")
+
+
+def test_keys_change_with_any_input():
+    key = CritiqueCache.key("description", "introduction", "model", "content")
+
+    assert key == CritiqueCache.key("description", "introduction", "model", "content")
+    assert key != CritiqueCache.key("description", "introduction", "other", "content")
+    assert key != CritiqueCache.key("description", "introduction", "modelcontent", "")
+
+
+def test_critiques_round_trip():
+    cache = CritiqueCache(":memory:")
+    cache.put("key", CRITIQUE)
+
+    assert cache.get("key") == CRITIQUE
+    assert cache.get("missing") is None
+
+
+def test_critiques_expire_after_ttl():
+    cache = CritiqueCache(":memory:", ttl=0.1)
+    cache.put("old", CRITIQUE)
+    time.sleep(0.2)
+
+    assert cache.get("old") is None
+
+    cache.put("new", CRITIQUE)
+    assert cache._execute("SELECT key FROM critiques") == [("new",)]
+
+
+def test_least_recently_used_critiques_are_evicted():
+    cache = CritiqueCache(":memory:", max_entries=2)
+    cache.put("a", CRITIQUE)
+    time.sleep(0.01)
+    cache.put("b", CRITIQUE)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+
+    cache.put("c", CRITIQUE)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
@@ -0,0 +1,92 @@
+import random
+
+from web_crawler.dedupe import FINGERPRINT_BITS, PageDeduplicator, content_hash, simhash
+
+WORDS = [f"word{i}" for i in range(500)]
+
+
+def text(seed: int, length: int = 300) -> str:
+    generator = random.Random(seed)
+    return " ".join(generator.choice(WORDS) for _ in range(length))
+
+
+def test_content_hash_ignores_case_and_whitespace():
+    assert content_hash("Hello,  World\n") == content_hash("hello world")
+    assert content_hash("hello world") != content_hash("hello there")
+
+
+def test_simhash_skips_short_contents():
+    assert simhash("too short to fingerprint") is None
+    assert simhash(text(0)) is not None
+
+
+def test_simhash_of_near_duplicates_differs_in_few_bits():
+    original = text(0)
+    edited = original.replace("word1 ", "word2 ", 1)
+
+    assert (simhash(original) ^ simhash(edited)).bit_count() <= 3
+    assert (simhash(original) ^ simhash(text(1))).bit_count() > 3
+
+
+def test_exact_and_near_duplicates_point_to_the_first_page():
+    deduplicator = PageDeduplicator()
+    original = text(0)
+
+    assert deduplicator.claim_content("https://a.com/page", original) is None
+    assert (
+        deduplicator.claim_content("https://b.com/copy", original.upper())
+        == "https://a.com/page"
+    )
+    assert (
+        deduplicator.claim_content(
+            "https://c.com/edit", original.replace("word1 ", "word2 ", 1)
+        )
+        == "https://a.com/page"
+    )
+    assert deduplicator.claim_content("https://d.com/other", text(1)) is None
+
+
+def register(deduplicator: PageDeduplicator, fingerprint: int, url: str) -> None:
+    for key in deduplicator._split(fingerprint):
+        deduplicator._fingerprints.setdefault(key, []).append((fingerprint, url))
+
+
+def test_near_duplicates_are_found_whichever_band_they_share():
+    band_bits = FINGERPRINT_BITS // 4
+    fingerprint = simhash(text(0))
+
+    for band in range(4):
+        # Flips one bit in each of the other bands, so that only this band matches.
+        flipped = fingerprint
+        for other in range(4):
+            if other != band:
+                flipped ^= 1 << (other * band_bits)
+        deduplicator = PageDeduplicator(max_distance=3)
+        assert deduplicator._find_near_duplicate(flipped) is None
+
+        register(deduplicator, fingerprint, "https://a.com/page")
+
+        assert deduplicator._find_near_duplicate(flipped) == "https://a.com/page"
+
+
+def test_fingerprints_sharing_a_band_but_too_distant_are_not_duplicates():
+    deduplicator = PageDeduplicator(max_distance=3)
+    fingerprint = simhash(text(0))
+    register(deduplicator, fingerprint, "https://a.com/page")
+
+    # Keeps the lowest band, flips 4 bits in the others.
+    band_bits = FINGERPRINT_BITS // 4
+    distant = fingerprint
+    for bit in (band_bits, band_bits + 1, 2 * band_bits, 3 * band_bits):
+        distant ^= 1 << bit
+
+    assert deduplicator._find_near_duplicate(distant) is None
+
+
+def test_reset_forgets_seen_pages():
+    deduplicator = PageDeduplicator()
+    deduplicator.claim_content("https://a.com/page", text(0))
+
+    deduplicator.reset()
+
+    assert deduplicator.claim_content("https://b.com/page", text(0)) is None
@@ -0,0 +1,129 @@
+from pathlib import Path
+
+import pytest
+
+from web_crawler.loading import get_extractor
+from web_crawler.stats import Stats
+
+PAGES = Path(__file__).parent / "pages"
+ENGINES = ["soup", "lxml", "streaming"]
+
+
+def page(name: str) -> str:
+    return (PAGES / name).read_text()
+
+
+@pytest.mark.parametrize("name", ["article.html", "forum.html", "docs.html"])
+def test_engines_extract_the_same_visible_text(name):
+    contents = {engine: get_extractor(engine).extract(page(name)) for engine in ENGINES}
+
+    assert contents["lxml"] == contents["soup"] == contents["streaming"]
+    assert "  " not in contents["lxml"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_drop_scripts_styles_and_comments(engine):
+    content = get_extractor(engine).extract(page("article.html"))
+
+    assert "Shipping a language model inside a mobile app" in content
+    assert "gtag" not in content
+    assert "font-family" not in content
+    assert "Article body starts here" not in content
+    assert "pixel.gif" not in get_extractor(engine).extract(page("docs.html"))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_stop_at_the_character_limit(engine):
+    full = get_extractor(engine).extract(page("forum.html"))
+
+    content = get_extractor(engine, max_chars=100).extract(page("forum.html"))
+
+    assert content == full[:100]
+
+
+@pytest.mark.parametrize("engine", ENGINES + ["readability"])
+def test_engines_extract_nothing_from_empty_documents(engine):
+    assert get_extractor(engine).extract("") == ""
+
+
+def test_extraction_is_counted():
+    stats = Stats()
+
+    content = get_extractor("lxml", stats=stats).extract(page("docs.html"))
+
+    assert stats.get("extraction.pages") == 1
+    assert stats.get("extraction.chars") == len(content)
+
+
+def test_signature_identifies_the_engine_and_character_limit():
+    assert get_extractor("lxml").signature == "lxml"
+    assert get_extractor("lxml", max_chars=100).signature == "lxml:100"
+    assert (
+        len(
+            {
+                get_extractor(engine, max_chars).signature
+                for engine in ENGINES + ["readability"]
+                for max_chars in (None, 100, 200)
+            }
+        )
+        == 12
+    )
+
+
+def test_unknown_extractor_is_rejected():
+    with pytest.raises(ValueError, match="Unknown extractor"):
+        get_extractor("regex")
+
+
+def test_readability_keeps_the_article_and_drops_boilerplate():
+    content = get_extractor("readability").extract(page("article.html"))
+
+    assert content.startswith("Running LLMs on device in React Native apps")
+    assert "Shipping a language model inside a mobile app" in content
+    assert "tokens arrive as they are produced" in content
+    for boilerplate in (
+        "About us",
+        "Accept all cookies",
+        "Related posts",
+        "All rights reserved",
+        "Article body starts here",
+    ):
+        assert boilerplate not in content
+
+
+def test_readability_keeps_every_post_of_a_thread():
+    content = get_extractor("readability").extract(page("forum.html"))
+
+    for post in ("Our field technicians", "We ship a small MobileNet", "If you are on"):
+        assert post in content
+    for boilerplate in ("Log in", "Machine learning", "Suggested topics", "Powered by"):
+        assert boilerplate not in content
+
+
+def test_readability_keeps_tables_of_documentation():
+    content = get_extractor("readability").extract(page("docs.html"))
+
+    assert "modelSource URL or bundled asset of the model" in content
+    assert "passing a file URI from the camera roll" in content
+    assert "useSpeechToText" not in content
+    assert "Edit this page on GitHub" not in content
+
+
+def test_readability_keeps_all_but_boilerplate_without_main_content():
+    html = (
+        "<html><body><nav><a href='/'>Home</a></nav>"
+        "<div>Price: 10</div><div>In stock</div></body></html>"
+    )
+
+    assert get_extractor("readability").extract(html) == "Price: 10 In stock"
+
+
+def test_readability_counts_kept_and_discarded_characters():
+    stats = Stats()
+    html = page("article.html")
+
+    content = get_extractor("readability", stats=stats).extract(html)
+    total = len(get_extractor("lxml").extract(html))
+
+    assert stats.get("extraction.kept_chars") == len(content)
+    assert stats.get("extraction.discarded_chars") == total - len(content)
@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from web_crawler.loading import PageFetcher
+
+
+def load_text(fetcher: PageFetcher):
+    def load(url: str) -> str:
+        response = fetcher.get(url)
+        response.raise_for_status()
+        return response.text
+
+    return load
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = PageFetcher(timeout=5, max_workers=8, max_per_host=8, deadline=5)
+    yield fetcher
+    fetcher.close()
+
+
+def test_map_takes_about_as_long_as_the_slowest_page(page_server, fetcher):
+    delays = [0.1, 0.2, 0.3, 0.4, 0.6]
+    urls = [f"{page_server.url}/{i}?delay={delay}" for i, delay in enumerate(delays)]
+
+    start = time.monotonic()
+    contents = fetcher.map(load_text(fetcher), urls)
+    elapsed = time.monotonic() - start
+
+    assert all(f"Page {i} " in content for i, content in enumerate(contents))
+    assert max(delays) <= elapsed < max(delays) + 0.3
+    assert page_server.peak == len(urls)
+
+
+def test_amap_takes_about_as_long_as_the_slowest_page(page_server, fetcher):
+    delays = [0.1, 0.2, 0.3, 0.4, 0.6]
+    urls = [f"{page_server.url}/{i}?delay={delay}" for i, delay in enumerate(delays)]
+
+    start = time.monotonic()
+    contents = asyncio.run(fetcher.amap(load_text(fetcher), urls))
+    elapsed = time.monotonic() - start
+
+    assert all(f"Page {i} " in content for i, content in enumerate(contents))
+    assert max(delays) <= elapsed < max(delays) + 0.3
+
+
+def test_map_limits_concurrent_requests_per_host(page_server):
+    fetcher = PageFetcher(timeout=5, max_workers=8, max_per_host=2, deadline=5)
+    urls = [f"{page_server.url}/{i}?delay=0.2" for i in range(6)]
+
+    start = time.monotonic()
+    contents = fetcher.map(load_text(fetcher), urls)
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert all(contents)
+    assert page_server.peak == 2
+    assert elapsed >= 0.6
+
+
+def test_map_drops_pages_not_loaded_within_the_deadline(page_server):
+    fetcher = PageFetcher(timeout=5, max_workers=4, deadline=0.5)
+    urls = [f"{page_server.url}/fast?delay=0.1", f"{page_server.url}/slow?delay=2"]
+
+    start = time.monotonic()
+    contents = fetcher.map(load_text(fetcher), urls)
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert contents[0] is not None and contents[1] is None
+    assert elapsed < 1
+
+
+def test_amap_drops_pages_not_loaded_within_the_deadline(page_server):
+    fetcher = PageFetcher(timeout=5, max_workers=4, deadline=0.5)
+    urls = [f"{page_server.url}/fast?delay=0.1", f"{page_server.url}/slow?delay=2"]
+
+    start = time.monotonic()
+    contents = asyncio.run(fetcher.amap(load_text(fetcher), urls))
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert contents[0] is not None and contents[1] is None
+    assert elapsed < 1
+
+
+@pytest.mark.parametrize("mode", ["map", "amap"])
+def test_slow_host_doesnt_hold_workers_past_the_deadline(page_server, mode):
+    fetcher = PageFetcher(timeout=5, max_workers=1, deadline=0.5, retries=0)
+    load = load_text(fetcher)
+
+    def batch(urls):
+        if mode == "map":
+            return fetcher.map(load, urls)
+        return asyncio.run(fetcher.amap(load, urls))
+
+    assert batch([f"{page_server.url}/slow?delay=2"]) == [None]
+    start = time.monotonic()
+    contents = batch([f"{page_server.url}/fast"])
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert contents[0] is not None
+    assert elapsed < 0.3
+
+
+def test_map_doesnt_wait_for_retries_past_the_deadline(page_server):
+    fetcher = PageFetcher(timeout=5, deadline=0.5)
+
+    start = time.monotonic()
+    statuses = fetcher.map(
+        lambda url: fetcher.get(url).status_code,
+        [f"{page_server.url}/busy?status=503&retry_after=2&fail=5"],
+    )
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert statuses == [503]
+    assert elapsed < 0.3
+    assert page_server.hits["/busy"] == 1
+
+
+def test_get_times_out_at_the_deadline(page_server):
+    fetcher = PageFetcher(timeout=5, retries=0)
+
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        fetcher.get(f"{page_server.url}/slow?delay=2", due=time.monotonic() + 0.3)
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert elapsed < 0.6
+
+
+def test_map_returns_none_for_failed_loads(page_server, fetcher):
+    urls = [f"{page_server.url}/ok", f"{page_server.url}/missing?status=404"]
+
+    contents = fetcher.map(load_text(fetcher), urls)
+
+    assert contents[0] is not None and contents[1] is None
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from conftest import DESCRIPTION
+
+from web_crawler.agents import CriticAgent, SelectorAgent
+from web_crawler.agents.output_structures import Website, WebsiteHeader
+from web_crawler.models import ModelRegistry
+
+
+@pytest.fixture
+def inits(fake_llm, monkeypatch) -> list[str]:
+    """Records names of initialized chat models."""
+    inits = []
+
+    def init_chat_model(name, **_):
+        inits.append(name)
+        return fake_llm.model_copy(update={"model_name": name})
+
+    monkeypatch.setattr("web_crawler.models.init_chat_model", init_chat_model)
+
+    return inits
+
+
+def test_chat_models_are_shared_per_model_and_settings(inits):
+    models = ModelRegistry()
+
+    model = models.chat_model("openai:gpt-4o", timeout=10)
+
+    assert models.chat_model("openai:gpt-4o", timeout=10) is model
+    assert models.chat_model("openai:gpt-4o", timeout=20) is not model
+    assert models.chat_model("openai:gpt-4o-mini", timeout=10) is not model
+    assert inits == ["openai:gpt-4o", "openai:gpt-4o", "openai:gpt-4o-mini"]
+
+
+def test_chat_model_is_initialized_once_by_concurrent_callers(inits):
+    models = ModelRegistry()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        chat_models = list(
+            executor.map(lambda _: models.chat_model("openai:gpt-4o"), range(32))
+        )
+
+    assert all(model is chat_models[0] for model in chat_models)
+    assert inits == ["openai:gpt-4o"]
+
+
+def test_token_counters_are_shared_per_model_and_settings(inits):
+    models = ModelRegistry()
+
+    counter = models.token_counter("openai:gpt-4o")
+
+    assert models.token_counter("openai:gpt-4o") is counter
+    assert models.token_counter("openai:gpt-4o", timeout=10) is not counter
+    assert inits == ["openai:gpt-4o", "openai:gpt-4o"]
+
+
+def test_runnables_are_built_once_per_key(inits):
+    models = ModelRegistry()
+    configured = []
+
+    def configure(model):
+        configured.append(model)
+        return model.bind(stop=["."])
+
+    runnable = models.runnable("openai:gpt-4o", "schema", configure)
+
+    assert models.runnable("openai:gpt-4o", "schema", configure) is runnable
+    assert models.runnable("openai:gpt-4o", "other", configure) is not runnable
+    assert models.runnable("openai:gpt-4o-mini", "schema", configure) is not runnable
+    assert len(configured) == 3
+    assert configured[0] is configured[1]
+    assert inits == ["openai:gpt-4o", "openai:gpt-4o-mini"]
+
+
+def test_agents_sharing_the_registry_share_models(inits, fake_llm):
+    models = ModelRegistry()
+    critic = CriticAgent(DESCRIPTION, "Critique.", models=models)
+    selector = SelectorAgent(DESCRIPTION, "Select.", models=models)
+    websites = [
+        Website(header=WebsiteHeader(link=f"http://127.0.0.1:1/{i}"), content="Page")
+        for i in range(3)
+    ]
+
+    selector.run(critic.run(websites))
+    runnables = dict(models._runnables)
+    selector.run(critic.run(websites))
+
+    assert models._runnables.keys() == runnables.keys()
+    assert all(models._runnables[key] is runnables[key] for key in runnables)
+    assert inits == ["openai:gpt-4o"]
+    assert fake_llm.calls.count("openai:gpt-4o:Critique") == 6
@@ -0,0 +1,75 @@
+import time
+
+from web_crawler.cache import PageCache
+from web_crawler.loading import PageFetcher, get_extractor, normalize_url
+
+
+def test_pages_turn_stale_after_ttl():
+    cache = PageCache(":memory:", ttl=0.2)
+    cache.put("a", "content", etag='"1"')
+
+    assert cache.get("a").fresh
+    time.sleep(0.3)
+    page = cache.get("a")
+    assert not page.fresh
+    assert page.validators() == {"If-None-Match": '"1"'}
+
+    cache.refresh("a")
+    assert cache.get("a").fresh
+
+
+def test_expired_pages_without_validators_are_evicted():
+    cache = PageCache(":memory:", ttl=0.1)
+    cache.put("plain", "content")
+    cache.put("validated", "content", last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    time.sleep(0.2)
+
+    cache.put("new", "content")
+
+    assert cache.get("plain") is None
+    assert cache.get("validated") is not None
+
+
+def test_least_recently_used_pages_are_evicted_above_size_limit():
+    cache = PageCache(":memory:", max_bytes=25)
+    cache.put("a", "x" * 10)
+    time.sleep(0.01)
+    cache.put("b", "x" * 10)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+
+    cache.put("c", "x" * 10)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_cached_text_is_keyed_by_character_limit(page_server, make_search_agent):
+    cache = PageCache(":memory:")
+    url = f"{page_server.url}/page"
+    truncated = make_search_agent(
+        page_cache=cache, extractor=get_extractor("lxml", max_chars=10)
+    )
+    full = make_search_agent(page_cache=cache, extractor=get_extractor("lxml"))
+
+    assert len(truncated._load_website(url)) <= 10
+    assert full._load_website(url) == "Menu Page page about on-device AI."
+    assert page_server.hits["/page"] == 2
+
+
+def test_stale_pages_are_served_when_revalidation_fails(page_server, make_search_agent):
+    cache = PageCache(":memory:", ttl=0)
+    agent = make_search_agent(
+        page_cache=cache, fetcher=PageFetcher(timeout=1, retries=0)
+    )
+    unavailable = f"{page_server.url}/unavailable?status=503&fail=9"
+    unreachable = "http://127.0.0.1:9/unreachable"
+    gone = f"{page_server.url}/gone?status=404&fail=9"
+    for url in (unavailable, unreachable, gone):
+        cache.put(f"lxml:{normalize_url(url)}", "stale", etag='"1"')
+
+    assert agent._load_website(unavailable) == "stale"
+    assert agent._load_website(unreachable) == "stale"
+    assert agent._load_website(gone) is None
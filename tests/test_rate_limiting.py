@@ -0,0 +1,134 @@
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+from langchain_core.tools import tool
+
+from web_crawler.loading import PageFetcher
+from web_crawler.rate_limiting import (
+    RateLimiter,
+    TokenBucket,
+    backoff_delay,
+    parse_retry_after,
+)
+from web_crawler.search_tools import RateLimitedTool
+from web_crawler.stats import Stats
+
+
+def test_token_bucket_lets_bursts_through_and_goes_into_debt():
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(rate=10, capacity=1)
+    bucket.reserve()
+    time.sleep(0.3)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_token_bucket_pause_holds_back_calls():
+    bucket = TokenBucket(rate=100, capacity=5)
+    bucket.pause(0.5)
+
+    assert bucket.reserve() == pytest.approx(0.5, abs=0.01)
+
+
+def test_rate_limiter_keeps_a_bucket_per_key():
+    limiter = RateLimiter(rate=5)
+
+    start = time.monotonic()
+    limiter.acquire("a.com")
+    limiter.acquire("b.com")
+    assert time.monotonic() - start < 0.05
+
+    assert limiter.acquire("a.com") == pytest.approx(0.2, abs=0.02)
+
+
+def test_backoff_delay_is_jittered_within_the_exponential_cap():
+    delays = [backoff_delay(3, base=1, max_delay=5) for _ in range(200)]
+
+    assert all(0 <= delay <= 5 for delay in delays)
+    assert max(delays) > 2.5
+    assert all(backoff_delay(0, base=1) <= 1 for _ in range(100))
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, None), ("", None), ("3", 3), ("1.5", 1.5), ("-2", 0), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    assert parse_retry_after(formatdate(time.time() + 30, usegmt=True)) == (
+        pytest.approx(30, abs=1.5)
+    )
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0
+
+
+def test_fetcher_retries_unavailable_responses_after_retry_after(page_server):
+    stats = Stats()
+    fetcher = PageFetcher(retries=2, backoff_max=5, stats=stats)
+
+    start = time.monotonic()
+    response = fetcher.get(f"{page_server.url}/busy?status=503&retry_after=0.3&fail=2")
+    elapsed = time.monotonic() - start
+    fetcher.close()
+
+    assert response.status_code == 200
+    assert page_server.hits["/busy"] == 3
+    assert stats.get("retries.pages") == 2
+    assert elapsed >= 0.6
+
+
+def test_fetcher_gives_up_on_retry_after_longer_than_backoff_max(page_server):
+    fetcher = PageFetcher(retries=2, backoff_max=1)
+
+    response = fetcher.get(f"{page_server.url}/busy?status=429&retry_after=60")
+    fetcher.close()
+
+    assert response.status_code == 429
+    assert page_server.hits["/busy"] == 1
+
+
+def test_fetcher_returns_last_response_once_retries_run_out(page_server):
+    fetcher = PageFetcher(retries=1, backoff_base=0.01)
+
+    response = fetcher.get(f"{page_server.url}/down?status=502&fail=9")
+    fetcher.close()
+
+    assert response.status_code == 502
+    assert page_server.hits["/down"] == 2
+
+
+def test_rate_limited_tool_retries_with_retry_after_of_the_error():
+    attempts = []
+
+    @tool
+    def search(query: str) -> str:
+        """Searches the web.
+
+        Args:
+            query: search query.
+        """
+        attempts.append(time.monotonic())
+        if len(attempts) < 2:
+            response = requests.Response()
+            response.status_code = 429
+            response.headers["Retry-After"] = "0.2"
+            raise requests.HTTPError(response=response)
+        return "results"
+
+    limited = RateLimitedTool(search, retries=2, backoff_max=5)
+
+    assert limited.invoke({"query": "ai"}) == "results"
+    assert attempts[1] - attempts[0] >= 0.2
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+from web_crawler.agents.output_structures import (
+    Critique,
+    WebsiteCritique,
+    WebsiteHeader,
+)
+from web_crawler.registry import CritiqueRegistry
+
+
+def critique(url: str) -> WebsiteCritique:
+    return WebsiteCritique(
+        website=WebsiteHeader(link=url),
+        critique=Critique(upsides="Fits.", downsides="None."),
+    )
+
+
+def resolve_later(registry: CritiqueRegistry, url: str, delay: float = 0.1) -> None:
+    timer = threading.Timer(delay, registry.resolve, (url, critique(url)))
+    timer.start()
+
+
+def test_first_run_claiming_a_canonical_url_owns_it():
+    registry = CritiqueRegistry()
+
+    assert registry.claim("https://www.example.com/page?utm_source=x", 0) == (0, True)
+    assert registry.claim("http://example.com/page/", 1) == (0, False)
+    assert registry.claim("https://example.com/page", 0) == (0, False)
+
+
+def test_wait_returns_critique_resolved_by_the_owner():
+    registry = CritiqueRegistry()
+    registry.claim("https://example.com/page", 0)
+    registry.claim("https://example.com/page", 1)
+    resolve_later(registry, "https://example.com/page")
+
+    reused = registry.wait("https://example.com/page")
+
+    assert reused.website.link == "https://example.com/page"
+
+
+def test_await_critique_returns_critique_resolved_by_the_owner():
+    registry = CritiqueRegistry()
+    registry.claim("https://example.com/page", 0)
+    resolve_later(registry, "https://example.com/page")
+
+    reused = asyncio.run(registry.await_critique("https://example.com/page"))
+
+    assert reused.website.link == "https://example.com/page"
+
+
+def test_wait_times_out_with_none():
+    registry = CritiqueRegistry(timeout=0.1)
+    registry.claim("https://example.com/page", 0)
+
+    assert registry.wait("https://example.com/page") is None
+    assert asyncio.run(registry.await_critique("https://example.com/page")) is None
+
+
+def test_timed_out_await_doesnt_cancel_the_critique_for_others():
+    registry = CritiqueRegistry(timeout=0.05)
+    registry.claim("https://example.com/page", 0)
+    asyncio.run(registry.await_critique("https://example.com/page"))
+
+    registry.resolve("https://example.com/page", critique("https://example.com/page"))
+
+    assert registry.wait("https://example.com/page") is not None
+
+
+def test_linked_duplicate_gets_the_critique_of_the_original():
+    registry = CritiqueRegistry()
+    registry.claim("https://a.com/original", 0)
+    registry.claim("https://b.com/copy", 1)
+
+    assert registry.link("https://b.com/copy", "https://a.com/original") == 0
+    registry.resolve("https://a.com/original", critique("https://a.com/original"))
+
+    assert registry.wait("https://b.com/copy").website.link == "https://a.com/original"
+
+
+def test_release_of_a_stopped_run_unblocks_waiting_runs():
+    registry = CritiqueRegistry(timeout=10)
+    registry.claim("https://a.com/page", 0)
+    registry.claim("https://b.com/page", 1)
+    threading.Timer(0.1, registry.release, (0,)).start()
+
+    start = time.monotonic()
+    assert registry.wait("https://a.com/page") is None
+    assert time.monotonic() - start < 1
+
+    registry.resolve("https://b.com/page", critique("https://b.com/page"))
+    assert registry.wait("https://b.com/page") is not None
+
+
+def test_release_keeps_resolved_critiques():
+    registry = CritiqueRegistry()
+    registry.claim("https://a.com/page", 0)
+    registry.resolve("https://a.com/page", critique("https://a.com/page"))
+
+    registry.release()
+
+    assert registry.wait("https://a.com/page") is not None
+
+
+def test_unknown_websites_are_not_critiqued():
+    registry = CritiqueRegistry(timeout=30)
+
+    assert registry.wait("https://example.com/unknown") is None
+    assert asyncio.run(registry.await_critique("https://example.com/unknown")) is None
+
+
+def test_resolving_unknown_websites_records_their_critiques():
+    registry = CritiqueRegistry(timeout=30)
+    registry.resolve("https://example.com/page", critique("https://example.com/page"))
+
+    owner, claimed = registry.claim("https://example.com/page", 1)
+
+    assert not claimed and owner != 1
+    assert registry.wait("https://example.com/page") == critique(
+        "https://example.com/page"
+    )
+
+
+def test_duplicates_of_unknown_websites_are_not_critiqued():
+    registry = CritiqueRegistry(timeout=30)
+    registry.claim("https://example.com/copy", 0)
+
+    owner = registry.link("https://example.com/copy", "https://example.com/original")
+
+    assert owner != 0
+    assert registry.wait("https://example.com/copy") is None
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from web_crawler.scheduling import LLMScheduler, ModelLimits, Priority
+from web_crawler.stats import Stats
+
+
+@pytest.fixture
+def window(monkeypatch) -> float:
+    """Shortens the sliding window of budgets to keep tests fast."""
+    monkeypatch.setattr("web_crawler.scheduling.WINDOW", 0.3)
+
+    return 0.3
+
+
+def wait_for_queue(scheduler: LLMScheduler, depth: int) -> None:
+    deadline = time.monotonic() + 5
+    while scheduler.queue_depth < depth:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_waiting_calls_go_in_order_of_priority_then_arrival():
+    scheduler = LLMScheduler(max_concurrency=1)
+    order = []
+
+    def call(name: str, priority: Priority) -> None:
+        with scheduler.slot("model", 10, priority):
+            order.append(name)
+
+    threads = []
+    with scheduler.slot("model", 10):
+        for name, priority in [
+            ("critique", Priority.LOW),
+            ("search", Priority.NORMAL),
+            ("decision", Priority.HIGH),
+            ("select", Priority.NORMAL),
+        ]:
+            threads.append(threading.Thread(target=call, args=(name, priority)))
+            threads[-1].start()
+            wait_for_queue(scheduler, len(threads))
+
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["decision", "search", "select", "critique"]
+
+
+def test_calls_in_flight_are_capped():
+    stats = Stats()
+    scheduler = LLMScheduler(max_concurrency=2, stats=stats)
+    in_flight = []
+    lock = threading.Lock()
+    peak = 0
+
+    def call() -> None:
+        nonlocal peak
+        with scheduler.slot("model", 10):
+            with lock:
+                in_flight.append(1)
+                peak = max(peak, len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert peak == 2
+    assert stats.get("scheduler.requests") == 6
+
+
+def test_requests_over_the_rpm_wait_for_the_window(window):
+    scheduler = LLMScheduler({"model": ModelLimits(rpm=2)})
+    starts = []
+
+    for _ in range(3):
+        with scheduler.slot("model", 10):
+            starts.append(time.monotonic())
+
+    assert starts[1] - starts[0] < 0.1
+    assert starts[2] - starts[0] == pytest.approx(window, abs=0.1)
+
+
+def test_tokens_over_the_tpm_wait_for_the_window(window):
+    scheduler = LLMScheduler({"model": ModelLimits(tpm=100)})
+    starts = []
+
+    for _ in range(2):
+        with scheduler.slot("model", 60):
+            starts.append(time.monotonic())
+
+    assert starts[1] - starts[0] == pytest.approx(window, abs=0.1)
+
+
+def test_used_tokens_correct_the_estimate(window):
+    scheduler = LLMScheduler({"model": ModelLimits(tpm=100)})
+
+    start = time.monotonic()
+    with scheduler.slot("model", 90) as ticket:
+        ticket.used_tokens = 10
+    with scheduler.slot("model", 80):
+        pass
+
+    assert time.monotonic() - start < 0.1
+
+
+def test_budgets_of_models_are_separate(window):
+    scheduler = LLMScheduler({"a": ModelLimits(rpm=1), "b": ModelLimits(rpm=1)})
+
+    start = time.monotonic()
+    with scheduler.slot("a", 10):
+        pass
+    with scheduler.slot("b", 10):
+        pass
+
+    assert time.monotonic() - start < 0.1
+
+
+def test_call_larger_than_the_tpm_goes_through_once_the_window_is_empty(window):
+    scheduler = LLMScheduler({"model": ModelLimits(tpm=100)})
+    with scheduler.slot("model", 50):
+        pass
+    start = time.monotonic()
+    finished = threading.Event()
+
+    def call() -> None:
+        with scheduler.slot("model", 500):
+            finished.set()
+
+    threading.Thread(target=call, daemon=True).start()
+
+    assert finished.wait(5)
+    assert time.monotonic() - start == pytest.approx(window, abs=0.1)
+
+
+def test_cancelled_async_calls_leave_the_queue():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    async def main() -> None:
+        async with scheduler.aslot("model", 10):
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(0.05):
+                    async with scheduler.aslot("model", 10):
+                        pass
+            assert scheduler.queue_depth == 0
+
+        async with scheduler.aslot("model", 10, Priority.HIGH):
+            pass
+
+    asyncio.run(asyncio.wait_for(main(), 5))
@@ -0,0 +1,348 @@
+import asyncio
+import itertools
+import re
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import tool
+
+from web_crawler.agents import PlannerAgent
+from web_crawler.agents.output_structures import WebsiteChoice, WebsiteCritique
+from web_crawler.dedupe import PageDeduplicator
+from web_crawler.loading import PageFetcher
+from web_crawler.registry import CritiqueRegistry
+from web_crawler.stats import Stats
+
+
+class FailingDeduplicator(PageDeduplicator):
+    """Deduplicator failing the first run registering loaded websites."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.failed = False
+
+    def claim_content(self, url: str, content: str) -> str | None:
+        if not self.failed:
+            self.failed = True
+            raise RuntimeError("Failed after claiming websites.")
+        return super().claim_content(url, content)
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_failed_run_doesnt_block_runs_reusing_its_websites(make_search_agent, mode):
+    agent = make_search_agent(
+        deduplicator=FailingDeduplicator(),
+        registry=CritiqueRegistry(timeout=30),
+        max_iterations=1,
+    )
+
+    start = time.monotonic()
+    if mode == "sync":
+        agent.run(2)
+    else:
+        asyncio.run(agent.arun(2))
+
+    assert time.monotonic() - start < 10
+
+
+def run_agent(agent, mode: str, tries: int = 2) -> list:
+    if mode == "run":
+        return agent.run(tries)
+    if mode == "arun":
+        return asyncio.run(agent.arun(tries))
+    if mode == "stream":
+        return list(agent.stream(tries))
+
+    async def collect():
+        return [item async for item in agent.astream(tries)]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("mode", ["run", "arun", "stream", "astream"])
+def test_runs_select_critiqued_websites(make_search_agent, fake_llm, mode):
+    agent = make_search_agent()
+
+    choices = run_agent(agent, mode)
+
+    assert choices
+    assert all(choice.website.link.startswith("http://127.0.0.1") for choice in choices)
+    assert len({choice.website.link for choice in choices}) == len(choices)
+    assert "gpt-4o:Critique" in " ".join(fake_llm.calls)
+
+
+@pytest.mark.parametrize("mode", ["run", "arun", "stream", "astream"])
+def test_global_selection_selects_once_from_all_runs(make_search_agent, fake_llm, mode):
+    agent = make_search_agent(global_selection=True)
+
+    choices = run_agent(agent, mode, tries=3)
+
+    assert choices
+    assert fake_llm.calls.count("openai:gpt-4o:WebsiteChoiceList") == 1
+
+
+@pytest.mark.parametrize("mode", ["run", "arun"])
+def test_prompt_prefix_stays_the_same_across_nodes_and_iterations(
+    make_search_agent, fake_llm, mode
+):
+    fake_llm.answers["LoopDecision"] = lambda _: {"loop_decision": "SEARCH"}
+
+    run_agent(make_search_agent(max_iterations=3), mode, tries=1)
+
+    requests = [
+        (tools, messages)
+        for tools, messages in fake_llm.requests
+        if "WebsitesToLoad" in [tool["function"]["name"] for tool in tools]
+    ]
+    assert len(requests) == 3 * 3 - 1
+    assert all(tools == requests[0][0] for tools, _ in requests)
+    prompts = [
+        [(message.type, message.content) for message in messages]
+        for _, messages in requests
+    ]
+    assert all(prompt[0] == prompts[0][0] for prompt in prompts)
+    for prompt, next_prompt in itertools.pairwise(prompts):
+        assert next_prompt[: len(prompt) - 1] == prompt[:-1]
+
+
+def test_prompt_cache_hits_are_recorded_per_agent(make_search_agent, fake_llm):
+    fake_llm.cached_tokens = 60
+    stats = Stats()
+
+    make_search_agent(stats=stats).run(1)
+
+    calls = stats.get("llm.search.calls")
+    assert calls == 3
+    assert stats.get("llm.search.cached_tokens") == 60 * calls
+    assert stats.ratio("llm.search.cached_tokens", "llm.search.input_tokens") == 0.6
+    assert stats.get("node.DECIDE_LOOP.cached_tokens") == 60
+
+
+def test_planned_searches_pass_queries_as_the_tools_argument(
+    make_search_agent, page_server, fake_llm
+):
+    queries = []
+
+    @tool
+    def web_search(q: str, max_results: int = 3) -> list[dict[str, str]]:
+        """Searches the web.
+
+        Args:
+            q: search query.
+            max_results: number of results.
+        """
+        queries.append(q)
+        return [{"link": f"{page_server.url}/{len(queries)}-0", "title": "Page"}]
+
+    fake_llm.answers["QueryPlan"] = lambda _: {
+        "queries": ["on device inference", "mobile llm apps"]
+    }
+    fake_llm.answers["web_search"] = lambda messages: {"q": f"query {len(messages)}"}
+    fake_llm.answers["LoopDecision"] = lambda _: {"loop_decision": "SEARCH"}
+    agent = make_search_agent(
+        search_tool=web_search, planner=PlannerAgent("Product.", "Plan.")
+    )
+
+    agent.run(2)
+
+    assert len(queries) == 4
+    assert {"on device inference", "mobile llm apps"} < set(queries)
+    assert fake_llm.calls.count("openai:gpt-4o:web_search") == 2
+
+
+def test_planner_needs_a_single_string_argument_of_the_search_tool(make_search_agent):
+    @tool
+    def search(query: str, site: str) -> str:
+        """Searches a website.
+
+        Args:
+            query: search query.
+            site: website to search.
+        """
+        return ""
+
+    with pytest.raises(ValueError, match="single required string argument"):
+        make_search_agent(search_tool=search, planner=PlannerAgent("Product.", "Plan."))
+
+    assert make_search_agent(search_tool=search)
+
+
+def test_history_is_compacted_to_description_summary_and_last_iteration(
+    make_search_agent, fake_llm
+):
+    histories = []
+
+    def decide(messages):
+        histories.append(messages[:-1])
+        return {"loop_decision": "SEARCH"}
+
+    fake_llm.answers["LoopDecision"] = decide
+    stats = Stats()
+    agent = make_search_agent(max_history_tokens=250, max_iterations=3, stats=stats)
+
+    agent.run(1)
+
+    first, compacted = histories
+    description, summary, *last_iteration = compacted
+    assert isinstance(description, SystemMessage)
+    assert description.content == first[0].content
+    assert isinstance(summary, SystemMessage)
+    assert "Queries already tried: query 2" in summary.content
+    assert isinstance(last_iteration[0], HumanMessage)
+    assert last_iteration[0].content == "Search."
+    assert (
+        sum(
+            isinstance(message, HumanMessage) and message.content == "Search."
+            for message in last_iteration
+        )
+        == 1
+    )
+    assert stats.get("history.compactions") == 2
+
+    for history in histories:
+        calls = [
+            call["id"]
+            for message in history
+            if isinstance(message, AIMessage)
+            for call in message.tool_calls
+            if call["name"] == "search"
+        ]
+        results = [
+            message.tool_call_id
+            for message in history
+            if isinstance(message, ToolMessage)
+        ]
+        assert calls == results
+
+
+class FailingPlanner(PlannerAgent):
+    """Planner whose model call fails."""
+
+    def __init__(self) -> None:
+        super().__init__("Product.", "Plan.")
+
+    def run(self, count):
+        raise TimeoutError("Planning timed out.")
+
+    async def arun(self, count):
+        raise TimeoutError("Planning timed out.")
+
+
+@pytest.mark.parametrize("mode", ["run", "arun", "stream", "astream"])
+def test_failed_planning_falls_back_to_unplanned_searches(
+    make_search_agent, fake_llm, mode
+):
+    stats = Stats()
+    agent = make_search_agent(planner=FailingPlanner(), stats=stats)
+
+    choices = run_agent(agent, mode)
+
+    assert choices
+    assert fake_llm.calls.count("openai:gpt-4o:search") == 2
+    assert stats.get("planner.failures") == 1
+    assert stats.get("planner.planned_searches") == 0
+
+
+@pytest.mark.parametrize("mode", ["stream", "astream"])
+def test_critiques_are_streamed_while_runs_are_in_progress(
+    make_search_agent, fake_llm, mode
+):
+    selecting = threading.Event()
+    answer = fake_llm.answers["WebsiteChoiceList"]
+
+    def select(messages):
+        assert selecting.wait(5)
+        return answer(messages)
+
+    fake_llm.answers["WebsiteChoiceList"] = select
+    agent = make_search_agent()
+    items = []
+
+    def on_item(item) -> None:
+        if not items:
+            assert fake_llm.calls.count("openai:gpt-4o:WebsiteChoiceList") == 0
+        items.append(item)
+        selecting.set()
+
+    if mode == "stream":
+        for item in agent.stream(2, critiques=True):
+            on_item(item)
+    else:
+
+        async def collect():
+            async for item in agent.astream(2, critiques=True):
+                on_item(item)
+
+        asyncio.run(collect())
+
+    assert isinstance(items[0], WebsiteCritique)
+    assert any(isinstance(item, WebsiteChoice) for item in items)
+
+
+@pytest.mark.parametrize("mode", ["stream", "astream"])
+def test_closing_the_stream_stops_loading_websites(
+    make_search_agent, page_server, fake_llm, mode
+):
+    searches = itertools.count(1)
+    fake_llm.answers["WebsitesToLoad"] = lambda messages: {
+        "websites": [
+            {"link": link}
+            for link in re.findall(
+                r"http://127\.0\.0\.1:\d+/[\w-]+\?delay=\d", str(messages[-2])
+            )
+        ]
+    }
+
+    @tool
+    def search(query: str) -> list[dict[str, str]]:
+        """Searches the web.
+
+        Args:
+            query: search query.
+        """
+        number = next(searches)
+        delay = 0 if number == 1 else 2
+        time.sleep(0.5 if delay else 0)
+        return [
+            {
+                "link": f"{page_server.url}/{number}-{i}?delay={delay}",
+                "title": "Page",
+            }
+            for i in range(8)
+        ]
+
+    agent = make_search_agent(
+        search_tool=search,
+        fetcher=PageFetcher(max_workers=2, max_per_host=2, timeout=5, deadline=5),
+    )
+
+    def slow_loads() -> int:
+        return sum(page_server.hits[f"/2-{i}"] for i in range(8))
+
+    def wait_for_slow_loads() -> float:
+        while not slow_loads():
+            time.sleep(0.01)
+        return time.monotonic()
+
+    if mode == "stream":
+        stream = agent.stream(2, critiques=True)
+        assert isinstance(next(stream), WebsiteCritique)
+        start = wait_for_slow_loads()
+        stream.close()
+    else:
+
+        async def first() -> float:
+            stream = agent.astream(2, critiques=True)
+            assert isinstance(await anext(stream), WebsiteCritique)
+            start = await asyncio.to_thread(wait_for_slow_loads)
+            await stream.aclose()
+            return start
+
+        start = asyncio.run(first())
+    closed = time.monotonic() - start
+    time.sleep(2.5)
+
+    assert closed < 1
+    assert slow_loads() == 2
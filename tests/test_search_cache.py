@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.tools import tool
+
+from web_crawler.cache import SearchCache
+from web_crawler.search_tools import CachedSearchTool
+from web_crawler.search_tools.cached import normalize_query
+from web_crawler.stats import Stats
+
+
+def counting_search(delay: float = 0):
+    calls = []
+    lock = threading.Lock()
+
+    @tool
+    def search(query: str) -> list[str]:
+        """Searches the web.
+
+        Args:
+            query: search query.
+        """
+        with lock:
+            calls.append(query)
+        time.sleep(delay)
+        return [f"result of {query}"]
+
+    return search, calls
+
+
+def test_normalize_query_ignores_case_punctuation_and_word_order():
+    assert normalize_query("React Native, on-device AI!") == normalize_query(
+        "on-device ai react native"
+    )
+    assert normalize_query("C++ AI") != normalize_query("C AI")
+
+
+def test_equal_normalized_queries_are_searched_once():
+    search, calls = counting_search()
+    stats = Stats()
+    cached = CachedSearchTool(search, ttl=60, stats=stats)
+
+    first = cached.invoke({"query": "On-device AI"})
+    second = cached.invoke({"query": "ai on-device"})
+
+    assert first == second
+    assert len(calls) == 1
+    assert stats.get("search.cache_hits") == 1
+
+
+def test_results_expire_after_ttl():
+    search, calls = counting_search()
+    cached = CachedSearchTool(search, ttl=0.1)
+
+    cached.invoke({"query": "ai"})
+    time.sleep(0.2)
+    cached.invoke({"query": "ai"})
+
+    assert len(calls) == 2
+
+
+def test_concurrent_equal_queries_are_coalesced():
+    search, calls = counting_search(delay=0.2)
+    stats = Stats()
+    cached = CachedSearchTool(search, ttl=60, stats=stats)
+
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(cached.invoke, [{"query": "ai"}] * 4))
+
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+    assert stats.get("search.coalesced") == 3
+
+
+def test_concurrent_equal_async_queries_are_coalesced():
+    search, calls = counting_search(delay=0.2)
+    cached = CachedSearchTool(search, ttl=60)
+
+    async def search_all():
+        return await asyncio.gather(
+            *(cached.ainvoke({"query": "ai"}) for _ in range(4))
+        )
+
+    results = asyncio.run(search_all())
+
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_results_are_reused_from_disk(tmp_path):
+    path = str(tmp_path / "searches.sqlite")
+    search, calls = counting_search()
+
+    CachedSearchTool(search, ttl=60, cache=SearchCache(path)).invoke({"query": "ai"})
+    result = CachedSearchTool(search, ttl=60, cache=SearchCache(path)).invoke(
+        {"query": "AI"}
+    )
+
+    assert result == ["result of ai"]
+    assert len(calls) == 1
+
+
+def test_expired_results_on_disk_are_not_served():
+    cache = SearchCache(":memory:", ttl=0.1)
+    cache.put("key", ["result"])
+    time.sleep(0.2)
+
+    assert cache.get("key") is None
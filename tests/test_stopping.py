@@ -0,0 +1,96 @@
+import pytest
+from conftest import DESCRIPTION
+
+from web_crawler.agents.output_structures import (
+    Critique,
+    WebsiteCritique,
+    WebsiteHeader,
+)
+from web_crawler.stats import Stats
+from web_crawler.stopping import YieldStopPolicy
+
+SUBSTANTIVE = Critique(upsides="Runs AI models on device.", downsides="Old.")
+VAGUE = Critique(upsides="Nice colors.", downsides="Not about mobile apps.")
+
+
+def critique(link: str, content: Critique = SUBSTANTIVE) -> WebsiteCritique:
+    return WebsiteCritique(website=WebsiteHeader(link=link), critique=content)
+
+
+@pytest.fixture
+def policy() -> YieldStopPolicy:
+    return YieldStopPolicy(DESCRIPTION, min_yield=0.5, stats=Stats())
+
+
+def test_yield_counts_new_domains(policy):
+    critiques = [
+        critique("https://a.com/1"),
+        critique("https://www.a.com/2"),
+        critique("https://b.com/1"),
+        critique("https://c.com/1"),
+    ]
+
+    iteration_yield = policy.measure(0, 4, 0, critiques, [critique("https://c.com/2")])
+
+    assert iteration_yield == 0.5
+
+
+def test_yield_skips_critiques_without_substance(policy):
+    critiques = [critique("https://a.com/1"), critique("https://b.com/1", VAGUE)]
+
+    assert policy.measure(0, 2, 0, critiques, []) == 0.5
+
+
+def test_duplicates_lower_the_yield(policy):
+    assert policy.measure(0, 4, 2, [critique("https://a.com/1")], []) == 0.25
+
+
+def test_nothing_picked_yields_nothing(policy):
+    assert policy.measure(0, 0, 0, [], []) == 0
+
+
+def test_yields_are_recorded():
+    stats = Stats()
+    policy = YieldStopPolicy(DESCRIPTION, stats=stats)
+
+    policy.measure(0, 2, 0, [critique("https://a.com/1")], [])
+    policy.measure(0, 0, 0, [], [])
+
+    assert stats.get("stopping.iterations") == 2
+    assert stats.get("stopping.yield") == 0.5
+
+
+@pytest.mark.parametrize(
+    ("yields", "stop"),
+    [
+        ([], False),
+        ([0.1], False),
+        ([0.1, 0.6], False),
+        ([0.6, 0.1], False),
+        ([0.1, 0.1], True),
+        ([0.6, 0.1, 0.1], True),
+        ([0.1, 0.1, 0.5], False),
+    ],
+)
+def test_loop_stops_after_patience_iterations_below_min_yield(yields, stop):
+    stats = Stats()
+    policy = YieldStopPolicy(DESCRIPTION, min_yield=0.5, patience=2, stats=stats)
+
+    assert policy.should_stop(0, yields) == stop
+    assert stats.get("stopping.early_stops") == stop
+
+
+def test_agent_stops_without_asking_the_llm(make_search_agent, fake_llm):
+    stats = Stats()
+    agent = make_search_agent(
+        stop_policy=YieldStopPolicy(DESCRIPTION, patience=2, stats=stats),
+        max_iterations=4,
+        stats=stats,
+    )
+
+    assert agent.run(1)
+
+    assert fake_llm.calls.count("openai:gpt-4o:search") == 2
+    assert "openai:gpt-4o:LoopDecision" not in fake_llm.calls
+    assert stats.get("stopping.early_stops") == 1
+    assert stats.get("stopping.saved_iterations") == 2
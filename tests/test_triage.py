@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from conftest import DESCRIPTION
+
+from web_crawler.agents import TriageAgent
+from web_crawler.agents.output_structures import Website, WebsiteHeader
+from web_crawler.stats import Stats
+from web_crawler.triage import PageTriage
+
+ARTICLE = (
+    "This library makes running language models on a mobile device simple. "
+    "We walk through how the apps load the weights, how they keep memory low "
+    "and what to do when the model is too large for the phone. "
+)
+IRRELEVANT = (
+    "The village bakery opens at six in the morning and sells bread, cakes and "
+    "pastries. On weekends there is a market in the square where farmers bring "
+    "their cheese, honey and fresh vegetables from the valley. "
+)
+FOREIGN = " ".join(
+    ["Biblioteka uruchamia modele na urządzeniu w aplikacjach mobilnych."] * 10
+)
+
+
+def website(content: str, link: str = "https://example.com/page") -> Website:
+    return Website(header=WebsiteHeader(link=link), content=content)
+
+
+@pytest.mark.parametrize(
+    ("content", "reason"),
+    [
+        ("Too short.", "too_short"),
+        ("404 Not Found. " + ARTICLE, "error_page"),
+        ("Error 404. " + ARTICLE, "error_page"),
+        ("Sorry, this page doesn't exist. " + ARTICLE, "error_page"),
+        ("Sign in to continue reading. " + ARTICLE, "login_wall"),
+        ("Please enable JavaScript. " + ARTICLE, "login_wall"),
+        (FOREIGN, "wrong_language"),
+        (IRRELEVANT, "irrelevant"),
+        (ARTICLE, None),
+    ],
+)
+def test_local_heuristics_reject_pages(content, reason):
+    assert PageTriage(DESCRIPTION)._rejection_reason(content) == reason
+
+
+def test_short_article_mentioning_404_passes():
+    content = "The server returned a 404 for the weights, so we retried. " + ARTICLE
+
+    assert PageTriage(DESCRIPTION)._rejection_reason(content) is None
+
+
+def test_error_phrases_in_long_pages_pass():
+    content = "Page not found errors are rare. " + ARTICLE * 20
+
+    assert PageTriage(DESCRIPTION)._rejection_reason(content) is None
+
+
+def test_rejections_are_counted_by_reason():
+    stats = Stats()
+    triage = PageTriage(DESCRIPTION, stats=stats)
+
+    passed = triage.filter(
+        [website(ARTICLE), website("Too short."), website(IRRELEVANT)]
+    )
+
+    assert [page.content for page in passed] == [ARTICLE]
+    assert stats.get("triage.checked") == 3
+    assert stats.get("triage.rejected") == 2
+    assert stats.get("triage.rejected.too_short") == 1
+    assert stats.get("triage.rejected.irrelevant") == 1
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_model_judges_only_pages_passing_the_heuristics(fake_llm, mode):
+    fake_llm.answers["TriageVerdict"] = lambda _: {
+        "suitable": False,
+        "reason": "Off topic.",
+    }
+    stats = Stats()
+    triage = PageTriage(
+        DESCRIPTION, agent=TriageAgent(DESCRIPTION, "Triage."), stats=stats
+    )
+    websites = [website(ARTICLE), website("Too short.")]
+
+    if mode == "sync":
+        passed = triage.filter(websites)
+    else:
+        passed = asyncio.run(triage.afilter(websites))
+
+    assert passed == []
+    assert fake_llm.calls.count("openai:gpt-4o-mini:TriageVerdict") == 1
+    assert stats.get("triage.rejected.model") == 1
@@ -0,0 +1,50 @@
+import pytest
+
+from web_crawler.loading import canonicalize_url, normalize_url
+
+
+def test_normalize_url_unifies_trivial_spellings():
+    assert normalize_url("HTTPS://Example.com:443/a/?b=2&a=1#top") == (
+        "https://example.com/a?a=1&b=2"
+    )
+    assert normalize_url("http://example.com:8080") == "http://example.com:8080/"
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("http://www.example.com/post", "https://example.com/post"),
+        ("https://m.example.co.uk/post", "https://example.co.uk/post"),
+        ("https://amp.example.com/post", "https://example.com/post"),
+        ("https://www.example.com:8080/post", "https://example.com:8080/post"),
+        ("https://amp.dev/documentation", "https://amp.dev/documentation"),
+        ("https://m.tv/show", "https://m.tv/show"),
+    ],
+)
+def test_canonicalize_url_strips_mirror_prefixes_leaving_a_domain(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        (
+            "https://example.com/2024/on-device-ai/amp",
+            "https://example.com/2024/on-device-ai",
+        ),
+        ("https://example.com/post-1/amp.html", "https://example.com/post-1"),
+        ("https://example.com/blog/amp", "https://example.com/blog/amp"),
+        ("https://example.com/amp", "https://example.com/amp"),
+    ],
+)
+def test_canonicalize_url_strips_amp_suffixes_of_articles_only(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_canonicalize_url_strips_tracking_parameters_only():
+    assert canonicalize_url("https://example.com/post?utm_source=x&id=3&fbclid=y") == (
+        "https://example.com/post?id=3"
+    )
+    assert canonicalize_url("https://github.com/a/b?ref=main") != canonicalize_url(
+        "https://github.com/a/b?ref=dev"
+    )